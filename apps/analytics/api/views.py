@@ -1,7 +1,6 @@
-from datetime import timedelta
+from datetime import date, timedelta
 from django.utils import timezone
-from django.db.models import Sum, Avg, Count
-from django.core.cache import cache
+from django.utils.http import parse_etags
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
@@ -11,7 +10,13 @@ from django_filters.rest_framework import DjangoFilterBackend
 from apps.analytics.models import SalesReport
 from apps.analytics.api.serializers import SalesReportSerializer
 from apps.analytics.services.report_service import generate_monthly_sales_report
-from apps.orders.models import Order
+from apps.analytics.services.cube_service import DIMENSIONS, INTERVALS, cube_totals, query_cube
+from apps.analytics.services.response_cache import DEFAULT_TIMEOUT, cached_response
+from apps.analytics.services.rollup_service import month_totals
+
+# widest date range one cube query may cover, per interval
+MAX_RANGE_DAYS = {"hour": 31, "day": 366, "week": 731, "month": 3660}
+LIVE_TIMEOUT = 30
 
 
 class SalesReportViewSet(viewsets.ReadOnlyModelViewSet):
@@ -30,23 +35,19 @@ class SalesReportViewSet(viewsets.ReadOnlyModelViewSet):
     ordering = ["-date"]
 
     def get_queryset(self):
+        return SalesReport.objects.order_by("-date")
+
+    def respond_cached(self, request, endpoint, filters, compute, timeout=DEFAULT_TIMEOUT):
         """
-        Optimized queryset with caching for performance.
-        Cache key expires every 10 minutes.
+        Serve ``compute() -> (status, data)`` through the analytics response
+        cache, answering 304 when the client already holds the current ETag.
         """
-        cache_key = "analytics:sales_report_queryset"
-        queryset = cache.get(cache_key)
-
-        if not queryset:
-            queryset = (
-                SalesReport.objects
-                .all()
-                .defer("created_at")
-                .order_by("-date")
-            )
-            cache.set(cache_key, queryset, 600)  # Cache for 10 minutes
-
-        return queryset
+        entry = cached_response(endpoint, filters, compute, timeout)
+        headers = {"ETag": entry["etag"], "Cache-Control": "private, no-cache"}
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+        if entry["etag"] in etags or "*" in etags:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(entry["data"], status=entry["status"], headers=headers)
 
     # -----------------------------------------------------------------------
     # CUSTOM ENDPOINTS
@@ -58,45 +59,98 @@ class SalesReportViewSet(viewsets.ReadOnlyModelViewSet):
         Provides an overview of current month’s key metrics.
         Example: /api/analytics/sales-reports/summary/
         """
-        today = timezone.now().date()
+        today = timezone.localdate()
         start_date = today.replace(day=1)
 
-        report = (
-            SalesReport.objects.filter(date=start_date)
-            .values("total_orders", "total_revenue", "average_order_value")
-            .first()
-        )
-
-        if not report:
-            return Response(
-                {"detail": "No report found for this month."},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        return Response(
-            {
+        def compute():
+            # reports are daily rows: sum the month's days
+            report = month_totals(start_date)
+            if not (report["total_orders"] or report["refunded_orders"]):
+                return status.HTTP_404_NOT_FOUND, {"detail": "No report found for this month."}
+            return status.HTTP_200_OK, {
                 "month": start_date.strftime("%B %Y"),
                 "total_orders": report["total_orders"],
                 "total_revenue": f"{report['total_revenue']:.2f}",
                 "average_order_value": f"{report['average_order_value']:.2f}",
             }
-        )
 
+        return self.respond_cached(request, "summary", {"month": start_date}, compute)
 
     @action(detail=False, methods=["get"], url_path="trends")
     def trends(self, request):
         """
         Returns sales trends for the last 6 months.
         Useful for line charts or dashboards.
+        ?interval=day|week|month (default: day)
         """
-        six_months_ago = timezone.now().date() - timedelta(days=180)
-        reports = (
-            SalesReport.objects.filter(date__gte=six_months_ago)
-            .order_by("date")
-            .values("date", "total_revenue", "total_orders", "average_order_value")
-        )
+        interval = request.query_params.get("interval", "day")
+        if interval not in ("day", "week", "month"):
+            return Response({"detail": "interval must be day, week or month."}, status=status.HTTP_400_BAD_REQUEST)
+
+        today = timezone.localdate()
+
+        def compute():
+            rows = query_cube(interval, today - timedelta(days=180), today)
+            return status.HTTP_200_OK, [
+                {
+                    "date": row["period"],
+                    "total_revenue": row["total_revenue"],
+                    "total_orders": row["total_orders"],
+                    "average_order_value": row["average_order_value"],
+                }
+                for row in rows
+            ]
+
+        return self.respond_cached(request, "trends", {"interval": interval, "today": today}, compute)
+
+    @action(detail=False, methods=["get"], url_path="cube")
+    def cube(self, request):
+        """
+        Sales per time bucket, optionally split by a dimension, read from
+        the pre-aggregated cube.
+        Example: /api/analytics/sales-reports/cube/?interval=day&group_by=category&start=2025-10-01
+        - interval: hour | day | week | month (default: day)
+        - group_by: all | category | vendor | gateway | product (default: all)
+        - start / end: YYYY-MM-DD, inclusive (default: the last 30 days)
+        - key: comma-separated ids/codes of the group_by dimension to keep
+        - subtree: 1 to fold each category's descendants into it (group_by=category)
+        """
+        params = request.query_params
+        interval = params.get("interval", "day")
+        group_by = params.get("group_by", "all")
+        if interval not in INTERVALS:
+            return Response({"detail": f"interval must be one of: {', '.join(INTERVALS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if group_by not in DIMENSIONS:
+            return Response({"detail": f"group_by must be one of: {', '.join(DIMENSIONS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            end = date.fromisoformat(params["end"]) if params.get("end") else timezone.localdate()
+            start = date.fromisoformat(params["start"]) if params.get("start") else end - timedelta(days=29)
+        except ValueError:
+            return Response({"detail": "start and end must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        if end < start:
+            return Response({"detail": "end must not be before start."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days >= MAX_RANGE_DAYS[interval]:
+            return Response(
+                {"detail": f"{interval} buckets cover at most {MAX_RANGE_DAYS[interval]} days per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        keys = sorted({key for key in params.get("key", "").split(",") if key})
+        subtree = params.get("subtree", "").lower() in ("1", "true")
+        filters = {
+            "interval": interval, "group_by": group_by, "start": start, "end": end, "keys": keys, "subtree": subtree,
+        }
 
-        return Response(reports)
+        def compute():
+            return status.HTTP_200_OK, {
+                **filters,
+                "results": query_cube(interval, start, end, group_by=group_by, keys=keys, subtree=subtree),
+            }
+
+        return self.respond_cached(request, "cube", filters, compute)
 
     @action(
         detail=False,
@@ -121,22 +175,18 @@ class SalesReportViewSet(viewsets.ReadOnlyModelViewSet):
         Real-time snapshot analytics (last 7 days).
         Example: /api/analytics/sales-reports/live-dashboard/
         """
-        today = timezone.now()
-        week_ago = today - timedelta(days=7)
-
-        orders = Order.objects.filter(created_at__gte=week_ago, status="completed")
-        data = orders.aggregate(
-            total_orders=Count("id"),
-            total_revenue=Sum("total_price"),
-            avg_order_value=Avg("total_price"),
-        )
-
-        return Response(
-            {
+        def compute():
+            today = timezone.now()
+            week_ago = today - timedelta(days=7)
+            # 168 hourly cube rows instead of the week's orders
+            data = cube_totals(week_ago, today)
+            return status.HTTP_200_OK, {
                 "from": week_ago.date(),
                 "to": today.date(),
-                "total_orders": data["total_orders"] or 0,
-                "total_revenue": round(data["total_revenue"] or 0, 2),
-                "average_order_value": round(data["avg_order_value"] or 0, 2),
+                "total_orders": data["total_orders"],
+                "total_revenue": data["total_revenue"],
+                "average_order_value": data["average_order_value"],
             }
-        )
\ No newline at end of file
+
+        # the window slides: keep it short, sales in between still invalidate it
+        return self.respond_cached(request, "live-dashboard", {}, compute, timeout=LIVE_TIMEOUT)
\ No newline at end of file
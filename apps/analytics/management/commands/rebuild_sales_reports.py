@@ -0,0 +1,28 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.analytics.services.rollup_service import rebuild_sales_reports
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily sales reports for a date range from the orders table "
+        "(backfill, or repair after bulk edits that bypassed the rollup)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat, required=True, help="First day, YYYY-MM-DD.")
+        parser.add_argument("--end", type=date.fromisoformat, help="Last day, YYYY-MM-DD (default: today).")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        start = options["start"]
+        end = options["end"] or timezone.localdate()
+        if end < start:
+            raise CommandError("--end must not be before --start.")
+        result = rebuild_sales_reports(start, end, chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {start}..{end}: {result['days']} day(s) with sales from {result['orders']} order(s)."
+        ))
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.5 on 2026-10-17 16:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('products', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.BigIntegerField(unique=True)),
+                ('date', models.DateField(db_index=True)),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('refunded_orders', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Order Rollup Entry',
+                'verbose_name_plural': 'Order Rollup Entries',
+            },
+        ),
+        migrations.CreateModel(
+            name='SalesReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('total_orders', models.PositiveIntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_profit', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('average_order_value', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('refunded_orders', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Sales Report',
+                'verbose_name_plural': 'Sales Reports',
+                'ordering': ['-date'],
+                'unique_together': {('date',)},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductPerformance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_sales', models.PositiveIntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('average_rating', models.DecimalField(decimal_places=2, default=0, max_digits=3)),
+                ('total_reviews', models.PositiveIntegerField(default=0)),
+                ('last_sold_at', models.DateTimeField(blank=True, null=True)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='performance', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Product Performance',
+                'verbose_name_plural': 'Product Performances',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity_type', models.CharField(choices=[('login', 'Login'), ('logout', 'Logout'), ('order_created', 'Order Created'), ('payment_completed', 'Payment Completed'), ('review_submitted', 'Review Submitted'), ('wishlist_added', 'Wishlist Added')], max_length=50)),
+                ('reference_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Activity',
+                'verbose_name_plural': 'User Activities',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderrollup',
+            name='cube',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name='SalesCube',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('month', 'Month')], max_length=10)),
+                ('bucket', models.DateTimeField(help_text='Start of the hour/day/month, local time.')),
+                ('dimension', models.CharField(choices=[('all', 'All'), ('category', 'Category'), ('vendor', 'Vendor'), ('gateway', 'Payment Gateway'), ('product', 'Product')], max_length=20)),
+                ('key', models.CharField(blank=True, help_text='Category/vendor/product id or gateway code.', max_length=64)),
+                ('orders', models.IntegerField(default=0)),
+                ('units', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('refunded_orders', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Sales Cube Cell',
+                'verbose_name_plural': 'Sales Cube',
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'dimension', 'bucket', 'key'), name='uniq_sales_cube_cell')],
+            },
+        ),
+    ]
@@ -14,6 +14,8 @@ class SalesReport(models.Model):
     total_profit = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     average_order_value = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     refunded_orders = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Sales Report"
@@ -25,6 +27,74 @@ class SalesReport(models.Model):
         return f"Sales Report - {self.date}"
 
 
+class OrderRollup(models.Model):
+    """
+    What one order currently contributes to the daily SalesReport rows.
+    The rollup engine applies (new contribution - this row) on every order
+    change, so re-saving an order in the same state adds nothing.
+    """
+    # plain id, not a FK: the entry must outlive the order so a delete can be retracted
+    order_id = models.BigIntegerField(unique=True)
+    date = models.DateField(db_index=True)
+    orders = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    refunded_orders = models.PositiveIntegerField(default=0)
+    # the order's SalesCube cells: {"hour": iso, "cells": {"dimension:key": [orders, units, revenue, refunded]}}
+    cube = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Order Rollup Entry"
+        verbose_name_plural = "Order Rollup Entries"
+
+    def __str__(self):
+        return f"Order #{self.order_id} -> {self.date}"
+
+
+class SalesCube(models.Model):
+    """
+    Pre-aggregated sales per time bucket and dimension value, maintained
+    incrementally by the rollup engine (apps.analytics.services.cube_service).
+    Each (granularity, dimension) pair is one projection of the cube: with
+    dimension "category" a row holds the orders containing that category in
+    the bucket, the units sold in it and their line revenue.
+    """
+    GRANULARITY_CHOICES = [
+        ("hour", "Hour"),
+        ("day", "Day"),
+        ("month", "Month"),
+    ]
+    DIMENSION_CHOICES = [
+        ("all", "All"),
+        ("category", "Category"),
+        ("vendor", "Vendor"),
+        ("gateway", "Payment Gateway"),
+        ("product", "Product"),
+    ]
+
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    bucket = models.DateTimeField(help_text="Start of the hour/day/month, local time.")
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=64, blank=True, help_text="Category/vendor/product id or gateway code.")
+    orders = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    refunded_orders = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Sales Cube Cell"
+        verbose_name_plural = "Sales Cube"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["granularity", "dimension", "bucket", "key"], name="uniq_sales_cube_cell"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket:%Y-%m-%d %H:%M} {self.dimension}:{self.key}"
+
+
 class ProductPerformance(models.Model):
     """
     Tracks how each product performs in terms of sales and ratings.
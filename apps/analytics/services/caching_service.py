@@ -1,7 +1,7 @@
-from django.core.cache import cache
 from datetime import timedelta
 from django.utils import timezone
 from apps.analytics.models import SalesReport, PerformanceMetric
+from core.caching import read_through
 
 
 CACHE_TIMEOUT = 60 * 60  # 1 hour
@@ -10,42 +10,36 @@ CACHE_TIMEOUT = 60 * 60  # 1 hour
 def get_cached_sales_summary():
     """
     Fetch cached monthly sales summary if available.
-    Otherwise compute and store in cache.
+    Otherwise compute and store in cache (one worker at a time).
     """
-    key = "analytics:monthly_sales_summary"
-    data = cache.get(key)
-
-    if not data:
+    def compute():
         latest_report = SalesReport.objects.order_by("-date").first()
         if not latest_report:
             return None
 
-        data = {
+        return {
             "month": latest_report.date.strftime("%B %Y"),
             "total_orders": latest_report.total_orders,
             "total_revenue": latest_report.total_revenue,
             "average_order_value": latest_report.average_order_value,
         }
-        cache.set(key, data, CACHE_TIMEOUT)
-    return data
+
+    return read_through("analytics:monthly_sales_summary", compute, CACHE_TIMEOUT)
 
 
 def get_cached_performance_metrics():
     """
     Fetch cached daily performance metrics.
     """
-    key = "analytics:daily_performance"
-    data = cache.get(key)
-
-    if not data:
+    def compute():
         latest_metrics = PerformanceMetric.objects.order_by("-date").first()
         if not latest_metrics:
             return None
 
-        data = {
+        return {
             "date": latest_metrics.date.isoformat(),
             "active_users": latest_metrics.active_users,
             "conversion_rate": latest_metrics.conversion_rate,
         }
-        cache.set(key, data, CACHE_TIMEOUT)
-    return data
+
+    return read_through("analytics:daily_performance", compute, CACHE_TIMEOUT)
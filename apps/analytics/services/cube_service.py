@@ -0,0 +1,318 @@
+# apps/analytics/services/cube_service.py
+"""
+Multi-granularity sales cube.
+
+``SalesCube`` holds one row per (granularity, bucket, dimension, key):
+hour/day/month buckets in local time, projected on the whole shop ("all")
+and on each category, vendor, payment gateway and product. A sold order
+counts once in every cell it touches (an order with two categories counts
+in both category rows); units and revenue are split by line item, so the
+category/vendor/product revenue is the sum of line totals while "all" and
+"gateway" use the order total.
+
+The rollup engine keeps an order's cells on its ``OrderRollup.cube`` and
+hands ``apply_cube_delta`` only the difference, so an order change reaches
+the cube in three statements whatever the number of cells. Dashboards then read
+O(buckets) rows instead of scanning orders.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+
+from apps.analytics.models import OrderRollup, SalesCube
+from apps.orders.models import OrderItem
+from apps.payments.models import Payment
+from apps.products.models import CategoryClosure
+
+ZERO = Decimal("0.00")
+GRANULARITIES = ("hour", "day", "month")
+INTERVALS = ("hour", "day", "week", "month")
+DIMENSIONS = ("all", "category", "vendor", "gateway", "product")
+GATEWAY_STATUSES = ("completed", "refunded")
+
+ITEM_FIELDS = ("product_id", "product__category_id", "product__vendor_id", "quantity", "price")
+
+
+def _money(value):
+    return Decimal(str(value)).quantize(ZERO)
+
+
+def hour_bucket(created_at):
+    return timezone.localtime(created_at).replace(minute=0, second=0, microsecond=0)
+
+
+def buckets(hour):
+    """The hour/day/month buckets an order placed in ``hour`` falls into."""
+    day = hour.replace(hour=0)
+    return {"hour": hour, "day": day, "month": day.replace(day=1)}
+
+
+def order_cube(created_at, orders, refunded_orders, total_price, items, gateway):
+    """
+    The cells one order contributes, as stored on ``OrderRollup.cube``.
+    ``items`` are ``ITEM_FIELDS`` tuples; ``gateway`` is "" when unpaid.
+    """
+    if not (orders or refunded_orders):
+        return {}
+    sold = bool(orders)
+
+    cells = defaultdict(lambda: [0, 0, ZERO, 0])
+    for product_id, category_id, vendor_id, quantity, price in items:
+        for dimension, key in (("category", category_id), ("vendor", vendor_id), ("product", product_id)):
+            cell = cells[f"{dimension}:{key}"]
+            cell[0], cell[3] = orders, refunded_orders
+            if sold:
+                cell[1] += quantity
+                cell[2] += quantity * _money(price)
+
+    units = sum(item[3] for item in items) if sold else 0
+    revenue = _money(total_price) if sold else ZERO
+    cells["all:"] = cells[f"gateway:{gateway}"] = [orders, units, revenue, refunded_orders]
+
+    return {
+        "hour": hour_bucket(created_at).isoformat(),
+        "cells": {name: [o, u, str(r), ref] for name, (o, u, r, ref) in cells.items()},
+    }
+
+
+def load_order_dimensions(order_id):
+    """``(items, gateway)`` for one order: two small indexed queries."""
+    items = list(OrderItem.objects.filter(order_id=order_id).values_list(*ITEM_FIELDS))
+    gateway = (
+        Payment.objects.filter(order_id=order_id, status__in=GATEWAY_STATUSES)
+        .order_by("-created_at")
+        .values_list("gateway", flat=True)
+        .first()
+    )
+    return items, gateway or ""
+
+
+def load_range_dimensions(lower, upper, order_ids, chunk_size=2000):
+    """
+    ``({order_id: items}, {order_id: gateway})`` for the orders in
+    ``order_ids`` placed in ``lower``..``upper``: one streamed pass over the
+    line items and one over the payments.
+    """
+    items = defaultdict(list)
+    rows = (
+        OrderItem.objects.filter(order__created_at__gte=lower, order__created_at__lt=upper)
+        .order_by()
+        .values_list("order_id", *ITEM_FIELDS)
+    )
+    for order_id, *item in rows.iterator(chunk_size=chunk_size):
+        if order_id in order_ids:
+            items[order_id].append(tuple(item))
+
+    gateways = {}
+    payments = (
+        Payment.objects.filter(
+            order__created_at__gte=lower, order__created_at__lt=upper, status__in=GATEWAY_STATUSES
+        )
+        .order_by("created_at")
+        .values_list("order_id", "gateway")
+    )
+    for order_id, gateway in payments.iterator(chunk_size=chunk_size):
+        if order_id in order_ids:
+            gateways[order_id] = gateway  # latest payment wins
+    return items, gateways
+
+
+def _expand(cube, sign=1):
+    """Yield ``((granularity, bucket, dimension, key), [o, u, revenue, ref])`` for a stored cube."""
+    if not cube:
+        return
+    hour = timezone.localtime(datetime.fromisoformat(cube["hour"]))
+    for granularity, bucket in buckets(hour).items():
+        for name, (o, u, r, ref) in cube["cells"].items():
+            dimension, key = name.split(":", 1)
+            yield (granularity, bucket, dimension, key), [sign * o, sign * u, sign * Decimal(r), sign * ref]
+
+
+def cube_delta(old, new):
+    """Per-cell difference between two stored cubes (zero cells dropped)."""
+    delta = defaultdict(lambda: [0, 0, ZERO, 0])
+    for cell, values in [*_expand(old, -1), *_expand(new)]:
+        totals = delta[cell]
+        for i, value in enumerate(values):
+            totals[i] += value
+    return {cell: values for cell, values in delta.items() if any(values)}
+
+
+def apply_cube_delta(delta):
+    """
+    Add ``delta`` to the cube: create missing cells, fetch their ids, then
+    one UPDATE with a CASE per metric. F-expressions keep concurrent writers
+    from losing each other's increments.
+    """
+    if not delta:
+        return 0
+    SalesCube.objects.bulk_create(
+        [SalesCube(granularity=g, bucket=b, dimension=d, key=k) for g, b, d, k in delta],
+        ignore_conflicts=True,
+    )
+    match = Q()
+    for g, b, d, k in delta:
+        match |= Q(granularity=g, bucket=b, dimension=d, key=k)
+    ids = {
+        (g, b, d, k): pk
+        for pk, g, b, d, k in SalesCube.objects.filter(match).values_list(
+            "pk", "granularity", "bucket", "dimension", "key"
+        )
+    }
+
+    def increment(field, index):
+        return Case(
+            *[When(pk=ids[cell], then=F(field) + values[index]) for cell, values in delta.items()],
+            default=F(field),
+        )
+
+    return SalesCube.objects.filter(pk__in=ids.values()).update(
+        orders=increment("orders", 0),
+        units=increment("units", 1),
+        revenue=increment("revenue", 2),
+        refunded_orders=increment("refunded_orders", 3),
+        updated_at=timezone.now(),
+    )
+
+
+def _local_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def _next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def rebuild_cube(start, end, chunk_size=2000):
+    """
+    Recompute every cube row in the months touching ``start``..``end`` from
+    the ``OrderRollup`` entries of those months (call it after the entries
+    themselves were rebuilt). Returns the number of cells written.
+    """
+    first, last = start.replace(day=1), _next_month(end)
+    totals = defaultdict(lambda: [0, 0, ZERO, 0])
+    entries = OrderRollup.objects.filter(date__gte=first, date__lt=last).values_list("cube", flat=True)
+    for cube in entries.iterator(chunk_size=chunk_size):
+        for cell, values in _expand(cube):
+            cell_totals = totals[cell]
+            for i, value in enumerate(values):
+                cell_totals[i] += value
+
+    SalesCube.objects.filter(bucket__gte=_local_midnight(first), bucket__lt=_local_midnight(last)).delete()
+    SalesCube.objects.bulk_create(
+        [
+            SalesCube(granularity=g, bucket=b, dimension=d, key=k, orders=o, units=u, revenue=r, refunded_orders=ref)
+            for (g, b, d, k), (o, u, r, ref) in totals.items()
+            if o or u or r or ref
+        ],
+        batch_size=chunk_size,
+    )
+    return len(totals)
+
+
+def _period(interval, bucket):
+    local = timezone.localtime(bucket)
+    if interval == "hour":
+        return local
+    day = local.date()
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def category_subtrees(keys=None):
+    """
+    ``{descendant key: [ancestor keys]}`` from the category closure table,
+    limited to the subtrees of ``keys`` when given.
+    """
+    links = CategoryClosure.objects.all()
+    if keys:
+        links = links.filter(ancestor_id__in=[int(key) for key in keys if str(key).isdigit()])
+    owners = defaultdict(list)
+    for ancestor_id, descendant_id in links.values_list("ancestor_id", "descendant_id"):
+        owners[str(descendant_id)].append(str(ancestor_id))
+    return owners
+
+
+def bucket_start(interval, day):
+    """First day of the ``interval`` bucket containing ``day``."""
+    if interval == "month":
+        return day.replace(day=1)
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def query_cube(interval, start, end, group_by="all", keys=None, subtree=False):
+    """
+    Sales per ``interval`` bucket for the days ``start``..``end`` (inclusive),
+    optionally split by ``group_by`` and limited to its ``keys``. Weeks
+    (starting Monday) are folded from the day rows. ``start`` is floored to
+    the start of its week/month, so the first bucket is always whole.
+
+    With ``subtree`` a category row also covers every category below it.
+    Units and revenue add up exactly; an order spanning two subcategories
+    counts once in each of them and so twice in their parent.
+    """
+    owners = None
+    if subtree and group_by == "category":
+        owners = category_subtrees(keys)
+        if not owners:
+            return []
+        keys = list(owners) if keys else None
+
+    start = bucket_start(interval, start)
+    granularity = "day" if interval == "week" else interval
+    rows = SalesCube.objects.filter(
+        granularity=granularity,
+        dimension=group_by,
+        bucket__gte=_local_midnight(start),
+        bucket__lt=_local_midnight(end + timedelta(days=1)),
+    )
+    if keys:
+        rows = rows.filter(key__in=[str(key) for key in keys])
+
+    periods = defaultdict(lambda: [0, 0, ZERO, 0])
+    for bucket, key, *values in rows.order_by("bucket", "key").values_list(
+        "bucket", "key", "orders", "units", "revenue", "refunded_orders"
+    ):
+        for owner in owners.get(key, ()) if owners is not None else (key,):
+            totals = periods[(_period(interval, bucket), owner)]
+            for i, value in enumerate(values):
+                totals[i] += value
+
+    results = []
+    for (period, key), (orders, units, revenue, refunded) in periods.items():
+        row = {"period": period}
+        if group_by != "all":
+            row["key"] = key
+        row.update(
+            total_orders=orders,
+            units_sold=units,
+            total_revenue=revenue,
+            average_order_value=(revenue / orders).quantize(ZERO) if orders else ZERO,
+            refunded_orders=refunded,
+        )
+        results.append(row)
+    return results
+
+
+def cube_totals(lower, upper):
+    """Shop-wide totals from the hour rows in ``lower``..``upper`` (datetimes)."""
+    orders = units = refunded = 0
+    revenue = ZERO
+    rows = SalesCube.objects.filter(
+        granularity="hour", dimension="all", bucket__gte=hour_bucket(lower), bucket__lt=upper
+    ).values_list("orders", "units", "revenue", "refunded_orders")
+    for o, u, r, ref in rows:
+        orders, units, revenue, refunded = orders + o, units + u, revenue + r, refunded + ref
+    return {
+        "total_orders": orders,
+        "units_sold": units,
+        "total_revenue": revenue,
+        "average_order_value": (revenue / orders).quantize(ZERO) if orders else ZERO,
+        "refunded_orders": refunded,
+    }
@@ -0,0 +1,52 @@
+# apps/analytics/services/response_cache.py
+"""
+Response-level cache for the analytics dashboard endpoints.
+
+Entries are keyed by endpoint and normalized filter values and carry
+``SALES_TAG``; the rollup engine bumps that tag after every commit that
+changes a report or a cube cell. The first read after a bump rebuilds the
+entry, and ``read_through`` serves the previous figure to concurrent readers
+while it does, so a figure can lag the last sale by one rebuild (at most
+the 30 s refresh lock). Each entry stores the ETag of its body, which lets a
+polling dashboard revalidate with ``If-None-Match`` and get a 304 without
+the payload being rebuilt or sent.
+"""
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from core.caching import invalidate_tags, read_through
+
+SALES_TAG = "analytics:sales"
+RESPONSE_PREFIX = "analytics:response"
+DEFAULT_TIMEOUT = 60 * 10
+
+
+def response_key(endpoint, filters):
+    """Cache key for ``endpoint`` under the (already validated) ``filters`` dict."""
+    digest = hashlib.md5(json.dumps(filters, cls=DjangoJSONEncoder, sort_keys=True).encode()).hexdigest()
+    return f"{RESPONSE_PREFIX}:{endpoint}:{digest}"
+
+
+def compute_etag(data):
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return f'"{hashlib.md5(body.encode()).hexdigest()}"'
+
+
+def cached_response(endpoint, filters, compute, timeout=DEFAULT_TIMEOUT):
+    """
+    Return ``{"status", "data", "etag"}`` for ``endpoint``, computing it with
+    ``compute() -> (status, data)`` on a miss (one worker at a time).
+    """
+    def build():
+        status, data = compute()
+        return {"status": status, "data": data, "etag": compute_etag(data)}
+
+    return read_through(response_key(endpoint, filters), build, timeout, tags=[SALES_TAG])
+
+
+def invalidate_sales_responses():
+    """Drop the cached analytics responses once the current transaction commits."""
+    transaction.on_commit(lambda: invalidate_tags(SALES_TAG))
@@ -0,0 +1,238 @@
+# apps/analytics/services/rollup_service.py
+"""
+Incremental daily sales rollup.
+
+Every order contributes to the SalesReport row of the day it was placed
+(``created_at`` in the local timezone): a completed order adds one order and
+its total to revenue, a refunded one adds to ``refunded_orders``, anything
+else contributes nothing. ``OrderRollup`` remembers what was applied for each
+order, so a change applies only the difference, with F-expression UPDATEs
+under a row lock on that order's entry. Re-saves are no-ops and every status
+transition is counted exactly once, however many workers save orders.
+
+The same entry carries the order's ``SalesCube`` cells (hour/day/month by
+category, vendor, gateway and product; see cube_service), moved the same way.
+
+``rebuild_sales_reports`` recomputes a date range from the orders table in
+bulk (backfills, or repairing rows after raw SQL).
+"""
+from collections import defaultdict, namedtuple
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Sum, When
+from django.utils import timezone
+
+from apps.analytics.models import OrderRollup, SalesReport
+from apps.analytics.services.cube_service import (
+    apply_cube_delta,
+    cube_delta,
+    load_order_dimensions,
+    load_range_dimensions,
+    order_cube,
+    rebuild_cube,
+)
+from apps.analytics.services.response_cache import invalidate_sales_responses
+from apps.orders.models import Order
+
+ZERO = Decimal("0.00")
+SALE_STATUSES = ("completed",)
+REFUND_STATUSES = ("refunded", "partially_refunded")
+
+Contribution = namedtuple("Contribution", "date orders revenue refunded_orders")
+
+_AVERAGE_ORDER_VALUE = Case(
+    When(
+        total_orders__gt=0,
+        then=ExpressionWrapper(
+            F("total_revenue") / F("total_orders"),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        ),
+    ),
+    default=ZERO,
+    output_field=DecimalField(max_digits=10, decimal_places=2),
+)
+
+
+def order_date(created_at):
+    return timezone.localdate(created_at)
+
+
+def contribution(status, total_price, created_at):
+    sold = status in SALE_STATUSES
+    return Contribution(
+        date=order_date(created_at),
+        orders=int(sold),
+        revenue=Decimal(str(total_price)) if sold else ZERO,
+        refunded_orders=int(status in REFUND_STATUSES),
+    )
+
+
+def _is_empty(c):
+    return not (c.orders or c.revenue or c.refunded_orders)
+
+
+def _apply(date, orders, revenue, refunded_orders):
+    """Add the deltas to ``date``'s report (created on first use)."""
+    if not (orders or revenue or refunded_orders):
+        return
+    SalesReport.objects.get_or_create(date=date)
+    report = SalesReport.objects.filter(date=date)
+    report.update(
+        total_orders=F("total_orders") + orders,
+        total_revenue=F("total_revenue") + revenue,
+        refunded_orders=F("refunded_orders") + refunded_orders,
+        updated_at=timezone.now(),
+    )
+    # separate statement: MySQL evaluates SET clauses left to right with the new values
+    report.update(average_order_value=_AVERAGE_ORDER_VALUE)
+
+
+def _move(entry, new):
+    """Retract ``entry``'s contribution and apply ``new`` in its place."""
+    old = Contribution(entry.date, entry.orders, entry.revenue, entry.refunded_orders)
+    if old == new:
+        return False
+    if old.date == new.date:
+        _apply(new.date, new.orders - old.orders, new.revenue - old.revenue, new.refunded_orders - old.refunded_orders)
+    else:
+        _apply(old.date, -old.orders, -old.revenue, -old.refunded_orders)
+        _apply(new.date, new.orders, new.revenue, new.refunded_orders)
+    return True
+
+
+def rollup_order(order):
+    """
+    Bring the daily report in line with ``order``'s current state.
+    Returns True when a report changed.
+    """
+    new = contribution(order.status, order.total_price, order.created_at)
+    if _is_empty(new):
+        if not OrderRollup.objects.filter(order_id=order.pk).exists():
+            return False  # e.g. a pending order at checkout: nothing applied, nothing to apply
+        cube = {}
+    else:
+        items, gateway = load_order_dimensions(order.pk)
+        cube = order_cube(order.created_at, new.orders, new.refunded_orders, order.total_price, items, gateway)
+
+    with transaction.atomic():
+        # the entry row lock serializes concurrent saves of the same order
+        entry, _ = OrderRollup.objects.select_for_update().get_or_create(
+            order_id=order.pk, defaults={"date": new.date}
+        )
+        moved = _move(entry, new)
+        if entry.cube != cube:
+            apply_cube_delta(cube_delta(entry.cube, cube))
+        elif not moved:
+            return False
+        entry.date, entry.orders, entry.revenue, entry.refunded_orders = new
+        entry.cube = cube
+        entry.save()
+        invalidate_sales_responses()
+    return True
+
+
+def retract_order(order_id):
+    """Take a deleted order out of the reports."""
+    with transaction.atomic():
+        entry = OrderRollup.objects.select_for_update().filter(order_id=order_id).first()
+        if entry is None:
+            return False
+        _move(entry, Contribution(entry.date, 0, ZERO, 0))
+        apply_cube_delta(cube_delta(entry.cube, {}))
+        entry.delete()
+        invalidate_sales_responses()
+    return True
+
+
+def _day_bounds(start, end):
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+@transaction.atomic
+def rebuild_sales_reports(start, end, chunk_size=2000):
+    """
+    Recompute the reports (and rollup entries) for ``start``..``end``
+    inclusive from the orders placed in that range: one streamed pass over
+    the orders, one over their items and payments, then bulk writes. Days
+    without sales are zeroed; the cube is rebuilt for the months touched.
+    Returns ``{"days": n, "orders": n}``.
+    """
+    lower, upper = _day_bounds(start, end)
+    orders = (
+        Order.objects.filter(created_at__gte=lower, created_at__lt=upper)
+        .order_by()
+        .values_list("pk", "status", "total_price", "created_at")
+    )
+
+    contributing = []
+    totals = defaultdict(lambda: [0, ZERO, 0])
+    for pk, status, total_price, created_at in orders.iterator(chunk_size=chunk_size):
+        c = contribution(status, total_price, created_at)
+        if _is_empty(c):
+            continue
+        contributing.append((pk, c, total_price, created_at))
+        day = totals[c.date]
+        day[0] += c.orders
+        day[1] += c.revenue
+        day[2] += c.refunded_orders
+
+    items, gateways = load_range_dimensions(lower, upper, {pk for pk, *_ in contributing}, chunk_size)
+    entries = [
+        OrderRollup(
+            order_id=pk, date=c.date, orders=c.orders, revenue=c.revenue, refunded_orders=c.refunded_orders,
+            cube=order_cube(created_at, c.orders, c.refunded_orders, total_price, items[pk], gateways.get(pk, "")),
+        )
+        for pk, c, total_price, created_at in contributing
+    ]
+
+    OrderRollup.objects.filter(date__range=(start, end)).delete()
+    OrderRollup.objects.bulk_create(entries, batch_size=chunk_size)
+
+    now = timezone.now()
+    SalesReport.objects.bulk_create(
+        [
+            SalesReport(
+                date=date,
+                total_orders=count,
+                total_revenue=revenue,
+                refunded_orders=refunded,
+                average_order_value=(revenue / count).quantize(ZERO) if count else ZERO,
+                updated_at=now,
+            )
+            for date, (count, revenue, refunded) in totals.items()
+        ],
+        batch_size=chunk_size,
+        update_conflicts=True,
+        unique_fields=["date"],
+        update_fields=["total_orders", "total_revenue", "refunded_orders", "average_order_value", "updated_at"],
+    )
+    SalesReport.objects.filter(date__range=(start, end)).exclude(date__in=list(totals)).update(
+        total_orders=0, total_revenue=ZERO, refunded_orders=0, average_order_value=ZERO, updated_at=now
+    )
+    rebuild_cube(start, end, chunk_size=chunk_size)
+    invalidate_sales_responses()
+    return {"days": len(totals), "orders": len(entries)}
+
+
+def month_totals(month_start):
+    """Month figures summed from the (at most 31) daily rows."""
+    next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    totals = SalesReport.objects.filter(date__gte=month_start, date__lt=next_month).aggregate(
+        total_orders=Sum("total_orders"),
+        total_revenue=Sum("total_revenue"),
+        refunded_orders=Sum("refunded_orders"),
+    )
+    total_orders = totals["total_orders"] or 0
+    total_revenue = totals["total_revenue"] or ZERO
+    return {
+        "total_orders": total_orders,
+        "total_revenue": total_revenue,
+        "refunded_orders": totals["refunded_orders"] or 0,
+        "average_order_value": (total_revenue / total_orders).quantize(ZERO) if total_orders else ZERO,
+    }
@@ -1,43 +1,62 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.utils import timezone
-from django.db import models
 from apps.orders.models import Order
+from apps.outbox.services.outbox_service import subscriber
 from apps.payments.models import Payment
-from apps.products.models import Review
-from apps.analytics.models import SalesReport, ProductPerformance, UserActivity
+from apps.payments.signals import PAYMENT_SAVED
+from apps.products.models import Product, Review
+from apps.analytics.models import ProductPerformance, UserActivity
+from apps.analytics.services.rollup_service import retract_order, rollup_order
+
+ROLLUP_FIELDS = {"status", "total_price"}
 
 
 @receiver(post_save, sender=Order)
-def update_sales_report(sender, instance, created, **kwargs):
-    if not created and instance.status != "completed":
+def update_sales_report(sender, instance, created, update_fields=None, **kwargs):
+    # applies only the difference from what this order already contributed
+    if update_fields is not None and not ROLLUP_FIELDS & set(update_fields):
         return
+    rollup_order(instance)
+
+
+@receiver(post_delete, sender=Order)
+def retract_sales_report(sender, instance, **kwargs):
+    retract_order(instance.pk)
+
+
+@subscriber(PAYMENT_SAVED)
+def refresh_order_rollup(payload):
+    # the sales cube splits orders by payment gateway; a no-op unless that changed
+    order = Order.objects.filter(payments__pk=payload["payment_id"]).first()
+    if order is not None:
+        rollup_order(order)
 
-    date = timezone.now().date()
-    report, _ = SalesReport.objects.get_or_create(date=date)
 
-    report.total_orders += 1
-    report.total_revenue += instance.total_price
-    report.average_order_value = (
-        report.total_revenue / report.total_orders if report.total_orders else 0
+@subscriber(PAYMENT_SAVED)
+def log_payment_activity(payload):
+    # runs in the outbox worker; get_or_create keeps a retried event from logging twice
+    if not (payload["created"] and payload["status"] == "completed"):
+        return
+    payment = Payment.objects.select_related("order").filter(pk=payload["payment_id"]).first()
+    if payment is None:
+        return
+    UserActivity.objects.get_or_create(
+        activity_type="payment_completed",
+        reference_id=str(payment.id),
+        defaults={"user_id": payment.order.user_id, "metadata": {"amount": float(payment.amount)}},
     )
-    report.save(update_fields=["total_orders", "total_revenue", "average_order_value"])
-
-
-@receiver(post_save, sender=Payment)
-def log_payment_activity(sender, instance, created, **kwargs):
-    if created and instance.status == "completed":
-        UserActivity.objects.create(
-            user=instance.user,
-            activity_type="payment_completed",
-            reference_id=str(instance.id),
-            metadata={"amount": float(instance.amount)},
-        )
-
-
-@receiver(post_save, sender=Review)
-def update_product_performance(sender, instance, created, **kwargs):
-    perf, _ = ProductPerformance.objects.get_or_create(product=instance.product)
-    perf.total_reviews = instance.product.reviews.count()
-    perf.average_rating = instance.product.reviews.aggregate(avg=models.Avg("rating"))["avg"] or 0
-    perf.save(update_fields=["total_reviews", "average_rating"])
+
+
+@receiver([post_save, post_delete], sender=Review)
+def update_product_performance(sender, instance, **kwargs):
+    # copy the aggregates the products app maintains on the product row
+    # instead of re-aggregating the reviews table
+    ratings = Product.objects.filter(pk=instance.product_id).values("rating_count", "rating_avg").first()
+    if ratings is None:
+        return
+    values = {"total_reviews": ratings["rating_count"], "average_rating": ratings["rating_avg"]}
+    if kwargs["signal"] is post_delete:
+        # don't recreate a row a cascading product delete already removed
+        ProductPerformance.objects.filter(product_id=instance.product_id).update(**values)
+    else:
+        ProductPerformance.objects.update_or_create(product_id=instance.product_id, defaults=values)
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from apps.orders.models import Order
+
+User = get_user_model()
+
+SUMMARY_URL = "/api/v1/sales-reports/summary/"
+DASHBOARD_URL = "/api/v1/sales-reports/live-dashboard/"
+
+
+class AnalyticsResponseCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="analyst", email="analyst@example.com", password="pass12345")
+        self.client.force_authenticate(self.user)
+
+    def complete_order(self, total):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(user=self.user, total_price=total)
+            order.status = "completed"
+            order.save()
+
+    def test_matching_etag_gets_304_without_recomputing(self):
+        self.complete_order(100)
+        first = self.client.get(SUMMARY_URL)
+        self.assertEqual(first.status_code, 200)
+
+        with self.assertNumQueries(0):
+            again = self.client.get(SUMMARY_URL, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+    def test_rollup_write_invalidates_cached_responses(self):
+        self.complete_order(100)
+        summary = self.client.get(SUMMARY_URL)
+        dashboard = self.client.get(DASHBOARD_URL)
+
+        self.complete_order(50)
+
+        changed = self.client.get(SUMMARY_URL, HTTP_IF_NONE_MATCH=summary["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.data["total_orders"], 2)
+        self.assertEqual(self.client.get(DASHBOARD_URL).data["total_orders"], 2)
+        self.assertNotEqual(self.client.get(DASHBOARD_URL)["ETag"], dashboard["ETag"])
+
+    def test_cached_404_clears_on_first_sale(self):
+        self.assertEqual(self.client.get(SUMMARY_URL).status_code, 404)
+        self.complete_order(10)
+        self.assertEqual(self.client.get(SUMMARY_URL).status_code, 200)
@@ -0,0 +1,112 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.analytics.models import SalesCube
+from apps.analytics.services.cube_service import query_cube
+from apps.analytics.services.rollup_service import rebuild_sales_reports
+from apps.orders.models import Order, OrderItem
+from apps.payments.models import Payment
+from apps.products.models import Category, Product
+
+User = get_user_model()
+
+
+class SalesCubeTest(APITestCase):
+    def setUp(self):
+        self.vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        self.buyer = User.objects.create_user(username="buyer", email="buyer@example.com", password="pass12345")
+        self.laptops = Category.objects.create(name="Laptops")
+        self.phones = Category.objects.create(name="Phones")
+        self.laptop = Product.objects.create(vendor=self.vendor, name="Laptop", sku="L1", price=100, category=self.laptops)
+        self.phone = Product.objects.create(vendor=self.vendor, name="Phone", sku="P1", price=20, category=self.phones)
+        self.today = timezone.localdate()
+
+    def complete_order(self, lines, gateway="khalti"):
+        order = Order.objects.create(user=self.buyer, total_price=sum(p.price * q for p, q in lines))
+        OrderItem.objects.bulk_create([OrderItem(order=order, product=p, quantity=q, price=p.price) for p, q in lines])
+        Payment.objects.create(order=order, amount=order.total_price, gateway=gateway, status="completed")
+        order.status = "completed"
+        order.save()
+        return order
+
+    def cell(self, granularity, dimension, key=""):
+        return SalesCube.objects.get(granularity=granularity, dimension=dimension, key=str(key))
+
+    def cells(self):
+        return {
+            (c.granularity, c.bucket, c.dimension, c.key): (c.orders, c.units, c.revenue, c.refunded_orders)
+            for c in SalesCube.objects.exclude(orders=0, refunded_orders=0)
+        }
+
+    def test_order_lands_in_every_granularity_and_dimension(self):
+        self.complete_order([(self.laptop, 1), (self.phone, 2)])
+        self.complete_order([(self.phone, 1)], gateway="esewa")
+
+        for granularity in ("hour", "day", "month"):
+            shop = self.cell(granularity, "all")
+            self.assertEqual((shop.orders, shop.units, shop.revenue), (2, 4, Decimal("160.00")))
+
+        phones = self.cell("day", "category", self.phones.pk)
+        self.assertEqual((phones.orders, phones.units, phones.revenue), (2, 3, Decimal("60.00")))
+        self.assertEqual(self.cell("day", "gateway", "esewa").revenue, Decimal("20.00"))
+        self.assertEqual(self.cell("month", "vendor", self.vendor.pk).orders, 2)
+
+    def test_resave_is_idempotent_and_refund_moves_the_cells(self):
+        order = self.complete_order([(self.laptop, 1)])
+        order.save()
+        self.assertEqual(self.cell("day", "product", self.laptop.pk).orders, 1)
+
+        order.status = "refunded"
+        order.save()
+        laptop = self.cell("day", "product", self.laptop.pk)
+        self.assertEqual((laptop.orders, laptop.revenue, laptop.refunded_orders), (0, 0, 1))
+
+        order.delete()
+        self.assertFalse(SalesCube.objects.exclude(refunded_orders=0).exists())
+
+    def test_rebuild_matches_incremental_cells(self):
+        self.complete_order([(self.laptop, 2), (self.phone, 1)])
+        self.complete_order([(self.phone, 3)], gateway="esewa")
+        incremental = self.cells()
+
+        SalesCube.objects.update(orders=0, revenue=0)
+        rebuild_sales_reports(self.today, self.today)
+        self.assertEqual(self.cells(), incremental)
+
+    def test_cube_endpoint_groups_by_dimension(self):
+        self.complete_order([(self.laptop, 1), (self.phone, 2)])
+        self.client.force_authenticate(self.buyer)
+
+        response = self.client.get("/api/v1/sales-reports/cube/", {"interval": "month", "group_by": "category"})
+        self.assertEqual(response.status_code, 200)
+        revenue = {row["key"]: row["total_revenue"] for row in response.data["results"]}
+        self.assertEqual(revenue, {str(self.laptops.pk): Decimal("100.00"), str(self.phones.pk): Decimal("40.00")})
+
+        response = self.client.get("/api/v1/sales-reports/cube/", {"group_by": "colour"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_subtree_query_folds_descendant_categories(self):
+        electronics = Category.objects.create(name="Electronics")
+        for category in (self.laptops, self.phones):
+            category.parent = electronics
+            category.save()
+        self.complete_order([(self.laptop, 1), (self.phone, 2)])
+
+        rows = query_cube("month", self.today, self.today, group_by="category", keys=[electronics.pk], subtree=True)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["key"], str(electronics.pk))
+        self.assertEqual(rows[0]["total_revenue"], Decimal("140.00"))
+        self.assertEqual(rows[0]["units_sold"], 3)
+
+    def test_month_query_with_mid_month_start_keeps_the_month(self):
+        self.complete_order([(self.laptop, 1)])
+        month = self.today.replace(day=1)
+        start = month + timedelta(days=14)  # mid-month, possibly after today
+
+        rows = query_cube("month", start, start)
+        self.assertEqual([row["period"] for row in rows], [month])
+        self.assertEqual(rows[0]["total_revenue"], Decimal("100.00"))
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.analytics.models import OrderRollup, SalesReport
+from apps.orders.models import Order
+
+User = get_user_model()
+
+
+class SalesRollupTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="pass12345")
+        self.today = timezone.localdate()
+
+    def make_order(self, total, status="pending", days_ago=0):
+        order = Order.objects.create(user=self.user, total_price=total)
+        if days_ago:
+            Order.objects.filter(pk=order.pk).update(created_at=order.created_at - timedelta(days=days_ago))
+            order.refresh_from_db()
+        if status != "pending":
+            order.status = status
+            order.save()
+        return order
+
+    def report(self, day=None):
+        return SalesReport.objects.get(date=day or self.today)
+
+    def test_pending_orders_are_not_sales(self):
+        self.make_order(100)
+        self.assertFalse(SalesReport.objects.exists())
+        self.assertFalse(OrderRollup.objects.exists())
+
+    def test_completed_order_counts_once(self):
+        order = self.make_order(100, "completed")
+        order.save()
+        order.save(update_fields=["status"])
+        self.make_order(50, "completed")
+
+        report = self.report()
+        self.assertEqual((report.total_orders, report.total_revenue), (2, Decimal("150.00")))
+        self.assertEqual(report.average_order_value, Decimal("75.00"))
+
+    def test_transitions_move_the_contribution(self):
+        order = self.make_order(100, "completed")
+        order.status = "refunded"
+        order.save()
+        report = self.report()
+        self.assertEqual((report.total_orders, report.total_revenue, report.refunded_orders), (0, 0, 1))
+
+        order.delete()
+        self.assertEqual(self.report().refunded_orders, 0)
+        self.assertFalse(OrderRollup.objects.exists())
+
+    def test_keyed_by_order_date(self):
+        self.make_order(80, "completed", days_ago=3)
+        self.assertEqual(self.report(self.today - timedelta(days=3)).total_revenue, Decimal("80.00"))
+        self.assertFalse(SalesReport.objects.filter(date=self.today).exists())
+
+    def test_rebuild_command_repairs_a_range(self):
+        self.make_order(100, "completed")
+        self.make_order(40, "completed", days_ago=1)
+        self.make_order(10, "refunded", days_ago=1)
+        expected = {r.date: (r.total_orders, r.total_revenue, r.refunded_orders) for r in SalesReport.objects.all()}
+
+        SalesReport.objects.update(total_orders=99, total_revenue=0)
+        OrderRollup.objects.all().delete()
+        SalesReport.objects.create(date=self.today - timedelta(days=2), total_orders=5, total_revenue=5)
+
+        out = StringIO()
+        call_command("rebuild_sales_reports", "--start", str(self.today - timedelta(days=2)), stdout=out)
+        self.assertIn("2 day(s) with sales from 3 order(s)", out.getvalue())
+
+        rebuilt = {r.date: (r.total_orders, r.total_revenue, r.refunded_orders) for r in SalesReport.objects.all()}
+        self.assertEqual(rebuilt.pop(self.today - timedelta(days=2)), (0, 0, 0))
+        self.assertEqual(rebuilt, expected)
+        self.assertEqual(OrderRollup.objects.count(), 3)
+
+        # the rebuilt entries keep later transitions incremental
+        order = Order.objects.get(total_price=100)
+        order.status = "refunded"
+        order.save()
+        self.assertEqual(self.report().total_orders, 0)
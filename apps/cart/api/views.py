@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from apps.cart.models import Cart
 from apps.cart.api.serializers import CartSerializer
 from apps.cart.services import get_or_create_cart, add_to_cart, remove_from_cart, clear_cart
+from apps.products.services.inventory_service import InsufficientStock, hold_cart
 from rest_framework.decorators import action
 
 
@@ -57,4 +58,24 @@ class CartViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["delete"])
     def clear_cart(self, request, pk=None):
         clear_cart(request.user)
-        return Response({"detail": "Cart cleared"}, status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response({"detail": "Cart cleared"}, status=status.HTTP_204_NO_CONTENT)
+
+    # POST /api/carts/{pk}/reserve/
+    @action(detail=True, methods=["post"])
+    def reserve(self, request, pk=None):
+        """Hold the cart's stock for checkout; the hold expires on its own."""
+        cart = self.get_object()
+        try:
+            reservations = hold_cart(request.user, cart)
+        except InsufficientStock as e:
+            return Response(
+                {"detail": str(e), "available": e.shortages},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(
+            {
+                "items": [{"product_id": r.product_id, "quantity": r.quantity} for r in reservations],
+                "expires_at": reservations[0].expires_at if reservations else None,
+            },
+            status=status.HTTP_200_OK,
+        )
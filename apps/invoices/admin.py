@@ -4,8 +4,8 @@ from apps.invoices.models import Invoice
 
 @admin.register(Invoice)
 class InvoiceAdmin(admin.ModelAdmin):
-    list_display = ("invoice_number", "order", "status", "total_amount", "issued_at", "pdf_link")
-    list_filter = ("status", "invoice_type")
+    list_display = ("invoice_number", "order", "status", "total_amount", "issued_at", "pdf_status", "pdf_link")
+    list_filter = ("status", "invoice_type", "pdf_status")
     search_fields = ("invoice_number", "order__id", "order__user__username")
     readonly_fields = ("invoice_number", "issued_at", "created_at", "updated_at")
 
@@ -18,11 +18,9 @@ class InvoiceAdmin(admin.ModelAdmin):
     # pdf_link.short_description = "PDF"
 
     def regenerate_pdf(self, request, queryset):
-        from apps.invoices.pdf import generate_invoice_pdf_bytes
-        for inv in queryset:
-            pdf_bytes = generate_invoice_pdf_bytes(inv)
-            inv.attach_pdf_bytes(f"{inv.invoice_number}.pdf", pdf_bytes)
-        self.message_user(request, "Selected invoices regenerated.")
+        from apps.invoices.services.render_service import request_render
+        queued = request_render(list(queryset.values_list("pk", flat=True)))
+        self.message_user(request, f"Queued {queued} invoice PDF(s) for rendering.")
     regenerate_pdf.short_description = "Regenerate PDF for selected invoices"
 
     def mark_paid(self, request, queryset):
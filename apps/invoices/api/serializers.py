@@ -11,9 +11,15 @@ class InvoiceSerializer(serializers.ModelSerializer):
             "id", "invoice_number", "invoice_type", "status", "order_id",
             "subtotal", "tax_amount", "total_amount", "currency",
             "billing_address", "shipping_address", "issued_at", "due_date",
-            "pdf_url", "created_at", "updated_at"
+            "pdf_url", "pdf_status", "created_at", "updated_at"
         ]
         read_only_fields = fields
+
+    def get_pdf_url(self, obj):
+        request = self.context.get("request")
+        if obj.pdf:
+            return request.build_absolute_uri(obj.pdf.url) if request else obj.pdf.url
+        return None
 # apps/invoices/serializers.py
 from rest_framework import serializers
 from apps.invoices.models import Invoice
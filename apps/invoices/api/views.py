@@ -4,13 +4,23 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 
+from datetime import date
+
 from django.shortcuts import get_object_or_404
-from django.http import FileResponse, HttpResponse
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from django.urls import reverse
 
+from apps.invoices.delivery import get_delivery
 from apps.invoices.models import Invoice
 from apps.invoices.api.serializers import InvoiceSerializer, InvoiceCreateSerializer
+from apps.invoices.services.bulk_service import create_invoices_for_period, iter_invoice_zip, period_invoices
+from apps.invoices.services.render_service import request_render
 from apps.invoices.services.services import create_invoice_for_order
 
+# seconds a client should wait before polling a pending PDF again
+RENDER_RETRY_AFTER = 5
+
 class IsOwnerOrAdmin:
     """Simple class-based permission used inline (or implement as DRF Permission)."""
     def has_object_permission(self, request, view, obj):
@@ -25,7 +35,7 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         # list only for staff, retrieve for owner or staff
         if self.action == "list":
             return [IsAdminUser()]
-        if self.action in ["create_from_order"]:
+        if self.action in ["create_from_order", "bulk_create", "export"]:
             return [IsAdminUser()]
         return [IsAuthenticated()]
 
@@ -49,21 +59,121 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         order = get_object_or_404(Order, pk=order_id)
         inv = create_invoice_for_order(order, created_by=request.user, force=True)
         serializer = InvoiceSerializer(inv, context={"request": request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"], url_path="bulk-create", permission_classes=[IsAdminUser])
+    def bulk_create(self, request):
+        """
+        Admin: invoice every paid/completed order placed in a period that has
+        no invoice yet (one insert batch, gap-free numbers). PDFs are queued.
+        payload: { "start": "YYYY-MM-DD", "end": "YYYY-MM-DD" }
+        """
+        period = self.parse_period(request.data)
+        if isinstance(period, Response):
+            return period
+        numbers = create_invoices_for_period(*period, created_by=request.user)
+        return Response(
+            {
+                "created": len(numbers),
+                "first_invoice_number": numbers[0] if numbers else None,
+                "last_invoice_number": numbers[-1] if numbers else None,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["get"], url_path="export", permission_classes=[IsAdminUser])
+    def export(self, request):
+        """
+        Admin: ZIP of every invoice PDF for orders placed in ?start=&end=,
+        streamed as it is built. 202 while some PDFs are still rendering;
+        invoices whose render failed for good are left out (like the
+        export_invoices command) and counted in ``X-Invoices-Failed``.
+        """
+        period = self.parse_period(request.query_params)
+        if isinstance(period, Response):
+            return period
+        invoices = period_invoices(*period)
+        pending = invoices.filter(pdf_status__in=[Invoice.PdfStatuses.PENDING, Invoice.PdfStatuses.RENDERING])
+        if pending.exists():
+            return Response(
+                {"detail": "Some invoice PDFs are not rendered yet.", "pending": pending.count()},
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Retry-After": str(RENDER_RETRY_AFTER)},
+            )
+        start, end = period
+        failed = invoices.filter(pdf_status=Invoice.PdfStatuses.FAILED).count()
+        response = StreamingHttpResponse(
+            iter_invoice_zip(invoices.filter(pdf_status=Invoice.PdfStatuses.READY)), content_type="application/zip"
+        )
+        response["Content-Disposition"] = content_disposition_header(True, f"invoices_{start}_{end}.zip")
+        if failed:
+            response["X-Invoices-Failed"] = str(failed)
+        return response
+
+    def parse_period(self, data):
+        try:
+            start = date.fromisoformat(data.get("start") or "")
+            end = date.fromisoformat(data.get("end") or "")
+        except (TypeError, ValueError):
+            return Response({"detail": "start and end (YYYY-MM-DD) required"}, status=status.HTTP_400_BAD_REQUEST)
+        if end < start:
+            return Response({"detail": "end must not be before start"}, status=status.HTTP_400_BAD_REQUEST)
+        return start, end
 
 
     @action(detail=True, methods=["get"], url_path="download")
     def download(self, request, pk=None):
+        """
+        Serve the PDF once rendered, through the configured delivery backend
+        (signed storage URL or ranged streaming, 304 on a matching ETag).
+        Until then answer 202 with the render status and where to poll;
+        rendering never happens in the request.
+        """
         invoice = self.get_object()
         # permission: owner or staff
         if not (request.user.is_staff or invoice.order.user == request.user):
             raise PermissionDenied("Not allowed")
 
-        if not invoice.pdf:
-            # Optionally generate sync if missing (this could be long, but fallback)
-            from apps.invoices.pdf import generate_invoice_pdf_bytes
-            pdf_bytes = generate_invoice_pdf_bytes(invoice)
-            filename = f"{invoice.invoice_number or invoice.pk}.pdf"
-            invoice.attach_pdf_bytes(filename, pdf_bytes)
+        if invoice.pdf_status != Invoice.PdfStatuses.READY or not invoice.pdf:
+            return self.render_status_response(request, invoice)
+
+        return get_delivery().response(request, invoice)
+
+    @action(detail=True, methods=["get"], url_path="pdf-status")
+    def pdf_status(self, request, pk=None):
+        """Poll target of a 202 download: 200 with the URL once ready."""
+        invoice = self.get_object()
+        if invoice.pdf_status == Invoice.PdfStatuses.READY and invoice.pdf:
+            return Response({
+                "pdf_status": invoice.pdf_status,
+                "download_url": request.build_absolute_uri(reverse("invoice-download", args=[invoice.pk])),
+            })
+        return self.render_status_response(request, invoice)
+
+    @action(detail=True, methods=["post"], url_path="render", permission_classes=[IsAdminUser])
+    def queue_render(self, request, pk=None):
+        """Admin: queue the PDF for (re-)rendering."""
+        invoice = self.get_object()
+        request_render([invoice.pk])
+        invoice.refresh_from_db(fields=["pdf_status", "pdf_error"])
+        return self.render_status_response(request, invoice)
 
-            # Return a FileResponse streaming the file
-            return FileResponse(invoice.pdf.open("rb"), as_attachment=True, filename=invoice.pdf.name.split("/")[-1])
\ No newline at end of file
+    def render_status_response(self, request, invoice):
+        if invoice.pdf_status == Invoice.PdfStatuses.FAILED:
+            return Response(
+                {"pdf_status": invoice.pdf_status, "detail": "PDF rendering failed; an admin can re-queue it."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        pdf_status = invoice.pdf_status
+        if pdf_status == Invoice.PdfStatuses.READY:
+            # marked ready but the file is gone: render it again
+            request_render([invoice.pk])
+            pdf_status = Invoice.PdfStatuses.PENDING
+        return Response(
+            {
+                "pdf_status": pdf_status,
+                "poll_url": request.build_absolute_uri(reverse("invoice-pdf-status", args=[invoice.pk])),
+            },
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Retry-After": str(RENDER_RETRY_AFTER)},
+        )
@@ -0,0 +1,156 @@
+# apps/invoices/delivery.py
+"""
+How a rendered invoice PDF reaches the client.
+
+Backends
+--------
+``SignedUrlDelivery`` answers with a 302 to a short-lived signed URL from
+the storage itself (Cloudinary private download URL, or ``url(expire=...)``
+on storages that support it), so the bytes never pass through Python.
+``StreamingDelivery`` streams the file from the storage in chunks with
+``Range`` (single range, ``If-Range``) support; with the local filesystem
+storage it is the stand-in for tests and development. Pick one with
+``INVOICE_DELIVERY_BACKEND`` (dotted path); streaming is used when unset.
+
+Both answer ``If-None-Match`` with a 304 from the invoice row alone.
+"""
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.http import content_disposition_header, parse_etags
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = "apps.invoices.delivery.StreamingDelivery"
+DEFAULT_URL_TTL = 300
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def invoice_etag(invoice):
+    """Changes whenever a new PDF is attached (re-renders get a new file name)."""
+    return f'"{hashlib.md5(invoice.pdf.name.encode()).hexdigest()}"'
+
+
+def download_filename(invoice):
+    return invoice.pdf.name.rsplit("/", 1)[-1]
+
+
+class BaseDelivery:
+    def response(self, request, invoice):
+        etag = invoice_etag(invoice)
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in etags or "*" in etags:
+            response = HttpResponseNotModified()
+        else:
+            response = self.deliver(request, invoice, etag)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def deliver(self, request, invoice, etag):
+        raise NotImplementedError
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` (inclusive) for a single ``bytes=`` range, ``None`` to
+    send the whole file (no header, multiple ranges, or garbage) and
+    ``False`` when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _stream(storage, name, start, length):
+    with storage.open(name, "rb") as handle:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+
+class StreamingDelivery(BaseDelivery):
+    """Chunked streaming from the storage backend, with byte ranges."""
+
+    def deliver(self, request, invoice, etag):
+        storage, name = invoice.pdf.storage, invoice.pdf.name
+        size = storage.size(name)
+
+        byte_range = parse_range(request.headers.get("Range"), size)
+        if_range = request.headers.get("If-Range")
+        if if_range and if_range != etag:
+            byte_range = None  # the client's partial copy is outdated: send it all
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1 if size else 0
+        response = StreamingHttpResponse(
+            _stream(storage, name, start, length),
+            status=206 if byte_range else 200,
+            content_type="application/pdf",
+        )
+        if byte_range:
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(length)
+        response["Accept-Ranges"] = "bytes"
+        response["Content-Disposition"] = content_disposition_header(True, download_filename(invoice))
+        return response
+
+
+class SignedUrlDelivery(BaseDelivery):
+    """302 to a signed URL that expires after ``INVOICE_DOWNLOAD_URL_TTL`` seconds."""
+
+    def deliver(self, request, invoice, etag):
+        return HttpResponseRedirect(self.signed_url(invoice, self.ttl()))
+
+    def ttl(self):
+        return getattr(settings, "INVOICE_DOWNLOAD_URL_TTL", DEFAULT_URL_TTL)
+
+    def signed_url(self, invoice, ttl):
+        # django-storages S3/GCS style
+        return invoice.pdf.storage.url(invoice.pdf.name, expire=ttl)
+
+
+class CloudinarySignedDelivery(SignedUrlDelivery):
+    """Private, expiring Cloudinary download URL for the stored file."""
+
+    def signed_url(self, invoice, ttl):
+        from cloudinary.utils import private_download_url  # local import: cloudinary is optional here
+
+        public_id = invoice.pdf.name.rsplit(".", 1)[0]
+        return private_download_url(
+            public_id,
+            "pdf",
+            resource_type=getattr(settings, "INVOICE_CLOUDINARY_RESOURCE_TYPE", "image"),
+            attachment=True,
+            expires_at=int(time.time()) + ttl,
+        )
+
+
+def get_delivery():
+    return import_string(getattr(settings, "INVOICE_DELIVERY_BACKEND", DEFAULT_BACKEND))()
@@ -0,0 +1,48 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.invoices.models import Invoice
+from apps.invoices.services.bulk_service import create_invoices_for_period, iter_invoice_zip, period_invoices
+from apps.invoices.services.render_service import render_all_pending, shutdown_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Invoice every eligible order placed in a period, render the missing PDFs in parallel "
+        "and write them to a ZIP archive for accounting."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat, required=True, help="First day, YYYY-MM-DD.")
+        parser.add_argument("--end", type=date.fromisoformat, required=True, help="Last day, YYYY-MM-DD.")
+        parser.add_argument("--output", help="ZIP file to write (default: invoices_<start>_<end>.zip).")
+        parser.add_argument("--workers", type=int, help="Render processes (default: INVOICE_RENDER_WORKERS).")
+        parser.add_argument("--no-create", action="store_true", help="Only export invoices that already exist.")
+
+    def handle(self, *args, **options):
+        start, end = options["start"], options["end"]
+        if end < start:
+            raise CommandError("--end must not be before --start.")
+
+        if not options["no_create"]:
+            numbers = create_invoices_for_period(start, end)
+            if numbers:
+                self.stdout.write(f"Issued {len(numbers)} invoice(s): {numbers[0]}..{numbers[-1]}.")
+
+        try:
+            result = render_all_pending(workers=options["workers"])
+        finally:
+            shutdown_pool()
+        self.stdout.write(f"{result['rendered']} PDF(s) rendered, {result['failed']} failed.")
+
+        invoices = period_invoices(start, end)
+        missing = invoices.exclude(pdf_status=Invoice.PdfStatuses.READY).count()
+        if missing:
+            self.stderr.write(f"{missing} invoice(s) have no PDF and are left out of the archive.")
+
+        output = options["output"] or f"invoices_{start}_{end}.zip"
+        with open(output, "wb") as archive:
+            for chunk in iter_invoice_zip(invoices.filter(pdf_status=Invoice.PdfStatuses.READY)):
+                archive.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {invoices.count() - missing} invoice(s) to {output}."))
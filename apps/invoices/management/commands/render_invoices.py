@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.invoices.services.render_service import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    render_all_pending,
+    shutdown_pool,
+)
+
+
+class Command(BaseCommand):
+    help = "Render pending invoice PDFs in a process pool, once or keep polling with --loop (a worker without Celery)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Invoices per pool task.")
+        parser.add_argument("--workers", type=int, help="Render processes (default: INVOICE_RENDER_WORKERS).")
+        parser.add_argument("--loop", action="store_true", help="Keep polling until interrupted.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to sleep when idle (with --loop).")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                result = render_all_pending(
+                    batch_size=options["batch_size"], chunk_size=options["chunk_size"], workers=options["workers"]
+                )
+                if result["claimed"] or not options["loop"]:
+                    self.stdout.write(f"{result['rendered']} invoice PDF(s) rendered, {result['failed']} failed.")
+                if not options["loop"]:
+                    return
+                if not result["claimed"]:
+                    time.sleep(options["interval"])
+        finally:
+            shutdown_pool()
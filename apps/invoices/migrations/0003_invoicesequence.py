@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0002_invoice_pdf_render_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(default='invoice', max_length=30, unique=True)),
+                ('last_number', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
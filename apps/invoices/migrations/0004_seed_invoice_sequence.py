@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:30
+
+from django.db import migrations
+from django.db.models import Max
+
+
+def seed_invoice_sequence(apps, schema_editor):
+    # invoices numbered before the sequence existed used INV<date><pk:06d>;
+    # start above the highest pk so new numbers never collide with them
+    Invoice = apps.get_model("invoices", "Invoice")
+    InvoiceSequence = apps.get_model("invoices", "InvoiceSequence")
+    highest = Invoice.objects.aggregate(highest=Max("pk"))["highest"] or 0
+    sequence, _ = InvoiceSequence.objects.get_or_create(key="invoice")
+    if sequence.last_number < highest:
+        sequence.last_number = highest
+        sequence.save(update_fields=["last_number"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0003_invoicesequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_invoice_sequence, migrations.RunPython.noop),
+    ]
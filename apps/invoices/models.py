@@ -11,6 +11,39 @@ class InvoiceQuerySet(models.QuerySet):
     def issued(self):
         return self.filter(status="issued")
 
+    def pdf_pending(self):
+        return self.filter(pdf_status=Invoice.PdfStatuses.PENDING)
+
+class InvoiceSequence(models.Model):
+    """
+    Gap-free invoice numbering: one row per series, its last issued number
+    updated under a row lock in the transaction that inserts the invoices.
+    """
+    key = models.CharField(max_length=30, unique=True, default="invoice")
+    last_number = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key}: {self.last_number}"
+
+    @classmethod
+    def lock(cls, key="invoice"):
+        """Lock the series row (created on first use) until the transaction ends."""
+        cls.objects.get_or_create(key=key)
+        return cls.objects.select_for_update().get(key=key)
+
+    @classmethod
+    def allocate(cls, count, key="invoice"):
+        """
+        Reserve ``count`` consecutive numbers. Must run inside the
+        transaction that uses them, so a rollback gives them back.
+        """
+        sequence = cls.lock(key)
+        first = sequence.last_number + 1
+        sequence.last_number += count
+        sequence.save(update_fields=["last_number"])
+        return range(first, first + count)
+
+
 class Invoice(models.Model):
     """Flexible invoice record. Can store invoice PDF and billing snapshot."""
     class Types(models.TextChoices):
@@ -25,6 +58,12 @@ class Invoice(models.Model):
         CANCELLED = "cancelled", "Cancelled"
         REFUNDED = "refunded", "Refunded"
 
+    class PdfStatuses(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RENDERING = "rendering", "Rendering"
+        READY = "ready", "Ready"
+        FAILED = "failed", "Failed"
+
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="invoices")
     invoice_type = models.CharField(max_length=30, choices=Types.choices, default=Types.INVOICE)
     invoice_number = models.CharField(max_length=64, unique=True, blank=True)
@@ -43,6 +82,12 @@ class Invoice(models.Model):
     shipping_address = models.JSONField(default=dict, blank=True)
 
     pdf = models.FileField(upload_to="invoices/%Y/%m/%d/", null=True, blank=True)
+    # render pipeline state (see apps.invoices.services.render_service)
+    pdf_status = models.CharField(max_length=10, choices=PdfStatuses.choices, default=PdfStatuses.PENDING)
+    pdf_attempts = models.PositiveSmallIntegerField(default=0)
+    pdf_locked_until = models.DateTimeField(null=True, blank=True)  # claim lease of a render worker
+    pdf_claimed_by = models.CharField(max_length=32, blank=True)
+    pdf_error = models.TextField(blank=True)
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     status = models.CharField(max_length=20, choices=Statuses.choices, default=Statuses.DRAFT)
 
@@ -58,32 +103,39 @@ class Invoice(models.Model):
         indexes = [
             models.Index(fields=["invoice_number"]),
             models.Index(fields=["order", "issued_at"]),
+            models.Index(fields=["pdf_status", "pdf_locked_until"]),
+            models.Index(fields=["pdf_claimed_by"]),
         ]
 
     def __str__(self):
         return self.invoice_number or f"Invoice #{self.pk}"
     
+    @staticmethod
+    def format_invoice_number(number, issued_at):
+        """INVYYYYMMDD000001: issue date + zero-padded gap-free sequence number."""
+        return f"INV{timezone.localtime(issued_at).strftime('%Y%m%d')}{number:06d}"
+
     def generate_invoice_number(self):
-        """Create human-friendly invoice number once id exists.
-        Format: INVYYYYMMDD000001 (date + zero-padded id)
-        """
-        date = timezone.now().strftime("%Y%m%d")
-        return f"INV{date}{self.pk:06d}"
+        """Allocate the next number; call inside the transaction that saves it."""
+        number = InvoiceSequence.allocate(1)[0]
+        return self.format_invoice_number(number, self.issued_at or timezone.now())
     
     def mark_issued(self, issued_at=None):
         if issued_at is None:
             issued_at = timezone.now()
         self.issued_at = issued_at
-        if not self.invoice_number:
-            self.invoice_number = self.generate_invoice_number()
-        self.status = Invoice.Statuses.ISSUED
-        self.save(update_fields=["issued_at", "invoice_number", "status", "updated_at"])
+        # same transaction as the number allocation: a failed save leaves no gap
+        with transaction.atomic():
+            if not self.invoice_number:
+                self.invoice_number = self.generate_invoice_number()
+            self.status = Invoice.Statuses.ISSUED
+            self.save(update_fields=["issued_at", "invoice_number", "status", "updated_at"])
 
-    def attach_pdf_bytes(self, filename: str, pdf_bytes: bytes):
-        """Save PDF bytes into the FileField (atomic)."""
+    def attach_pdf_bytes(self, filename: str, pdf_bytes: bytes, save: bool = True):
+        """Save PDF bytes into the FileField; ``save=False`` stores the file only."""
         if not filename.endswith(".pdf"):
             filename = f"{filename}.pdf"
         path = f"invoices/{self.issued_at.strftime('%Y/%m/%d') if self.issued_at else timezone.now().strftime('%Y/%m/%d')}/{filename}"
         # Save using default storage
         content = ContentFile(pdf_bytes)
-        self.pdf.save(path.split("/", 1)[-1], content, save=True)  # Save triggers file store and updates model
\ No newline at end of file
+        self.pdf.save(path.split("/", 1)[-1], content, save=save)  # Save triggers file store and updates model
\ No newline at end of file
@@ -1,26 +1,59 @@
 # apps/invoices/pdf.py
-import os
+from functools import lru_cache
 from django.conf import settings
-from django.template.loader import render_to_string
-from django.core.files.base import ContentFile
+from django.template.loader import get_template
 
 from io import BytesIO
 
 # WeasyPrint recommended (pip install weasyprint)
 try:
     from weasyprint import HTML, CSS
+    from weasyprint.text.fonts import FontConfiguration
     WEASYPRINT_AVAILABLE = True
 except Exception:
     WEASYPRINT_AVAILABLE = False
 
 from apps.invoices.models import Invoice
 
+INVOICE_TEMPLATE = "invoices/invoice.html"
+
+
+# Per-process render caches: the compiled template, the parsed stylesheet and
+# the font configuration (fontconfig scan + @font-face downloads) are built
+# once per worker and reused for every invoice it renders.
+@lru_cache(maxsize=None)
+def invoice_template():
+    return get_template(INVOICE_TEMPLATE)
+
+
+@lru_cache(maxsize=None)
+def font_config():
+    return FontConfiguration()
+
+
+@lru_cache(maxsize=None)
+def invoice_stylesheets():
+    css_path = getattr(settings, "INVOICE_PDF_CSS", None)
+    if not css_path:
+        return ()
+    return (CSS(filename=css_path, font_config=font_config()),)
+
+
+def warm_render_caches():
+    """Build the per-process caches up front (render worker initializer)."""
+    invoice_template()
+    if WEASYPRINT_AVAILABLE:
+        invoice_stylesheets()
+
+
 def render_invoice_html(invoice: Invoice) -> str:
     """Populate the invoice template and return rendered HTML."""
     order = invoice.order
     context = {
         "invoice": invoice,
         "order": order,
+        # uses the order's prefetched items when the caller loaded them
+        "items": order.items.all(),
         "company": {
             "name": getattr(settings, "COMPANY_NAME", "My Shop"),
             "address": getattr(settings, "COMPANY_ADDRESS", ""),
@@ -29,8 +62,7 @@ def render_invoice_html(invoice: Invoice) -> str:
         },
         "generated_at": invoice.issued_at or invoice.created_at,
     }
-    html = render_to_string("invoices/invoice.html", context)
-    return html
+    return invoice_template().render(context)
 
 def generate_invoice_pdf_bytes(invoice: Invoice) -> bytes:
     """Return PDF bytes for given invoice."""
@@ -40,14 +72,7 @@ def generate_invoice_pdf_bytes(invoice: Invoice) -> bytes:
         # Base url helps with static files resolution
         base_url = settings.STATIC_ROOT or settings.BASE_DIR
         html = HTML(string=html_string, base_url=base_url)
-        # Optionally pass CSS
-        css_path = getattr(settings, "INVOICE_PDF_CSS", None)
-        if css_path:
-            css = CSS(filename=css_path)
-            pdf_bytes = html.write_pdf(stylesheets=[css])
-        else:
-            pdf_bytes = html.write_pdf()
-        return pdf_bytes
+        return html.write_pdf(stylesheets=list(invoice_stylesheets()), font_config=font_config())
     else:
         # Fallback minimal PDF using reportlab if WeasyPrint is not installed
         from reportlab.lib.pagesizes import A4
@@ -63,16 +88,12 @@ def generate_invoice_pdf_bytes(invoice: Invoice) -> bytes:
         buffer.close()
         return pdf_bytes
 
-# Celery scheduling helper (task lives in apps.invoices.tasks)
 def schedule_generate_invoice_pdf(invoice_id: int):
-    """Schedule PDF generation via Celery if available, else generate sync."""
-    try:
-        from apps.invoices.tasks import generate_invoice_pdf_task
-        # If Celery is configured, this will push task to broker (async)
-        generate_invoice_pdf_task.delay(invoice_id)
-    except Exception:
-        # fallback: synchronous generation
-        invoice = Invoice.objects.get(pk=invoice_id)
-        pdf_bytes = generate_invoice_pdf_bytes(invoice)
-        filename = f"{invoice.invoice_number}.pdf"
-        invoice.attach_pdf_bytes(filename, pdf_bytes)
+    """
+    Queue the invoice for the render pipeline. Never renders in the calling
+    process: without a Celery broker the invoice stays pending until the
+    `render_invoices` worker (or the next scheduled run) picks it up.
+    """
+    from apps.invoices.services.render_service import request_render  # local import to avoid cycles
+
+    request_render([invoice_id])
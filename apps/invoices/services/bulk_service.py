@@ -0,0 +1,144 @@
+# apps/invoices/services/bulk_service.py
+"""
+Period invoicing for accounting.
+
+``create_invoices_for_period`` issues an invoice for every eligible order
+placed in a date range that has none yet: one query for the orders, one
+``bulk_create`` for the invoices and a single block of gap-free numbers taken
+from ``InvoiceSequence`` in the same transaction. Holding the sequence lock
+while the orders are selected also keeps two concurrent runs from invoicing
+the same order twice. The PDFs go through the render pipeline.
+
+``iter_invoice_zip`` streams a ZIP archive of rendered PDFs chunk by chunk:
+each file is copied from the storage into the archive and handed to the
+client before the next one is opened, so memory stays flat however large
+the period is.
+"""
+import io
+import zipfile
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from apps.invoices.models import Invoice, InvoiceSequence
+from apps.invoices.services.render_service import request_render
+from apps.invoices.services.services import compute_invoice_amounts
+from apps.orders.models import Order
+
+ELIGIBLE_ORDER_STATUSES = ("paid", "completed")
+INVOICED_STATUSES = (Invoice.Statuses.ISSUED, Invoice.Statuses.PAID, Invoice.Statuses.REFUNDED)
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+def period_bounds(start, end):
+    """Aware datetimes covering the local days ``start``..``end`` inclusive."""
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+def uninvoiced_orders(start, end):
+    lower, upper = period_bounds(start, end)
+    invoiced = Invoice.objects.filter(
+        order=OuterRef("pk"), invoice_type=Invoice.Types.INVOICE, status__in=INVOICED_STATUSES
+    )
+    return (
+        Order.objects.filter(created_at__gte=lower, created_at__lt=upper, status__in=ELIGIBLE_ORDER_STATUSES)
+        .exclude(Exists(invoiced))
+        .order_by("created_at", "pk")
+    )
+
+
+def create_invoices_for_period(start, end, created_by=None, batch_size=500):
+    """
+    Issue invoices for the eligible, not yet invoiced orders placed between
+    ``start`` and ``end`` and queue their PDFs. Returns the new invoices'
+    numbers, in order.
+    """
+    currency = getattr(settings, "DEFAULT_CURRENCY", "NPR")
+    with transaction.atomic():
+        InvoiceSequence.lock()
+        orders = list(uninvoiced_orders(start, end).only("pk", "total_price", "created_at"))
+        if not orders:
+            return []
+
+        issued_at = timezone.now()
+        invoices = []
+        for order, number in zip(orders, InvoiceSequence.allocate(len(orders))):
+            subtotal, tax_amount, total = compute_invoice_amounts(order)
+            invoices.append(Invoice(
+                order=order,
+                invoice_type=Invoice.Types.INVOICE,
+                invoice_number=Invoice.format_invoice_number(number, issued_at),
+                issued_at=issued_at,
+                subtotal=subtotal,
+                tax_amount=tax_amount,
+                total_amount=total,
+                currency=currency,
+                created_by=created_by,
+                status=Invoice.Statuses.ISSUED,
+            ))
+        Invoice.objects.bulk_create(invoices, batch_size=batch_size)
+
+        numbers = [invoice.invoice_number for invoice in invoices]
+        # MySQL does not return the new primary keys from a bulk insert
+        ids = list(Invoice.objects.filter(invoice_number__in=numbers).values_list("pk", flat=True))
+        request_render(ids)
+    return numbers
+
+
+def period_invoices(start, end):
+    """Issued invoices for orders placed in the period, in number order."""
+    lower, upper = period_bounds(start, end)
+    return Invoice.objects.filter(
+        order__created_at__gte=lower,
+        order__created_at__lt=upper,
+        invoice_type=Invoice.Types.INVOICE,
+        status__in=INVOICED_STATUSES,
+    ).order_by("invoice_number")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable target for ZipFile that hands out what was written."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_invoice_zip(invoices):
+    """
+    Yield a ZIP archive of the invoices' PDFs (stored, not deflated: PDFs are
+    already compressed), one storage chunk at a time.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for invoice in invoices.iterator(chunk_size=200):
+            if not invoice.pdf:
+                continue
+            stamp = timezone.localtime(invoice.issued_at or invoice.created_at)
+            info = zipfile.ZipInfo(f"{invoice.invoice_number}.pdf", date_time=stamp.timetuple()[:6])
+            with invoice.pdf.open("rb") as source, archive.open(info, mode="w") as target:
+                while chunk := source.read(COPY_CHUNK_SIZE):
+                    target.write(chunk)
+                    if data := sink.drain():
+                        yield data
+    # the central directory is written when the archive closes
+    if data := sink.drain():
+        yield data
@@ -0,0 +1,234 @@
+# apps/invoices/services/render_service.py
+"""
+Invoice PDF render pipeline.
+
+Invoices that need a PDF wait with ``pdf_status="pending"``; nothing renders
+inside a web request. ``render_pending()`` is the worker: it claims a batch
+of due invoices with a conditional UPDATE and a lease (the outbox pattern, so
+several workers can run side by side and a crashed worker's batch is picked
+up again), splits it into chunks and renders each chunk in a bounded process
+pool (inline with ``workers=1``, which is what the Celery task uses: its
+daemonic worker processes may not start children of their own). A chunk loads its invoices, orders and line items in three queries and
+reuses the per-process template, stylesheet and font caches of
+``apps.invoices.pdf`` across every invoice it renders.
+
+Failures go back to pending up to ``INVOICE_RENDER_MAX_ATTEMPTS`` and are
+then parked as ``failed`` with the traceback in ``pdf_error``; a pool that
+breaks hands the rest of its batch back the same way.
+"""
+import logging
+import os
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from apps.invoices.models import Invoice
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_CHUNK_SIZE = 10
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+_pool = None
+
+
+def render_workers():
+    return getattr(settings, "INVOICE_RENDER_WORKERS", min(4, os.cpu_count() or 1))
+
+
+def request_render(invoice_ids):
+    """
+    Queue ``invoice_ids`` for (re-)rendering and, when Celery is configured,
+    kick a render run after the current transaction commits.
+    """
+    queued = Invoice.objects.filter(pk__in=invoice_ids).update(
+        pdf_status=Invoice.PdfStatuses.PENDING, pdf_attempts=0, pdf_locked_until=None, pdf_error=""
+    )
+    if queued and getattr(settings, "INVOICE_RENDER_DISPATCH_ON_COMMIT", False):
+        transaction.on_commit(_dispatch_render_task)
+    return queued
+
+
+def _dispatch_render_task():
+    try:
+        from apps.invoices.tasks import render_pending_invoices  # local import: celery is optional here
+
+        render_pending_invoices.delay()
+    except Exception:
+        # the invoices stay pending for the next scheduled run / render_invoices worker
+        logger.exception("Could not dispatch the invoice render task")
+
+
+def _claim(batch_size, lease_seconds):
+    now = timezone.now()
+    due = Q(pdf_status=Invoice.PdfStatuses.PENDING) | Q(
+        pdf_status=Invoice.PdfStatuses.RENDERING, pdf_locked_until__lt=now  # a dead worker's lease ran out
+    )
+    ids = list(Invoice.objects.filter(due).order_by("id").values_list("id", flat=True)[:batch_size])
+    if not ids:
+        return None, []
+    token = uuid.uuid4().hex
+    # only rows still due when the UPDATE runs are ours
+    Invoice.objects.filter(due, pk__in=ids).update(
+        pdf_status=Invoice.PdfStatuses.RENDERING,
+        pdf_claimed_by=token,
+        pdf_locked_until=now + timedelta(seconds=lease_seconds),
+    )
+    return token, list(
+        Invoice.objects.filter(pdf_claimed_by=token, pdf_status=Invoice.PdfStatuses.RENDERING)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+
+def _max_attempts():
+    return getattr(settings, "INVOICE_RENDER_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+
+
+def _release(token, error):
+    """
+    Hand the still-rendering invoices of claim ``token`` back as a failed
+    attempt, so a batch that keeps breaking its worker ends up ``failed``
+    instead of being re-claimed forever.
+    """
+    # pdf_status is assigned before pdf_attempts, so its CASE reads the old count
+    return Invoice.objects.filter(pdf_claimed_by=token, pdf_status=Invoice.PdfStatuses.RENDERING).update(
+        pdf_status=Case(
+            When(pdf_attempts__gte=_max_attempts() - 1, then=Value(Invoice.PdfStatuses.FAILED)),
+            default=Value(Invoice.PdfStatuses.PENDING),
+        ),
+        pdf_attempts=F("pdf_attempts") + 1,
+        pdf_locked_until=None,
+        pdf_error=error[-4000:],
+    )
+
+
+def render_batch(invoice_ids):
+    """
+    Render and store the PDFs of the claimed ``invoice_ids`` in this process.
+    Returns ``(rendered, failed)`` counts.
+    """
+    from apps.invoices.pdf import generate_invoice_pdf_bytes  # local import to avoid cycles
+
+    max_attempts = _max_attempts()
+    invoices = (
+        Invoice.objects.filter(pk__in=invoice_ids, pdf_status=Invoice.PdfStatuses.RENDERING)
+        .select_related("order__user")
+        .prefetch_related("order__items__product")
+    )
+    rendered = failed = 0
+    for invoice in invoices:
+        mine = Invoice.objects.filter(
+            pk=invoice.pk, pdf_claimed_by=invoice.pdf_claimed_by, pdf_status=Invoice.PdfStatuses.RENDERING
+        )
+        attempts = invoice.pdf_attempts + 1
+        try:
+            pdf_bytes = generate_invoice_pdf_bytes(invoice)
+            # store the file only: a full-row save() would write our stale
+            # render state over a worker/admin that took the invoice since
+            invoice.attach_pdf_bytes(
+                f"{invoice.invoice_number or 'invoice'}_{invoice.pk}.pdf", pdf_bytes, save=False
+            )
+            if mine.update(
+                pdf=invoice.pdf.name,
+                pdf_status=Invoice.PdfStatuses.READY,
+                pdf_attempts=attempts,
+                pdf_locked_until=None,
+                pdf_error="",
+            ):
+                rendered += 1
+            else:
+                logger.warning("Lost the render lease of invoice %s; discarding its PDF", invoice.pk)
+                invoice.pdf.delete(save=False)
+        except Exception:
+            logger.exception("Rendering invoice %s failed", invoice.pk)
+            mine.update(
+                pdf_status=Invoice.PdfStatuses.FAILED if attempts >= max_attempts else Invoice.PdfStatuses.PENDING,
+                pdf_attempts=attempts,
+                pdf_locked_until=None,
+                pdf_error=traceback.format_exc()[-4000:],
+            )
+            failed += 1
+    return rendered, failed
+
+
+def _init_worker():
+    from apps.invoices.pdf import warm_render_caches  # local import to avoid cycles
+
+    warm_render_caches()
+
+
+def _get_pool(workers):
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def _drop_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def render_pending(
+    batch_size=DEFAULT_BATCH_SIZE, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, lease_seconds=DEFAULT_LEASE_SECONDS
+):
+    """
+    Claim one batch of pending invoices and render it, chunk by chunk, in
+    the process pool (inline with ``workers=1``). Returns
+    ``{"claimed": n, "rendered": n, "failed": n}``.
+    """
+    workers = workers or render_workers()
+    token, ids = _claim(batch_size, lease_seconds)
+    chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+    if workers <= 1 or len(chunks) <= 1:
+        results = [render_batch(chunk) for chunk in chunks]
+    else:
+        try:
+            # forked workers must open their own connections, not share ours
+            connections.close_all()
+            results = list(_get_pool(workers).map(render_batch, chunks))
+        except Exception:
+            # e.g. a daemonic process may not have children, or a child died:
+            # whatever the pool did not finish counts as one failed attempt
+            logger.exception("Invoice render pool failed; releasing the batch")
+            _drop_pool()
+            _release(token, traceback.format_exc())
+            rendered = Invoice.objects.filter(pdf_claimed_by=token, pdf_status=Invoice.PdfStatuses.READY).count()
+            return {"claimed": len(ids), "rendered": rendered, "failed": len(ids) - rendered}
+
+    return {
+        "claimed": len(ids),
+        "rendered": sum(rendered for rendered, _ in results),
+        "failed": sum(failed for _, failed in results),
+    }
+
+
+def render_all_pending(**options):
+    """Render batch after batch until nothing is due (failed invoices are parked)."""
+    batch_size = options.get("batch_size", DEFAULT_BATCH_SIZE)
+    totals = {"claimed": 0, "rendered": 0, "failed": 0}
+    while True:
+        result = render_pending(**options)
+        for key in totals:
+            totals[key] += result[key]
+        if result["claimed"] < batch_size:
+            return totals
@@ -1,35 +1,28 @@
 # apps/invoices/signals.py
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from django.conf import settings
-
+from apps.orders.models import Order
+from apps.outbox.services.outbox_service import subscriber
 from apps.payments.models import Payment
+from apps.payments.signals import PAYMENT_SAVED
 from apps.invoices.services.services import create_invoice_for_order
 
-import logging
-
 
-@receiver(post_save, sender=Payment)
-def payment_post_save(sender, instance: Payment, created, **kwargs):
+@subscriber(PAYMENT_SAVED)
+def create_invoice_on_payment(payload):
     """
     Auto-create invoice when a payment status becomes 'completed'.
-    Only for certain gateways/policies; this prevents generating invoices for COD pending.
+    Runs in the outbox worker; an exception here is retried with backoff
+    instead of breaking the payment request.
     """
-    try:
-        if instance.status == "completed":
-            order = instance.order
-            # create invoice if order paid/completed
-            try:
-                create_invoice_for_order(order, created_by=instance.order.user)
-            except Exception:
-                # swallow: we don't want to break payment logic; log instead
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.exception("Failed to create invoice for order %s", order.pk)
-    except Exception:
-        pass
-             
+    if payload["status"] != "completed":
+        return
+    payment = Payment.objects.select_related("order__user").filter(pk=payload["payment_id"]).first()
+    if payment is None:
+        return
+    order = Order.objects.with_payment_totals().get(pk=payment.order_id)
+    if not order.is_fully_paid:
+        return  # partial payment: the completing payment creates the invoice
+    # raises (and is retried) until the order status update has run;
+    # returns the existing issued invoice on repeats
+    create_invoice_for_order(order, created_by=payment.order.user)
+
 # You can add more signal handlers as needed.
-    # swallow all: signals must not break main flow; log instead
-    logger = logging.getLogger(__name__)
-    logger.exception("Error in payment_post_save signal for Payment %s", instance.pk)  
\ No newline at end of file
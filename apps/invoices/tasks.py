@@ -1,22 +1,23 @@
 # apps/invoices/tasks.py
 from celery import shared_task
-from django.db import transaction
 
-from apps.invoices.models import Invoice
-from apps.invoices.pdf import generate_invoice_pdf_bytes
+from apps.invoices.services.render_service import render_all_pending, request_render
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=10)
-def generate_invoice_pdf_task(self, invoice_id):
+
+@shared_task
+def render_pending_invoices(batch_size=50):
     """
-    Celery task: generate PDF bytes and attach to invoice.
-    Retries on transient failures.
+    Render every pending invoice PDF inline in this worker (Celery's pool
+    processes are daemonic and cannot start a render pool; scale with
+    worker concurrency instead). Kicked after commit when
+    INVOICE_RENDER_DISPATCH_ON_COMMIT is set; schedule it with celery beat
+    as well so nothing waits for a lost message.
     """
-    try:
-        invoice = Invoice.objects.select_for_update().get(pk=invoice_id)
-        pdf_bytes = generate_invoice_pdf_bytes(invoice)
-        filename = f"{invoice.invoice_number or 'invoice'}_{invoice.pk}.pdf"
-        # attach file (saves the instance)
-        invoice.attach_pdf_bytes(filename, pdf_bytes)
-    except Exception as exc:
-        # Optionally implement backoff / alerting
-        raise self.retry(exc=exc)
+    return render_all_pending(batch_size=batch_size, workers=1)
+
+
+@shared_task
+def generate_invoice_pdf_task(invoice_id):
+    """Kept for messages queued before the render pipeline: queue and render."""
+    request_render([invoice_id])
+    return render_all_pending(workers=1)
@@ -0,0 +1,92 @@
+import io
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.invoices.models import Invoice
+from apps.invoices.services.render_service import render_pending
+from apps.invoices.services.services import create_invoice_for_order
+from apps.orders.models import Order
+
+User = get_user_model()
+
+
+class BulkInvoiceExportTest(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.admin = User.objects.create_user(
+            username="accounting", email="accounting@example.com", password="pass12345", is_staff=True
+        )
+        self.buyer = User.objects.create_user(username="buyer", email="buyer@example.com", password="pass12345")
+        self.client.force_authenticate(self.admin)
+        self.today = str(timezone.localdate())
+        self.period = {"start": self.today, "end": self.today}
+
+    def order(self, status="paid"):
+        return Order.objects.create(user=self.buyer, total_price=100, status=status)
+
+    def test_bulk_create_issues_gap_free_numbers_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_invoice_for_order(self.order())
+        for _ in range(3):
+            self.order()
+        self.order(status="pending")
+
+        response = self.client.post("/api/v1/invoices/bulk-create/", self.period, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 3)
+
+        numbers = sorted(int(n[-6:]) for n in Invoice.objects.values_list("invoice_number", flat=True))
+        self.assertEqual(numbers, [1, 2, 3, 4])
+
+        again = self.client.post("/api/v1/invoices/bulk-create/", self.period, format="json")
+        self.assertEqual(again.data["created"], 0)
+
+    def test_export_streams_a_zip_once_rendered(self):
+        for _ in range(2):
+            self.order()
+        self.client.post("/api/v1/invoices/bulk-create/", self.period, format="json")
+
+        pending = self.client.get("/api/v1/invoices/export/", self.period)
+        self.assertEqual(pending.status_code, 202)
+        self.assertEqual(pending.data["pending"], 2)
+
+        with mock.patch("apps.invoices.pdf.generate_invoice_pdf_bytes", return_value=b"%PDF-1.4 fake"):
+            render_pending(workers=1)
+
+        response = self.client.get("/api/v1/invoices/export/", self.period)
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        numbers = sorted(Invoice.objects.values_list("invoice_number", flat=True))
+        self.assertEqual(archive.namelist(), [f"{number}.pdf" for number in numbers])
+        self.assertEqual(archive.read(archive.namelist()[0]), b"%PDF-1.4 fake")
+
+    def test_export_skips_failed_renders(self):
+        for _ in range(2):
+            self.order()
+        self.client.post("/api/v1/invoices/bulk-create/", self.period, format="json")
+        broken, ok = Invoice.objects.order_by("invoice_number")
+        Invoice.objects.filter(pk=broken.pk).update(pdf_status=Invoice.PdfStatuses.FAILED)
+
+        with mock.patch("apps.invoices.pdf.generate_invoice_pdf_bytes", return_value=b"%PDF-1.4 fake"):
+            render_pending(workers=1)
+
+        response = self.client.get("/api/v1/invoices/export/", self.period)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Invoices-Failed"], "1")
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), [f"{ok.invoice_number}.pdf"])
+
+    def test_export_requires_a_period(self):
+        self.assertEqual(self.client.get("/api/v1/invoices/export/").status_code, 400)
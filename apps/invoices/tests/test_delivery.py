@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from apps.invoices.models import Invoice
+from apps.orders.models import Order
+
+User = get_user_model()
+
+PDF = b"%PDF-1.4 " + bytes(range(256)) * 4
+
+
+class InvoiceDeliveryTest(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, INVOICE_DELIVERY_BACKEND="apps.invoices.delivery.StreamingDelivery"
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="pass12345")
+        self.client.force_authenticate(self.user)
+        order = Order.objects.create(user=self.user, total_price=100, status="paid")
+        self.invoice = Invoice.objects.create(
+            order=order, subtotal=100, total_amount=100, pdf_status=Invoice.PdfStatuses.READY
+        )
+        self.invoice.attach_pdf_bytes("INV-1.pdf", PDF)
+        self.url = f"/api/v1/invoices/{self.invoice.pk}/download/"
+
+    def test_full_download_streams_with_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), PDF)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Length"], str(len(PDF)))
+
+        cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=9-18")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 9-18/{len(PDF)}")
+        self.assertEqual(b"".join(response.streaming_content), PDF[9:19])
+
+        tail = self.client.get(self.url, HTTP_RANGE="bytes=-4")
+        self.assertEqual(b"".join(tail.streaming_content), PDF[-4:])
+
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE=f"bytes={len(PDF)}-").status_code, 416)
+
+        stale = self.client.get(self.url, HTTP_RANGE="bytes=0-3", HTTP_IF_RANGE='"outdated"')
+        self.assertEqual(stale.status_code, 200)
+
+    @override_settings(INVOICE_DELIVERY_BACKEND="apps.invoices.delivery.SignedUrlDelivery", INVOICE_DOWNLOAD_URL_TTL=60)
+    def test_signed_url_redirect_keeps_bytes_out_of_the_app(self):
+        with mock.patch(
+            "apps.invoices.delivery.SignedUrlDelivery.signed_url", return_value="https://files.example.com/x?sig=1"
+        ) as signed_url:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], "https://files.example.com/x?sig=1")
+        self.assertEqual(signed_url.call_args.args[1], 60)
@@ -0,0 +1,136 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from apps.invoices.models import Invoice
+from apps.invoices.services.render_service import render_pending, request_render
+from apps.invoices.services.services import create_invoice_for_order
+from apps.orders.models import Order
+
+User = get_user_model()
+
+RENDERER = "apps.invoices.pdf.generate_invoice_pdf_bytes"
+GET_POOL = "apps.invoices.services.render_service._get_pool"
+
+
+class InlinePool:
+    """Stands in for the process pool: forked children cannot see the test transaction."""
+
+    def map(self, fn, chunks):
+        return map(fn, chunks)
+
+
+class DaemonicPool:
+    def map(self, fn, chunks):
+        raise AssertionError("daemonic processes are not allowed to have children")
+
+
+class InvoiceRenderPipelineTest(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            INVOICE_RENDER_MAX_ATTEMPTS=2,
+            INVOICE_DELIVERY_BACKEND="apps.invoices.delivery.StreamingDelivery",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="pass12345")
+        self.client.force_authenticate(self.user)
+
+    def issue_invoice(self):
+        order = Order.objects.create(user=self.user, total_price=100, status="paid")
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice = create_invoice_for_order(order)
+        invoice.refresh_from_db()
+        return invoice
+
+    def download(self, invoice):
+        return self.client.get(f"/api/v1/invoices/{invoice.pk}/download/")
+
+    def test_download_is_202_until_the_worker_renders(self):
+        with mock.patch(RENDERER, return_value=b"%PDF-1.4 fake") as renderer:
+            invoice = self.issue_invoice()
+            self.assertEqual(invoice.pdf_status, Invoice.PdfStatuses.PENDING)
+
+            response = self.download(invoice)
+            self.assertEqual(response.status_code, 202)
+            self.assertIn(f"/invoices/{invoice.pk}/pdf-status/", response.data["poll_url"])
+            renderer.assert_not_called()
+
+            self.assertEqual(render_pending(workers=1), {"claimed": 1, "rendered": 1, "failed": 0})
+
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.pdf_status, Invoice.PdfStatuses.READY)
+        self.assertEqual(self.client.get(f"/api/v1/invoices/{invoice.pk}/pdf-status/").status_code, 200)
+
+        response = self.download(invoice)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 fake")
+
+    def test_batch_renders_each_invoice_once(self):
+        invoices = [self.issue_invoice() for _ in range(3)]
+        with mock.patch(RENDERER, return_value=b"%PDF") as renderer:
+            self.assertEqual(render_pending(workers=1, chunk_size=2)["rendered"], 3)
+            self.assertEqual(render_pending(workers=1)["claimed"], 0)
+        self.assertEqual(renderer.call_count, 3)
+        self.assertEqual(
+            Invoice.objects.filter(pk__in=[i.pk for i in invoices], pdf_status="ready").count(), 3
+        )
+
+    def test_failures_retry_then_park(self):
+        invoice = self.issue_invoice()
+        with mock.patch(RENDERER, side_effect=RuntimeError("no fonts")):
+            self.assertEqual(render_pending(workers=1)["failed"], 1)
+            invoice.refresh_from_db()
+            self.assertEqual(invoice.pdf_status, Invoice.PdfStatuses.PENDING)
+
+            render_pending(workers=1)
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.pdf_status, Invoice.PdfStatuses.FAILED)
+        self.assertIn("no fonts", invoice.pdf_error)
+        self.assertEqual(self.download(invoice).status_code, 503)
+
+    def test_render_that_lost_its_lease_does_not_overwrite_the_requeue(self):
+        invoice = self.issue_invoice()
+
+        def requeued_meanwhile(rendering):
+            request_render([rendering.pk])  # e.g. admin "render" while this worker was slow
+            return b"%PDF-1.4 fake"
+
+        with mock.patch(RENDERER, side_effect=requeued_meanwhile):
+            self.assertEqual(render_pending(workers=1, batch_size=1)["rendered"], 0)
+
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.pdf_status, Invoice.PdfStatuses.PENDING)
+        self.assertFalse(invoice.pdf)
+
+    def test_chunks_go_through_the_pool_with_several_workers(self):
+        for _ in range(2):
+            self.issue_invoice()
+        with mock.patch(RENDERER, return_value=b"%PDF"), mock.patch(GET_POOL, return_value=InlinePool()) as pool:
+            self.assertEqual(
+                render_pending(workers=2, chunk_size=1), {"claimed": 2, "rendered": 2, "failed": 0}
+            )
+        pool.assert_called_once_with(2)
+
+    def test_broken_pool_releases_the_claim_and_counts_the_attempt(self):
+        invoices = [self.issue_invoice(), self.issue_invoice()]
+        with mock.patch(GET_POOL, return_value=DaemonicPool()):
+            self.assertEqual(
+                render_pending(workers=2, chunk_size=1), {"claimed": 2, "rendered": 0, "failed": 2}
+            )
+            invoice = Invoice.objects.get(pk=invoices[0].pk)
+            self.assertEqual((invoice.pdf_status, invoice.pdf_attempts), (Invoice.PdfStatuses.PENDING, 1))
+            self.assertIsNone(invoice.pdf_locked_until)
+
+            render_pending(workers=2, chunk_size=1)  # claimed again right away, not after the lease
+        invoice.refresh_from_db()
+        self.assertEqual((invoice.pdf_status, invoice.pdf_attempts), (Invoice.PdfStatuses.FAILED, 2))
+        self.assertIn("daemonic processes", invoice.pdf_error)
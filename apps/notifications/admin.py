@@ -3,6 +3,7 @@ from django.utils.html import format_html
 from django.utils import timezone
 
 from apps.notifications.models import Notification
+from apps.notifications.services.unread_service import invalidate_unread
 
 
 @admin.register(Notification)
@@ -44,6 +45,7 @@ class NotificationAdmin(admin.ModelAdmin):
     date_hierarchy = "created_at"
 
     readonly_fields = (
+        "event_count",
         "created_at",
         "updated_at",
         "read_at",
@@ -59,6 +61,7 @@ class NotificationAdmin(admin.ModelAdmin):
                 "message",
                 "notification_type",
                 "level",
+                "event_count",
             )
         }),
         ("Status & Timestamps", {
@@ -100,13 +103,17 @@ class NotificationAdmin(admin.ModelAdmin):
 
     def mark_as_read(self, request, queryset):
         """Admin bulk action to mark notifications as read."""
+        user_ids = list(queryset.values_list("user_id", flat=True).distinct())
         count = queryset.update(is_read=True, read_at=timezone.now())
+        invalidate_unread(user_ids)
         self.message_user(request, f"{count} notifications marked as read.")
     mark_as_read.short_description = "✅ Mark selected as Read"
 
     def mark_as_unread(self, request, queryset):
         """Admin bulk action to mark notifications as unread."""
+        user_ids = list(queryset.values_list("user_id", flat=True).distinct())
         count = queryset.update(is_read=False, read_at=None)
+        invalidate_unread(user_ids)
         self.message_user(request, f"{count} notifications marked as unread.")
     mark_as_unread.short_description = "🔄 Mark selected as Unread"
 
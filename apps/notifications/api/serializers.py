@@ -6,6 +6,15 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = [
             "id", "user", "title", "message", "notification_type",
-            "level", "is_read", "read_at", "created_at", "updated_at"
+            "level", "event_count", "is_read", "read_at", "created_at", "updated_at"
         ]
-        read_only_fields = ["user", "created_at", "updated_at", "read_at"]
+        read_only_fields = ["user", "event_count", "created_at", "updated_at", "read_at"]
+
+
+class NotificationBroadcastSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=255)
+    message = serializers.CharField()
+    notification_type = serializers.ChoiceField(choices=Notification.NOTIFICATION_TYPES, default="general")
+    level = serializers.ChoiceField(choices=Notification.SEVERITY_LEVELS, default="info")
+    user_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False)
+    coalesce = serializers.BooleanField(default=True)
@@ -1,10 +1,16 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 
 from apps.notifications.models import Notification
-from apps.notifications.api.serializers import NotificationSerializer
+from apps.notifications.api.serializers import NotificationBroadcastSerializer, NotificationSerializer
+from apps.notifications.services.stream_service import event_stream, notify_feed_changed, parse_cursor
+from apps.notifications.services.unread_service import adjust_unread, get_unread_count
+from core.pagination import KeysetPagination
+from core.renderers import EventStreamRenderer
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
@@ -15,6 +21,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
     """
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination  # deep pages must not OFFSET-scan the table
     lookup_field = "id"
 
     def get_queryset(self):
@@ -26,12 +33,54 @@ class NotificationViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=["post"], permission_classes=[permissions.IsAdminUser])
+    def broadcast(self, request):
+        """
+        Admin: send one notification to many users (``user_ids``, or every
+        active user when omitted). The fan-out runs in the
+        ``broadcast_notification`` task (chunked bulk inserts, bursts of the
+        same type per user collapse into a digest row); answers 202 at once.
+        """
+        from apps.notifications.tasks import broadcast_notification  # local import: celery is optional here
+
+        serializer = NotificationBroadcastSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        broadcast_notification.delay(**serializer.validated_data)
+        return Response({"detail": "Broadcast queued."}, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=["get"], url_path="unread-count")
+    def unread_count(self, request):
+        """Badge count: one cache read (counted from the index only on a miss)."""
+        return Response({"unread": get_unread_count(request.user.id)}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], renderer_classes=[EventStreamRenderer, JSONRenderer])
+    def stream(self, request):
+        """
+        Server-Sent Events feed of the user's notifications (replaces polling
+        ``list``). Serve it under ASGI: the connection is held open and a
+        pub/sub wake-up pushes each change. Reconnects resume from the
+        ``Last-Event-ID`` header (or ``?last_event_id=``).
+        """
+        last_event_id = request.headers.get("Last-Event-ID") or request.query_params.get("last_event_id")
+        response = StreamingHttpResponse(
+            event_stream(request.user.id, parse_cursor(last_event_id)),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+        return response
+
     @action(detail=False, methods=["post"], url_path="mark-all-read")
     def mark_all_read(self, request):
         """Mark all user notifications as read."""
+        now = timezone.now()
+        # updated_at too: update() skips auto_now and the stream reads by it
         count = request.user.notifications.filter(is_read=False).update(
-            is_read=True, read_at=timezone.now()
+            is_read=True, read_at=now, updated_at=now
         )
+        adjust_unread(request.user.id, -count)
+        if count:
+            notify_feed_changed([request.user.id])
         return Response({"updated": count}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["post"], url_path="mark-read")
@@ -30,6 +30,8 @@ class Notification(models.Model):
     level = models.CharField(max_length=20, choices=SEVERITY_LEVELS, default="info")
     is_read = models.BooleanField(default=False)
     read_at = models.DateTimeField(blank=True, null=True)
+    # > 1 when a burst of same-type events was collapsed into this row (digest)
+    event_count = models.PositiveIntegerField(default=1)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -39,12 +41,22 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=["user", "is_read"]),
             models.Index(fields=["notification_type"]),
+            models.Index(fields=["user", "updated_at"]),  # stream replay by cursor
         ]
 
     def __str__(self):
         return f"{self.user} - {self.title}"
 
     def mark_as_read(self):
+        from apps.notifications.services.stream_service import notify_feed_changed
+        from apps.notifications.services.unread_service import adjust_unread
+
+        # conditional UPDATE: only the call that actually flips the row
+        # decrements the user's unread counter. update() skips auto_now, so
+        # updated_at is set here for the stream cursor to see the change.
+        now = timezone.now()
+        if Notification.objects.filter(pk=self.pk, is_read=False).update(is_read=True, read_at=now, updated_at=now):
+            adjust_unread(self.user_id, -1)
+            notify_feed_changed([self.user_id])
+            self.read_at = self.updated_at = now
         self.is_read = True
-        self.read_at = timezone.now()
-        self.save(update_fields=["is_read", "read_at"])
@@ -1,10 +1,34 @@
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
 from apps.notifications.models import Notification
+from apps.notifications.services.stream_service import notify_feed_changed
+from apps.notifications.services.unread_service import invalidate_unread
+
+# users handled per SELECT/UPDATE/INSERT round in notify_users
+DEFAULT_CHUNK_SIZE = 1000
+
+# same-type events for a user within this window collapse into one digest row
+DEFAULT_COALESCE_WINDOW = timedelta(minutes=10)
 
 
-def create_notification(user, title, message, notification_type="general", level="info"):
+def get_coalesce_window():
+    return getattr(settings, "NOTIFICATION_COALESCE_WINDOW", DEFAULT_COALESCE_WINDOW)
+
+
+def create_notification(user, title, message, notification_type="general", level="info", coalesce=False):
     """
     Simple helper to create a notification for a user.
+    With ``coalesce=True`` a recent unread notification of the same type is
+    turned into a digest instead of adding a row.
     """
+    if coalesce:
+        return notify_users([user.pk], title, message, notification_type, level, coalesce=True)
     Notification.objects.create(
         user=user,
         title=title,
@@ -14,6 +38,72 @@ def create_notification(user, title, message, notification_type="general", level
     )
 
 
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def notify_users(users, title, message, notification_type="general", level="info",
+                 coalesce=True, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Fan one notification out to many users (``users``: ids, or a User
+    queryset streamed in chunks).
+
+    Each chunk costs a fixed number of queries whatever its size: with
+    ``coalesce`` one SELECT finds users that already have an unread
+    notification of this type inside the coalesce window and one UPDATE
+    turns those rows into digests (event_count + 1, latest title/message);
+    everyone else gets a row from a single bulk INSERT.
+
+    Returns ``{"created": n, "coalesced": n}``.
+    """
+    if isinstance(users, QuerySet):
+        users = users.values_list("pk", flat=True).iterator(chunk_size=chunk_size)
+
+    created = coalesced = 0
+    for chunk in _chunks(users, chunk_size):
+        user_ids = list(dict.fromkeys(chunk))
+        now = timezone.now()
+        with transaction.atomic():
+            digests = {}
+            if coalesce:
+                open_rows = Notification.objects.filter(
+                    user_id__in=user_ids,
+                    notification_type=notification_type,
+                    is_read=False,
+                    created_at__gte=now - get_coalesce_window(),
+                ).values_list("user_id", "id")
+                for user_id, notification_id in open_rows:  # newest first (Meta.ordering)
+                    digests.setdefault(user_id, notification_id)
+                if digests:
+                    coalesced += Notification.objects.filter(pk__in=digests.values()).update(
+                        event_count=F("event_count") + 1,
+                        title=title,
+                        message=message,
+                        level=level,
+                        updated_at=now,
+                    )
+
+            rows = [
+                Notification(
+                    user_id=user_id,
+                    title=title,
+                    message=message,
+                    notification_type=notification_type,
+                    level=level,
+                )
+                for user_id in user_ids
+                if user_id not in digests
+            ]
+            Notification.objects.bulk_create(rows, batch_size=chunk_size)
+            created += len(rows)
+            # bulk_create skips post_save: recount these users on their next badge read
+            invalidate_unread([row.user_id for row in rows])
+            notify_feed_changed(user_ids)  # new rows and bumped digests alike
+    return {"created": created, "coalesced": coalesced}
+
+
 def send_order_placed_notification(order):
     create_notification(
         user=order.user,
@@ -26,7 +116,7 @@ def send_order_placed_notification(order):
 
 def send_payment_success_notification(payment):
     create_notification(
-        user=payment.user,
+        user=payment.order.user,
         title="Payment Successful",
         message=f"Your payment for order #{payment.order.id} was successful.",
         notification_type="payment",
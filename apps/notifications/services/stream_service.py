@@ -0,0 +1,145 @@
+# apps/notifications/services/stream_service.py
+"""
+Server-Sent Events feed of a user's notifications.
+
+Writers call ``notify_feed_changed(user_ids)``; after the transaction
+commits it publishes a wake-up on each user's pub/sub channel (see
+``core.pubsub``). An open stream waits on its channel and, when woken,
+reads the rows changed since its cursor, so live delivery and reconnects
+share one code path.
+
+The cursor is ``"<updated_at in µs>-<id>"`` and is sent as the SSE event id.
+Browsers send it back as ``Last-Event-ID`` when they reconnect, and the
+stream replays what was missed, including digests that were bumped while
+the client was away (they keep their id but get a new ``updated_at``).
+
+``updated_at`` is set before commit, so a row whose transaction commits
+after a newer one was streamed (a large ``notify_users`` fan-out) lands
+behind the cursor. Every read therefore starts ``overlap`` seconds before
+the cursor; within a stream rows already sent in that window are skipped
+by id, and after a reconnect the window is replayed, so clients should
+drop frames whose event id they have already seen.
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.notifications.models import Notification
+from core.pubsub import get_pubsub, publish_many
+
+CHANNEL_PREFIX = "notif_feed"
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+ONE_MICROSECOND = timedelta(microseconds=1)
+EVENT_NAME = "notification"
+REPLAY_BATCH_SIZE = 100
+DEFAULT_HEARTBEAT_SECONDS = 15
+RECONNECT_MILLISECONDS = 3000
+# streams end after this long; EventSource reconnects on its own with Last-Event-ID
+DEFAULT_MAX_SECONDS = 300
+# how far back every read looks for rows that committed late
+DEFAULT_OVERLAP_SECONDS = 10
+
+
+def feed_channel(user_id):
+    return f"{CHANNEL_PREFIX}:{user_id}"
+
+
+def notify_feed_changed(user_ids):
+    """Wake the open streams of ``user_ids`` once the current transaction commits."""
+    channels = [feed_channel(user_id) for user_id in dict.fromkeys(user_ids)]
+    if channels:
+        transaction.on_commit(lambda: publish_many(channels))
+
+
+def make_cursor(notification):
+    # integer arithmetic: float timestamps can be off by a microsecond
+    micros = (notification.updated_at - EPOCH) // ONE_MICROSECOND
+    return f"{micros}-{notification.pk}"
+
+
+def parse_cursor(value):
+    """``(updated_at, id)`` from a cursor string; ``None`` when it is missing or malformed."""
+    try:
+        micros, pk = (int(part) for part in str(value).split("-", 1))
+    except (TypeError, ValueError):
+        return None
+    return EPOCH + micros * ONE_MICROSECOND, pk
+
+
+def start_cursor():
+    """Cursor for a fresh connection: only changes from now on."""
+    return timezone.now(), 0
+
+
+def changed_since(user_id, cursor, limit=REPLAY_BATCH_SIZE):
+    """The user's notifications changed after ``cursor``, oldest change first."""
+    updated_at, pk = cursor
+    return list(
+        Notification.objects.filter(user_id=user_id)
+        .filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk))
+        .order_by("updated_at", "pk")[:limit]
+    )
+
+
+def format_event(notification):
+    from apps.notifications.api.serializers import NotificationSerializer
+
+    data = json.dumps(NotificationSerializer(notification).data, cls=JSONEncoder)
+    return f"id: {make_cursor(notification)}\nevent: {EVENT_NAME}\ndata: {data}\n\n"
+
+
+async def event_stream(user_id, cursor=None, heartbeat=None, max_seconds=None, overlap=None):
+    """
+    Async iterator of SSE frames for ``user_id``: replays everything after
+    ``cursor`` (less ``overlap`` seconds) and then follows the feed until
+    ``max_seconds`` have passed. Idle periods send a comment line every
+    ``heartbeat`` seconds so proxies keep the connection open.
+    """
+    if heartbeat is None:
+        heartbeat = getattr(settings, "NOTIFICATION_STREAM_HEARTBEAT", DEFAULT_HEARTBEAT_SECONDS)
+    if max_seconds is None:
+        max_seconds = getattr(settings, "NOTIFICATION_STREAM_MAX_SECONDS", DEFAULT_MAX_SECONDS)
+    if overlap is None:
+        overlap = getattr(settings, "NOTIFICATION_STREAM_OVERLAP_SECONDS", DEFAULT_OVERLAP_SECONDS)
+    overlap = timedelta(seconds=overlap)
+    # a fresh stream starts at "now": the rows already in the window are the
+    # client's initial state, so the first read only records them
+    priming = cursor is None
+    cursor = cursor or start_cursor()
+    fetch = sync_to_async(changed_since)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_seconds
+    sent = {}  # id -> updated_at of the rows sent within the overlap window
+
+    yield f"retry: {RECONNECT_MILLISECONDS}\n\n"
+    # subscribe before the first read: a change committed in between still wakes us
+    async with get_pubsub().subscribe(feed_channel(user_id)) as subscription:
+        while True:
+            scan = (cursor[0] - overlap, 0)
+            while True:
+                rows = await fetch(user_id, scan)
+                for notification in rows:
+                    scan = (notification.updated_at, notification.pk)
+                    if sent.get(notification.pk) == notification.updated_at:
+                        continue
+                    sent[notification.pk] = notification.updated_at
+                    if not priming:
+                        cursor = max(cursor, scan)
+                        yield format_event(notification)
+                if len(rows) < REPLAY_BATCH_SIZE:
+                    break  # otherwise more backlog to replay
+            priming = False
+            horizon = cursor[0] - overlap
+            sent = {pk: updated_at for pk, updated_at in sent.items() if updated_at >= horizon}
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            if await subscription.get(min(heartbeat, remaining)) is None and loop.time() < deadline:
+                yield ": keepalive\n\n"
@@ -0,0 +1,89 @@
+# apps/notifications/services/unread_service.py
+"""
+Per-user unread notification counters kept in the cache (Redis INCR/DECR).
+
+The badge endpoint reads one key. Writers adjust the counter after their
+transaction commits; writers that can't tell how many rows flipped
+(bulk updates) drop the key instead, and the next read recounts it from
+the (user, is_read) index. ``reconcile_unread_counts`` periodically fixes
+counters that drifted (e.g. a lost increment while a key was being rebuilt).
+"""
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from apps.notifications.models import Notification
+
+UNREAD_KEY_PREFIX = "notif_unread"
+
+
+def unread_key(user_id):
+    return f"{UNREAD_KEY_PREFIX}:{user_id}"
+
+
+def count_unread(user_id):
+    """Authoritative count, served by the (user, is_read) index."""
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def get_unread_count(user_id):
+    value = cache.get(unread_key(user_id))
+    if value is None:
+        value = count_unread(user_id)
+        # add(): don't clobber a counter another request rebuilt meanwhile
+        cache.add(unread_key(user_id), value, timeout=None)
+    return max(int(value), 0)
+
+
+def _adjust(user_id, delta):
+    try:
+        if delta > 0:
+            cache.incr(unread_key(user_id), delta)
+        elif delta < 0:
+            cache.decr(unread_key(user_id), -delta)
+    except ValueError:
+        pass  # no counter cached: the next read counts from the database
+
+
+def adjust_unread(user_id, delta):
+    """Apply ``delta`` to the user's counter once the current transaction commits."""
+    if delta:
+        transaction.on_commit(lambda: _adjust(user_id, delta))
+
+
+def invalidate_unread(user_ids):
+    """Drop counters (after commit) for users whose unread rows changed in bulk."""
+    keys = [unread_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def reconcile_unread_counts(chunk_size=1000):
+    """
+    Compare cached counters with the database, chunk by chunk (one grouped
+    COUNT and one get_many per chunk), and fix the ones that drifted.
+    Users without a cached counter are left alone. Returns the number fixed.
+    """
+    user_ids = get_user_model().objects.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=chunk_size)
+    fixed = 0
+    while chunk := list(islice(user_ids, chunk_size)):
+        cached = cache.get_many([unread_key(user_id) for user_id in chunk])
+        if not cached:
+            continue
+        actual = dict(
+            Notification.objects.filter(user_id__in=chunk, is_read=False)
+            .values("user_id")
+            .annotate(unread=Count("id"))
+            .values_list("user_id", "unread")
+        )
+        stale = {
+            key: actual.get(user_id, 0)
+            for user_id in chunk
+            if (key := unread_key(user_id)) in cached and cached[key] != actual.get(user_id, 0)
+        }
+        cache.set_many(stale, timeout=None)
+        fixed += len(stale)
+    return fixed
@@ -1,7 +1,12 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from apps.notifications.models import Notification
+from apps.notifications.services.stream_service import notify_feed_changed
+from apps.notifications.services.unread_service import adjust_unread, invalidate_unread
 from apps.orders.models import Order
+from apps.outbox.services.outbox_service import subscriber
 from apps.payments.models import Payment
+from apps.payments.signals import PAYMENT_SAVED
 from apps.shipments.models import Shipment
 from apps.notifications.services.notification_service import (
     send_order_placed_notification,
@@ -16,13 +21,34 @@ def order_created_handler(sender, instance, created, **kwargs):
         send_order_placed_notification(instance)
 
 
-@receiver(post_save, sender=Payment)
-def payment_success_handler(sender, instance, **kwargs):
-    if instance.status == "paid":
-        send_payment_success_notification(instance)
+@subscriber(PAYMENT_SAVED)
+def payment_success_handler(payload):
+    # runs in the outbox worker, not in the payment request
+    if payload["status"] == "paid":
+        payment = Payment.objects.select_related("order").filter(pk=payload["payment_id"]).first()
+        if payment is not None:
+            send_payment_success_notification(payment)
 
 
 @receiver(post_save, sender=Shipment)
 def shipment_delivered_handler(sender, instance, **kwargs):
     if instance.status == "delivered":
         send_shipment_delivered_notification(instance)
+
+
+@receiver(post_save, sender=Notification)
+def track_unread_on_save(sender, instance, created, **kwargs):
+    # new unread rows bump the badge; other saves may have flipped is_read
+    # either way, so let the next read recount
+    if created:
+        if not instance.is_read:
+            adjust_unread(instance.user_id, 1)
+    else:
+        invalidate_unread([instance.user_id])
+    notify_feed_changed([instance.user_id])
+
+
+@receiver(post_delete, sender=Notification)
+def track_unread_on_delete(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.user_id, -1)
@@ -1,5 +1,5 @@
 from celery import shared_task
-from apps.notifications.services.notification_service import create_notification
+from apps.notifications.services.notification_service import create_notification, notify_users
 
 @shared_task
 def async_create_notification(user_id, title, message, notification_type="general", level="info"):
@@ -10,3 +10,25 @@ def async_create_notification(user_id, title, message, notification_type="genera
         create_notification(user, title, message, notification_type, level)
     except User.DoesNotExist:
         pass
+
+
+@shared_task
+def broadcast_notification(title, message, notification_type="general", level="info", user_ids=None, coalesce=True):
+    """
+    One task per campaign (not per user): notify ``user_ids``, or every
+    active user when omitted, with chunked bulk inserts.
+    """
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+    users = User.objects.filter(is_active=True).order_by("pk")
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    return notify_users(users, title, message, notification_type, level, coalesce=coalesce)
+
+
+@shared_task
+def reconcile_unread_notification_counts():
+    """Periodic safety net: fix cached unread counters that drifted from the database."""
+    from apps.notifications.services.unread_service import reconcile_unread_counts
+
+    return reconcile_unread_counts()
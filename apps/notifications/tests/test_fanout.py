@@ -0,0 +1,70 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.notifications.models import Notification
+from apps.notifications.services.notification_service import notify_users
+from apps.notifications.tasks import broadcast_notification
+
+User = get_user_model()
+
+
+class NotificationFanoutTest(APITestCase):
+    def setUp(self):
+        User.objects.bulk_create([
+            User(username=f"user{i}", email=f"user{i}@example.com") for i in range(25)
+        ])
+        self.user_ids = list(User.objects.order_by("pk").values_list("pk", flat=True))
+
+    def test_chunked_fanout_query_count(self):
+        # 3 chunks x (SAVEPOINT, open-digest SELECT, bulk INSERT, RELEASE)
+        with self.assertNumQueries(3 * 4):
+            result = notify_users(self.user_ids, "Sale", "20% off", "discount", chunk_size=10)
+        self.assertEqual(result, {"created": 25, "coalesced": 0})
+        self.assertEqual(Notification.objects.filter(notification_type="discount").count(), 25)
+
+    def test_bursts_collapse_into_one_digest(self):
+        notify_users(self.user_ids[:5], "Sale", "20% off", "discount")
+        result = notify_users(self.user_ids, "Flash sale", "30% off", "discount")
+        self.assertEqual(result, {"created": 20, "coalesced": 5})
+
+        digest = Notification.objects.get(user_id=self.user_ids[0])
+        self.assertEqual((digest.event_count, digest.title), (2, "Flash sale"))
+
+    def test_read_or_old_notifications_are_not_coalesced(self):
+        notify_users(self.user_ids[:2], "Sale", "20% off", "discount")
+        Notification.objects.filter(user_id=self.user_ids[0]).update(is_read=True)
+        old = Notification.objects.get(user_id=self.user_ids[1])
+        Notification.objects.filter(pk=old.pk).update(created_at=old.created_at - timedelta(hours=1))
+
+        result = notify_users(self.user_ids[:2], "Sale", "20% off", "discount")
+        self.assertEqual(result, {"created": 2, "coalesced": 0})
+
+    def test_other_types_are_not_coalesced(self):
+        notify_users(self.user_ids[:1], "Sale", "20% off", "discount")
+        notify_users(self.user_ids[:1], "Shipped", "On its way", "shipment")
+        self.assertEqual(Notification.objects.filter(user_id=self.user_ids[0]).count(), 2)
+
+    def test_broadcast_endpoint_is_admin_only(self):
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass12345")
+        url = reverse("notifications-broadcast")
+
+        self.client.force_authenticate(User.objects.get(pk=self.user_ids[0]))
+        self.assertEqual(self.client.post(url, {"title": "Hi", "message": "x"}).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(admin)
+        with patch("apps.notifications.tasks.broadcast_notification.delay") as delay:
+            response = self.client.post(
+                url, {"title": "Hi", "message": "x", "notification_type": "discount"}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        delay.assert_called_once()
+        self.assertEqual(delay.call_args.kwargs["notification_type"], "discount")
+
+        # what the worker then runs
+        result = broadcast_notification(**delay.call_args.kwargs)
+        self.assertEqual(result["created"], 26)
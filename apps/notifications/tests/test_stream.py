@@ -0,0 +1,142 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from apps.notifications.models import Notification
+from apps.notifications.services.stream_service import event_stream, feed_channel, make_cursor, parse_cursor
+from core.pubsub import get_pubsub
+
+User = get_user_model()
+
+
+def event_ids(frames):
+    return [line[4:] for frame in frames for line in frame.splitlines() if line.startswith("id: ")]
+
+
+@override_settings(PUBSUB_BACKEND="core.pubsub.LocalPubSub", NOTIFICATION_STREAM_OVERLAP_SECONDS=0)
+class NotificationStreamTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="reader", email="reader@example.com", password="pass12345")
+        self.notifications = [
+            Notification.objects.create(user=self.user, title=f"N{i}", message="x") for i in range(3)
+        ]
+
+    def collect(self, cursor, **kwargs):
+        async def run():
+            return [frame async for frame in event_stream(self.user.pk, cursor, **kwargs)]
+        return async_to_sync(run)()
+
+    def test_cursor_round_trip(self):
+        notification = self.notifications[0]
+        self.assertEqual(parse_cursor(make_cursor(notification)), (notification.updated_at, notification.pk))
+        self.assertIsNone(parse_cursor("garbage"))
+        self.assertIsNone(parse_cursor(None))
+
+    def test_replays_after_last_event_id(self):
+        frames = self.collect(parse_cursor(make_cursor(self.notifications[0])), max_seconds=0)
+        self.assertEqual(event_ids(frames), [make_cursor(n) for n in self.notifications[1:]])
+
+    def test_bumped_digest_is_replayed(self):
+        cursor = parse_cursor(make_cursor(self.notifications[2]))
+        digest = self.notifications[0]
+        digest.title = "N0 (2)"
+        digest.save()
+        frames = self.collect(cursor, max_seconds=0)
+        self.assertEqual(event_ids(frames), [make_cursor(digest)])
+
+    def test_read_transition_is_replayed(self):
+        cursor = parse_cursor(make_cursor(self.notifications[2]))
+        first = self.notifications[0]
+        first.mark_as_read()
+
+        frames = self.collect(cursor, max_seconds=0)
+        self.assertEqual(event_ids(frames), [make_cursor(first)])
+        self.assertIn('"is_read": true', frames[-1])
+
+    def test_mark_all_read_publishes_and_is_replayed(self):
+        cursor = parse_cursor(make_cursor(self.notifications[2]))
+        published = []
+        with patch("apps.notifications.services.stream_service.publish_many", published.extend):
+            with self.captureOnCommitCallbacks(execute=True):
+                client = APIClient()
+                client.force_authenticate(self.user)
+                response = client.post(reverse("notifications-mark-all-read"))
+        self.assertEqual(response.data["updated"], 3)
+        self.assertEqual(published, [feed_channel(self.user.pk)])
+
+        frames = self.collect(cursor, max_seconds=0)
+        self.assertEqual(len(event_ids(frames)), 3)
+
+    def test_publish_wakes_an_open_stream(self):
+        async def run():
+            stream = event_stream(self.user.pk, heartbeat=5, max_seconds=5)
+            await stream.__anext__()  # retry hint
+            pending = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.05)  # stream is now subscribed and waiting
+            created = await sync_to_async(Notification.objects.create)(user=self.user, title="Live", message="x")
+            get_pubsub().publish(feed_channel(self.user.pk))
+            frame = await asyncio.wait_for(pending, 2)
+            await stream.aclose()
+            return created, frame
+
+        created, frame = async_to_sync(run)()
+        self.assertEqual(event_ids([frame]), [make_cursor(created)])
+        self.assertIn('"title": "Live"', frame)
+
+    def test_late_commit_behind_the_cursor_is_delivered(self):
+        cursor = parse_cursor(make_cursor(self.notifications[2]))
+        late = Notification.objects.create(user=self.user, title="Late", message="x")
+        # stamped before the newest row was streamed, committed after it
+        Notification.objects.filter(pk=late.pk).update(updated_at=cursor[0] - timedelta(milliseconds=1))
+        late.refresh_from_db()
+
+        ids = event_ids(self.collect(cursor, max_seconds=0, overlap=5))
+        self.assertIn(make_cursor(late), ids)
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_overlap_is_not_sent_twice_within_a_stream(self):
+        async def run():
+            stream = event_stream(
+                self.user.pk, parse_cursor(make_cursor(self.notifications[0])), heartbeat=5, max_seconds=5, overlap=5
+            )
+            await stream.__anext__()  # retry hint
+            replayed = [await stream.__anext__() for _ in self.notifications]
+            pending = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.05)
+            created = await sync_to_async(Notification.objects.create)(user=self.user, title="Live", message="x")
+            get_pubsub().publish(feed_channel(self.user.pk))
+            frame = await asyncio.wait_for(pending, 2)
+            await stream.aclose()
+            return replayed, created, frame
+
+        replayed, created, frame = async_to_sync(run)()
+        self.assertEqual(event_ids(replayed), [make_cursor(n) for n in self.notifications])
+        self.assertEqual(event_ids([frame]), [make_cursor(created)])
+
+
+@override_settings(
+    PUBSUB_BACKEND="core.pubsub.LocalPubSub", NOTIFICATION_STREAM_MAX_SECONDS=0, NOTIFICATION_STREAM_OVERLAP_SECONDS=0
+)
+class NotificationStreamEndpointTest(APITestCase):
+    def test_stream_endpoint(self):
+        user = User.objects.create_user(username="reader", email="reader@example.com", password="pass12345")
+        first = Notification.objects.create(user=user, title="Old", message="x")
+        second = Notification.objects.create(user=user, title="New", message="x")
+        url = reverse("notifications-stream")
+
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT="text/event-stream").status_code, 401)
+
+        self.client.force_authenticate(user)
+        response = self.client.get(url, HTTP_ACCEPT="text/event-stream", HTTP_LAST_EVENT_ID=make_cursor(first))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        async def read():  # an async iterator: served as-is under ASGI
+            return b"".join([chunk async for chunk in response.streaming_content]).decode()
+        body = async_to_sync(read)()
+        self.assertEqual(event_ids([body]), [make_cursor(second)])
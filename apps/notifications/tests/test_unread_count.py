@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.notifications.models import Notification
+from apps.notifications.services.notification_service import create_notification, notify_users
+from apps.notifications.services.unread_service import reconcile_unread_counts, unread_key
+
+User = get_user_model()
+
+
+class UnreadCountTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="reader", email="reader@example.com", password="pass12345")
+        self.client.force_authenticate(self.user)
+        self.url = reverse("notifications-unread-count")
+
+    def badge(self):
+        return self.client.get(self.url).data["unread"]
+
+    def test_counter_follows_writes(self):
+        self.assertEqual(self.badge(), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_notification(self.user, "One", "x")
+            create_notification(self.user, "Two", "x")
+        self.assertEqual(cache.get(unread_key(self.user.pk)), 2)
+
+        first = Notification.objects.get(title="One")
+        with self.captureOnCommitCallbacks(execute=True):
+            first.mark_as_read()
+            first.mark_as_read()  # already read: no second decrement
+        self.assertEqual(self.badge(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("notifications-mark-all-read"))
+        self.assertEqual(self.badge(), 0)
+
+    def test_cached_badge_skips_the_database(self):
+        self.badge()
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_bulk_fanout_invalidates(self):
+        self.assertEqual(self.badge(), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_users([self.user.pk], "Sale", "20% off", "discount")
+        self.assertIsNone(cache.get(unread_key(self.user.pk)))
+        self.assertEqual(self.badge(), 1)
+
+    def test_reconcile_fixes_drift(self):
+        Notification.objects.create(user=self.user, title="One", message="x")
+        cache.set(unread_key(self.user.pk), 7, timeout=None)
+        self.assertEqual(reconcile_unread_counts(), 1)
+        self.assertEqual(self.badge(), 1)
+        self.assertEqual(reconcile_unread_counts(), 0)
@@ -26,7 +26,8 @@ class OrderAdmin(admin.ModelAdmin):
 
     # Use a custom queryset to optimize query performance
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('items')
+        # payment totals for balance_due / is_fully_paid come annotated in the list query
+        return super().get_queryset(request).with_payment_totals().select_related('user').prefetch_related('items')
 
     # Add custom method to list display for total paid
     def total_paid_display(self, obj):
@@ -53,7 +53,7 @@ class PaymentInlineSerializer(serializers.ModelSerializer):
 class OrderDetailSerializer(OrderSerializer):
     """Extends OrderSerializer with related payments"""
 
-    payments = PaymentInlineSerializer(many=True, source="payment", read_only=True)
+    payments = PaymentInlineSerializer(many=True, source="payments", read_only=True)
 
     class Meta(OrderSerializer.Meta):
         fields = OrderSerializer.Meta.fields + ["payments"]
@@ -9,13 +9,24 @@ from apps.orders.api.serializers import (
     OrderDetailSerializer,
 )
 from apps.orders.services import create_order_from_cart
+from core.pagination import KeysetPagination
 
 
 class OrderViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user).order_by("-created_at")
+        # payment totals are annotated in the same query (no per-order aggregates)
+        qs = (
+            Order.objects.filter(user=self.request.user)
+            .with_payment_totals()
+            .prefetch_related("items__product")
+            .order_by("-created_at")
+        )
+        if self.action == "retrieve":
+            qs = qs.prefetch_related("payments")
+        return qs
 
     def get_serializer_class(self):
         if self.action == "retrieve":
@@ -2,6 +2,32 @@ from django.db import models
 from django.conf import settings
 from apps.products.models import Product
 from decimal import Decimal
+from django.db.models.functions import Coalesce
+
+ZERO = Decimal("0.00")
+
+
+def _payment_sum(status, prefix=""):
+    return Coalesce(
+        models.Sum(f"{prefix}amount", filter=models.Q(**{f"{prefix}status": status})),
+        models.Value(ZERO),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_payment_totals(self):
+        """
+        Annotate completed_total / refunded_total (sums of the order's
+        payments) with conditional aggregation, in the same query as the
+        orders. total_paid, balance_due and is_fully_paid then need no query.
+        """
+        return self.annotate(
+            completed_total=_payment_sum("completed", prefix="payments__"),
+            refunded_total=_payment_sum("refunded", prefix="payments__"),
+        )
+
+
 # Create your models here.
 class Order(models.Model):
     STATUS_CHOICES = [
@@ -21,15 +47,28 @@ class Order(models.Model):
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = OrderQuerySet.as_manager()
+
     def __str__(self):
         return f"Order #{self.id} by {self.user.username}"
-    
+
+    def _payment_totals(self):
+        # use the with_payment_totals() annotations when present; otherwise
+        # aggregate both sums in one query and keep them on the instance
+        if not hasattr(self, "completed_total"):
+            totals = self.payments.aggregate(
+                completed_total=_payment_sum("completed"),
+                refunded_total=_payment_sum("refunded"),
+            )
+            self.completed_total = totals["completed_total"]
+            self.refunded_total = totals["refunded_total"]
+        return self.completed_total, self.refunded_total
+
     # sum of completed payments
     @property 
     def total_paid(self):
         # sum of all completed payments minus refunded
-        completed = self.payment.filter(status="completed").aggregate(total=models.Sum('amount'))['total'] or 0
-        refunded = self.payment.filter(status="refunded").aggregate(total=models.Sum('amount'))['total'] or 0
+        completed, refunded = self._payment_totals()
         return completed - refunded
     
     # balance still due or to be paid.
@@ -1,31 +1,49 @@
-from django.db import transaction 
+import uuid
+
+from django.db import transaction
 from apps.orders.models import Order, OrderItem
 from apps.cart.models import CartItem
 from apps.cart.services import get_or_create_cart
+from apps.products.models import StockReservation
+from apps.products.services import inventory_service
 
-@transaction.atomic 
+@transaction.atomic
 def create_order_from_cart(user):
+    """
+    Set-based checkout: the query count does not depend on the number of
+    cart lines (one read of the cart with its products, one stock UPDATE,
+    one bulk_create per table), and the order is saved once, so its
+    post_save receivers (notifications, analytics, refunds) run once.
+    """
     cart = get_or_create_cart(user)
-    cart_items = CartItem.objects.filter(cart = cart)
-    if not cart_items.exists():
+    cart_items = list(CartItem.objects.filter(cart = cart).select_related("product"))
+    if not cart_items:
         raise ValueError("Cart is empty")
-    
-    order = Order.objects.create(user = user, status = 'pending')
-    total = 0 
 
-    for item in cart_items:
-        line_total = item.product.price * item.quantity
-        total += line_total 
-        OrderItem.objects.create(
-            order = order,
-            product = item.product,
-            quantity = item.quantity,
-            price = item.product.price
-        )
-    order.total_price = total 
-    order.save()
+    # take the stock for the whole cart before the order exists: a checkout
+    # hold (POST /carts/{pk}/reserve/) matching the cart is committed as is,
+    # otherwise it is given back and the cart reserved in one conditional
+    # UPDATE. Raises InsufficientStock (a ValueError) and rolls everything
+    # back when short.
+    checkout_reference = f"checkout:{uuid.uuid4().hex}"
+    inventory_service.take_checkout_stock(
+        user, [(item.product_id, item.quantity) for item in cart_items], checkout_reference
+    )
+
+    # price snapshot and total in one pass
+    lines = [(item.product, item.quantity, item.product.price) for item in cart_items]
+    total = sum(price * quantity for _, quantity, price in lines)
+
+    order = Order.objects.create(user = user, status = 'pending', total_price = total)
+    OrderItem.objects.bulk_create([
+        OrderItem(order = order, product = product, quantity = quantity, price = price)
+        for product, quantity, price in lines
+    ])
+    StockReservation.objects.filter(reference=checkout_reference).update(
+        reference=inventory_service.order_reference(order)
+    )
 
     # clear the cart after creating the order
     cart.items.all().delete()
 
-    return order
\ No newline at end of file
+    return order
@@ -2,6 +2,7 @@ from django.db.models.signals import post_save # post_save: This is a built-in D
 from django.dispatch import receiver # receiver: A decorator used to connect a function (the "receiver") to a specific signal.
 from apps.payments.models import Payment # Payment: The Django model for payments, which the signal handler will interact with. 
 from apps.orders.models import Order # Order: The Django model for orders, which is the "sender" of the signal.
+from apps.products.services.inventory_service import restock_order
 
 @receiver(post_save, sender = Order) # @receiver(post_save, sender=Order): This decorator registers the create_refund_on_cancel function to be a receiver for the post_save signal. It specifies that it should only listen for signals sent by the Order model.
 def create_refund_on_cancel(sender, instance, created, **kwargs):
@@ -17,7 +18,7 @@ def create_refund_on_cancel(sender, instance, created, **kwargs):
          # instance.status == "cancelled": The handler checks if the updated order's status is "cancelled".
 
         # check if there's any completed payment for this order
-        completed_payments = instance.payment.filter(status="completed") 
+        completed_payments = instance.payments.filter(status="completed") 
 
         for payment in completed_payments:
             # create a refund record for each completed payment
@@ -27,4 +28,14 @@ def create_refund_on_cancel(sender, instance, created, **kwargs):
                 gateway = payment.gateway,
                 gateway_ref = payment.gateway_ref,
                 status = "refunded",
-            )
\ No newline at end of file
+            )
+
+
+@receiver(post_save, sender = Order)
+def restock_on_cancel(sender, instance, created, **kwargs):
+    """
+    Give the units of a cancelled order back to stock.
+    The reservation status flips once, so saving a cancelled order again does not restock twice.
+    """
+    if not created and instance.status == "cancelled":
+        restock_order(instance)
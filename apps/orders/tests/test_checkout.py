@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from apps.cart.models import Cart, CartItem
+from apps.orders.models import Order, OrderItem
+from apps.orders.services import create_order_from_cart
+from apps.products.models import Category, Product, StockReservation
+from apps.products.services import inventory_service
+
+User = get_user_model()
+
+
+class CheckoutBenchmarkTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        self.category = Category.objects.create(name="Groceries")
+
+    def checkout(self, lines, hold=False):
+        n = User.objects.count()
+        user = User.objects.create_user(username=f"buyer{n}", email=f"buyer{n}@example.com", password="pass12345")
+        cart = Cart.objects.create(user=user)
+        for i in range(lines):
+            product = Product.objects.create(
+                vendor=self.vendor, name=f"Item {n}-{i}", sku=f"SKU-{n}-{i}",
+                price=10 + i, stock=5, category=self.category,
+            )
+            CartItem.objects.create(cart=cart, product=product, quantity=2)
+        if hold:
+            inventory_service.hold_cart(user, cart)
+
+        with CaptureQueriesContext(connection) as ctx:
+            order = create_order_from_cart(user)
+        return order, len(ctx.captured_queries)
+
+    def test_query_count_is_constant(self):
+        _, one_line = self.checkout(1)
+        order, hundred_lines = self.checkout(100)
+        self.assertEqual(hundred_lines, one_line)
+
+        self.assertEqual(order.items.count(), 100)
+        self.assertEqual(order.total_price, sum(2 * (10 + i) for i in range(100)))
+
+    def test_query_count_is_constant_with_a_checkout_hold(self):
+        _, one_line = self.checkout(1, hold=True)
+        order, fifty_lines = self.checkout(50, hold=True)
+        self.assertEqual(fifty_lines, one_line)
+
+        # the hold itself became the order's reservations: no extra units taken
+        reservations = StockReservation.objects.filter(reference=inventory_service.order_reference(order))
+        self.assertEqual(reservations.filter(status=StockReservation.STATUS_COMMITTED).count(), 50)
+        self.assertFalse(StockReservation.objects.filter(user=order.user, reference="cart").exists())
+        self.assertEqual(set(Product.objects.filter(orderitem__order=order).values_list("stock", flat=True)), {3})
+
+    def test_hold_not_matching_the_cart_is_replaced(self):
+        order, _ = self.checkout(2, hold=True)
+        self.assertEqual(order.items.count(), 2)
+
+        user = User.objects.create_user(username="changed", email="changed@example.com", password="pass12345")
+        cart = Cart.objects.create(user=user)
+        product = Product.objects.create(
+            vendor=self.vendor, name="Extra", sku="EXTRA", price=5, stock=5, category=self.category
+        )
+        item = CartItem.objects.create(cart=cart, product=product, quantity=1)
+        inventory_service.hold_cart(user, cart)
+        item.quantity = 3
+        item.save()
+
+        create_order_from_cart(user)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 2)
+        self.assertEqual(
+            StockReservation.objects.get(user=user, status=StockReservation.STATUS_RELEASED).quantity, 1
+        )
+
+    def test_order_signals_fire_once(self):
+        saves = []
+
+        def record(sender, instance, created, **kwargs):
+            saves.append(created)
+
+        post_save.connect(record, sender=Order)
+        post_save.connect(record, sender=OrderItem)
+        try:
+            order, _ = self.checkout(3)
+        finally:
+            post_save.disconnect(record, sender=Order)
+            post_save.disconnect(record, sender=OrderItem)
+        self.assertEqual(saves, [True])
+        self.assertEqual(Order.objects.get(pk=order.pk).total_price, order.total_price)
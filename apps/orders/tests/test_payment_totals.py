@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.orders.models import Order
+from apps.outbox.services.outbox_service import drain_all
+from apps.payments.models import Payment
+
+User = get_user_model()
+
+
+class OrderPaymentTotalsTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="pass12345")
+        self.client.force_authenticate(self.user)
+
+    def make_order(self, total, payments):
+        order = Order.objects.create(user=self.user, total_price=total)
+        for amount, payment_status in payments:
+            Payment.objects.create(order=order, amount=amount, gateway="cod", status=payment_status)
+        return order
+
+    def test_annotated_totals(self):
+        order = self.make_order(100, [(80, "completed"), (30, "completed"), (20, "refunded"), (50, "failed")])
+        order = Order.objects.with_payment_totals().get(pk=order.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(order.total_paid, Decimal("90.00"))
+            self.assertEqual(order.balance_due, Decimal("10.00"))
+            self.assertFalse(order.is_fully_paid)
+
+    def test_unannotated_order_aggregates_once(self):
+        order = Order.objects.get(pk=self.make_order(100, [(100, "completed")]).pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(order.total_paid, Decimal("100.00"))
+            self.assertTrue(order.is_fully_paid)
+            self.assertEqual(order.balance_due, 0)
+
+    def test_payment_signal_marks_order_paid(self):
+        order = self.make_order(100, [(60, "completed")])
+        drain_all()
+        order.refresh_from_db()
+        self.assertEqual(order.status, "pending")
+
+        Payment.objects.create(order=order, amount=40, gateway="cod", status="completed")
+        drain_all()  # order status is updated by the outbox worker
+        order.refresh_from_db()
+        self.assertEqual(order.status, "paid")
+
+    def test_order_list_query_count_is_constant(self):
+        self.make_order(100, [(100, "completed")])
+        with CaptureQueriesContext(connection) as one:
+            self.client.get(reverse("order-list"))
+
+        for _ in range(10):
+            self.make_order(50, [(20, "completed"), (5, "refunded")])
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(reverse("order-list"))
+
+        self.assertEqual(len(many), len(one))
+        self.assertEqual(response.data["results"][0]["total_paid"], "15.00")
+        self.assertEqual(response.data["results"][0]["balance_due"], "35.00")
@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from apps.outbox.models import OutboxEvent
+from apps.outbox.services.outbox_service import requeue
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "topic", "handler", "status", "attempts", "available_at", "created_at", "processed_at")
+    list_filter = ("status", "topic")
+    search_fields = ("idempotency_key", "handler")
+    readonly_fields = [field.name for field in OutboxEvent._meta.fields]
+    actions = ["requeue_failed"]
+
+    @admin.action(description="Re-queue selected failed events")
+    def requeue_failed(self, request, queryset):
+        count = requeue(queryset)
+        self.message_user(request, f"{count} event(s) re-queued.")
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxConfig(AppConfig):
+    """
+    Transactional outbox.
+
+    Side effects of a write (order status, invoices, activity logs,
+    notifications...) are recorded as outbox rows in the same transaction
+    and carried out later by a worker, so the request only pays for the
+    inserts.
+    """
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.outbox"
+    verbose_name = _("Outbox & Background Dispatch")
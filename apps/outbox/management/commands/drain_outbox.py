@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.outbox.services.outbox_service import DEFAULT_BATCH_SIZE, drain_all
+
+
+class Command(BaseCommand):
+    help = "Run pending outbox events once, or keep polling with --loop (a worker without Celery)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling until interrupted.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when idle (with --loop).")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = drain_all(batch_size=options["batch_size"])
+            if processed or not options["loop"]:
+                self.stdout.write(f"{processed} outbox event(s) processed.")
+            if not options["loop"]:
+                return
+            if not processed:
+                time.sleep(options["interval"])
@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    """
+    One side effect to run: ``handler`` applied to ``payload``.
+
+    Publishing an event writes one row per subscriber of its topic, so each
+    subscriber is retried (and marked done) independently. The
+    (handler, idempotency_key) pair is unique: publishing the same event
+    twice is a no-op.
+    """
+
+    class Statuses(models.TextChoices):
+        PENDING = "pending", "Pending"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    topic = models.CharField(max_length=100)
+    handler = models.CharField(max_length=255)
+    idempotency_key = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=Statuses.choices, default=Statuses.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)  # next attempt not before
+    locked_until = models.DateTimeField(null=True, blank=True)  # claim lease of a worker
+    claimed_by = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(fields=["handler", "idempotency_key"], name="outbox_unique_handler_key"),
+        ]
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+            models.Index(fields=["claimed_by"]),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} -> {self.handler} [{self.status}]"
@@ -0,0 +1,166 @@
+# apps/outbox/services/outbox_service.py
+"""
+Transactional outbox.
+
+Producers call ``publish(topic, payload, key)`` inside the transaction that
+made the change (typically from a post_save receiver); subscribers register
+with ``@subscriber(topic)``. ``drain()`` is the worker: it claims a batch of
+due rows with a conditional UPDATE (no row locks, several workers can run
+side by side), runs each handler, and marks the row done in the same
+transaction as the handler's own writes. Database side effects therefore
+happen exactly once; anything external must be idempotent, since a crash
+between the handler and the commit retries it.
+
+Failures are retried with exponential backoff up to ``OUTBOX_MAX_ATTEMPTS``
+and then parked as ``failed`` (visible and re-queueable in the admin).
+"""
+import logging
+import traceback
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.outbox.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_LEASE_SECONDS = 60
+BACKOFF_BASE_SECONDS = 5
+BACKOFF_MAX_SECONDS = 60 * 60
+
+# topic -> {handler name: callable}
+_subscribers = defaultdict(dict)
+_handlers = {}
+
+
+class _LeaseLost(Exception):
+    """Another worker re-claimed the event while its handler ran."""
+
+
+def handler_name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def subscriber(topic):
+    """Register ``func(payload)`` to run (asynchronously) for every ``topic`` event."""
+    def decorator(func):
+        name = handler_name(func)
+        _subscribers[topic][name] = func
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def publish(topic, payload, key):
+    """
+    Record ``topic`` for every subscriber. Call it inside the transaction of
+    the change it describes so both commit (or roll back) together. ``key``
+    identifies the event: publishing the same topic/key again is ignored.
+    """
+    names = list(_subscribers.get(topic, ()))
+    if not names:
+        return 0
+    OutboxEvent.objects.bulk_create(
+        [
+            OutboxEvent(topic=topic, handler=name, idempotency_key=f"{topic}:{key}", payload=payload)
+            for name in names
+        ],
+        ignore_conflicts=True,
+    )
+    if getattr(settings, "OUTBOX_DISPATCH_ON_COMMIT", False):
+        from apps.outbox.tasks import drain_outbox  # local import: celery is optional here
+
+        transaction.on_commit(drain_outbox.delay)
+    return len(names)
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def _claim(batch_size, lease_seconds):
+    now = timezone.now()
+    due = Q(status=OutboxEvent.Statuses.PENDING, available_at__lte=now) & (
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)  # unclaimed, or a dead worker's lease ran out
+    )
+    ids = list(OutboxEvent.objects.filter(due).order_by("id").values_list("id", flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    # only rows still due when the UPDATE runs are ours
+    OutboxEvent.objects.filter(due, pk__in=ids).update(
+        claimed_by=token, locked_until=now + timedelta(seconds=lease_seconds)
+    )
+    return list(OutboxEvent.objects.filter(claimed_by=token, status=OutboxEvent.Statuses.PENDING).order_by("id"))
+
+
+def _dispatch(event, max_attempts):
+    attempts = event.attempts + 1
+    mine = OutboxEvent.objects.filter(pk=event.pk, claimed_by=event.claimed_by)
+    try:
+        handler = _handlers.get(event.handler)
+        if handler is None:
+            raise LookupError(f"No subscriber registered as {event.handler}")
+        with transaction.atomic():
+            handler(event.payload)
+            done = mine.update(
+                status=OutboxEvent.Statuses.DONE,
+                attempts=attempts,
+                processed_at=timezone.now(),
+                locked_until=None,
+                last_error="",
+            )
+            if not done:
+                # the lease ran out mid-handler; roll its writes back and leave the row to the new owner
+                raise _LeaseLost
+        return True
+    except _LeaseLost:
+        logger.warning("Outbox event %s was re-claimed before %s finished", event.pk, event.handler)
+        return False
+    except Exception:
+        logger.exception("Outbox handler %s failed for event %s", event.handler, event.pk)
+        failed = attempts >= max_attempts
+        mine.update(
+            status=OutboxEvent.Statuses.FAILED if failed else OutboxEvent.Statuses.PENDING,
+            attempts=attempts,
+            available_at=timezone.now() + _backoff(attempts),
+            locked_until=None,
+            last_error=traceback.format_exc()[-4000:],
+        )
+        return False
+
+
+def _drain_batch(batch_size, lease_seconds, max_attempts):
+    if max_attempts is None:
+        max_attempts = getattr(settings, "OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+    batch = _claim(batch_size, lease_seconds)
+    return len(batch), sum(_dispatch(event, max_attempts) for event in batch)
+
+
+def drain(batch_size=DEFAULT_BATCH_SIZE, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=None):
+    """Process one batch of due events; returns how many succeeded."""
+    return _drain_batch(batch_size, lease_seconds, max_attempts)[1]
+
+
+def drain_all(batch_size=DEFAULT_BATCH_SIZE, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=None):
+    """Drain batch after batch until nothing is due (failed events wait for their backoff)."""
+    succeeded = 0
+    while True:
+        claimed, ok = _drain_batch(batch_size, lease_seconds, max_attempts)
+        succeeded += ok
+        if claimed < batch_size:
+            return succeeded
+
+
+def requeue(queryset):
+    """Give failed events a fresh set of attempts."""
+    return queryset.filter(status=OutboxEvent.Statuses.FAILED).update(
+        status=OutboxEvent.Statuses.PENDING, attempts=0, available_at=timezone.now(), locked_until=None
+    )
@@ -0,0 +1,14 @@
+# apps/outbox/tasks.py
+from celery import shared_task
+
+from apps.outbox.services.outbox_service import drain_all
+
+
+@shared_task
+def drain_outbox(batch_size=100):
+    """
+    Run pending outbox events. Schedule it with celery beat (e.g. every few
+    seconds) and/or set OUTBOX_DISPATCH_ON_COMMIT to kick it after each
+    publishing transaction.
+    """
+    return drain_all(batch_size=batch_size)
@@ -0,0 +1,128 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.analytics.models import UserActivity
+from apps.orders.models import Order
+from apps.outbox.models import OutboxEvent
+from apps.outbox.services import outbox_service
+from apps.outbox.services.outbox_service import drain, drain_all, publish, requeue, subscriber
+from apps.payments.models import Payment
+
+User = get_user_model()
+
+calls = []
+failures = {"left": 0}
+
+
+@subscriber("test.flaky")
+def flaky_handler(payload):
+    if failures["left"]:
+        failures["left"] -= 1
+        raise RuntimeError("temporary failure")
+    calls.append(payload["n"])
+
+
+@subscriber("test.slow")
+def slow_handler(payload):
+    User.objects.create_user(username=payload["username"], password="pass12345")
+    # the lease expires and another worker claims the event before this commit
+    OutboxEvent.objects.filter(topic="test.slow").update(claimed_by="other-worker")
+
+
+class OutboxDispatchTest(TestCase):
+    def setUp(self):
+        calls.clear()
+        failures["left"] = 0
+
+    def test_publish_is_idempotent_per_key(self):
+        publish("test.flaky", {"n": 1}, key="a")
+        publish("test.flaky", {"n": 1}, key="a")
+        self.assertEqual(OutboxEvent.objects.filter(topic="test.flaky").count(), 1)
+        self.assertEqual(drain(), 1)
+        self.assertEqual(calls, [1])
+        self.assertEqual(drain(), 0)  # done events are not run again
+
+    def test_failures_are_retried_with_backoff(self):
+        failures["left"] = 1
+        publish("test.flaky", {"n": 2}, key="b")
+        self.assertEqual(drain(), 0)
+
+        event = OutboxEvent.objects.get(topic="test.flaky")
+        self.assertEqual((event.status, event.attempts), (OutboxEvent.Statuses.PENDING, 1))
+        self.assertGreater(event.available_at, timezone.now())
+        self.assertEqual(drain(), 0)  # still backing off
+
+        OutboxEvent.objects.update(available_at=timezone.now())
+        self.assertEqual(drain(), 1)
+        self.assertEqual(calls, [2])
+
+    def test_gives_up_after_max_attempts_and_can_requeue(self):
+        failures["left"] = 5
+        publish("test.flaky", {"n": 3}, key="c")
+        for _ in range(2):
+            OutboxEvent.objects.update(available_at=timezone.now())
+            drain(max_attempts=2)
+        self.assertEqual(OutboxEvent.objects.get().status, OutboxEvent.Statuses.FAILED)
+
+        failures["left"] = 0
+        self.assertEqual(requeue(OutboxEvent.objects.all()), 1)
+        self.assertEqual(drain(), 1)
+
+    def test_expired_claims_are_picked_up_again(self):
+        publish("test.flaky", {"n": 4}, key="d")
+        outbox_service._claim(10, lease_seconds=60)  # a worker that died mid-batch
+        self.assertEqual(drain(), 0)
+
+        OutboxEvent.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(drain(), 1)
+        self.assertEqual(calls, [4])
+
+    def test_handler_that_lost_its_lease_is_rolled_back(self):
+        publish("test.slow", {"username": "late"}, key="f")
+        self.assertEqual(drain(), 0)
+
+        event = OutboxEvent.objects.get(topic="test.slow")
+        self.assertEqual((event.status, event.attempts), (OutboxEvent.Statuses.PENDING, 0))
+        self.assertFalse(User.objects.filter(username="late").exists())
+
+    def test_management_command(self):
+        publish("test.flaky", {"n": 5}, key="e")
+        out = StringIO()
+        call_command("drain_outbox", stdout=out)
+        self.assertIn("1 outbox event(s) processed", out.getvalue())
+
+
+class PaymentSubscribersTest(TestCase):
+    def test_payment_side_effects_run_in_the_worker(self):
+        user = User.objects.create_user(username="buyer", email="buyer@example.com", password="pass12345")
+        order = Order.objects.create(user=user, total_price=100)
+        with self.assertNumQueries(2):  # payment insert + outbox insert
+            payment = Payment.objects.create(order=order, amount=100, gateway="cod", status="completed")
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, "pending")
+        self.assertFalse(UserActivity.objects.exists())
+
+        drain_all()
+        order.refresh_from_db()
+        self.assertEqual(order.status, "paid")
+        self.assertTrue(
+            UserActivity.objects.filter(activity_type="payment_completed", reference_id=str(payment.pk)).exists()
+        )
+        self.assertFalse(OutboxEvent.objects.exclude(status=OutboxEvent.Statuses.DONE).exists())
+
+    def test_returning_to_an_earlier_status_is_delivered_again(self):
+        user = User.objects.create_user(username="buyer", email="buyer@example.com", password="pass12345")
+        order = Order.objects.create(user=user, total_price=100)
+        payment = Payment.objects.create(order=order, amount=100, gateway="esewa", status="failed")
+        for status in ("pending", "failed"):
+            payment.status = status
+            payment.save()
+
+        events = OutboxEvent.objects.filter(handler__endswith="update_order_status_on_payment")
+        self.assertEqual([event.payload["status"] for event in events.order_by("id")], ["failed", "pending", "failed"])
@@ -113,7 +113,7 @@ class PaymentCreateSerializer(serializers.ModelSerializer):
             payment.save(update_fields=["status"])
 
         # ✅ Check if the order is now fully paid
-        order = payment.order
+        order = Order.objects.with_payment_totals().get(pk=payment.order_id)
         if order.is_fully_paid:
             order.status = "paid"
             order.save(update_fields=["status"])
@@ -136,7 +136,7 @@ class PaymentUpdateSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         instance = super().update(instance, validated_data)
 
-        order = instance.order
+        order = Order.objects.with_payment_totals().get(pk=instance.order_id)
 
         # ✅ If payment is refunded or failed → check balance
         if instance.status in ["refunded", "failed"]:
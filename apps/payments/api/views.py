@@ -1,3 +1,8 @@
+from decimal import Decimal
+
+import requests
+from django.conf import settings
+from django.db.models import Prefetch
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -10,6 +15,7 @@ from apps.payments.api.serializers import (
     PaymentCreateSerializer,
     PaymentUpdateSerializer,
 )
+from apps.orders.models import Order
 from apps.payments.models import Payment
 
 class PaymentViewSet(viewsets.ModelViewSet):
@@ -19,7 +25,10 @@ class PaymentViewSet(viewsets.ModelViewSet):
     - retrieve: show detailed payment info
     - create: initiate a payment
     - update/partial_update: update status (admin/gateway only)    """
-    queryset = Payment.objects.all().select_related("order", "order__user")
+    # orders come with their payment totals annotated (is_fully_paid needs no extra query)
+    queryset = Payment.objects.all().prefetch_related(
+        Prefetch("order", queryset=Order.objects.with_payment_totals().select_related("user"))
+    )
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -47,7 +56,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
         """ Auto-update order status if fully paid """
         payment = serializer.save()
         # update order status automatically if fully paid
-        order = payment.order
+        order = Order.objects.with_payment_totals().get(pk=payment.order_id)
         if order.is_fully_paid:
             order.status = "paid"
         else:
@@ -114,8 +123,8 @@ class PaymentViewSet(viewsets.ModelViewSet):
             payment.status = "completed"
             payment.save(update_fields=["status"])
 
-        # Update order status
-        order = payment.order
+        # Update order status (fresh totals now that the payment changed)
+        order = Order.objects.with_payment_totals().get(pk=payment.order_id)
         if order.is_fully_paid:
             order.status = "paid"
         else:
@@ -137,7 +146,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
             payment.save(update_fields=["status"])
         
             # Optionally, update order status based on the new payment status
-            order = payment.order
+            order = Order.objects.with_payment_totals().get(pk=payment.order_id)
             if order.total_paid <= Decimal("0.00"):
                 # all payments have been refunded
                 order.status = "refunded"
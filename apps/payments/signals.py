@@ -1,29 +1,56 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from apps.orders.models import Order
+from apps.outbox.services.outbox_service import publish, subscriber
 from apps.payments.models import Payment
 
+PAYMENT_SAVED = "payment.saved"
+
+
 @receiver(post_save, sender=Payment)
-def update_order_status_on_payment(sender, instance, created, **kwargs):
+def publish_payment_saved(sender, instance, created, **kwargs):
+    """
+    Record the payment change in the outbox (same transaction as the save).
+    Subscribers (order status, invoices, analytics, notifications) run in
+    the outbox worker instead of the request and are idempotent. Every save
+    is its own event (``updated_at`` moves on each one), so a payment that
+    returns to an earlier status, e.g. failed -> pending -> failed, is
+    delivered again; only a replay of the same save is deduplicated.
+    """
+    publish(
+        PAYMENT_SAVED,
+        {"payment_id": instance.pk, "status": instance.status, "created": created},
+        key=f"{instance.pk}:{instance.updated_at.isoformat()}",
+    )
+
+
+@subscriber(PAYMENT_SAVED)
+def update_order_status_on_payment(payload):
     """
     Automatically update the associated order's status to 'paid' if the payment is completed
     """
-    order = instance.order
+    order_id = Payment.objects.filter(pk=payload["payment_id"]).values_list("order_id", flat=True).first()
+    if order_id is None:
+        return  # payment deleted since
+    # completed/refunded sums come annotated with the order (one query)
+    order = Order.objects.with_payment_totals().get(pk=order_id)
+    status = payload["status"]
     # CASE 1; completed payment
     # only update if the payment is completed.
-    if instance.status == "completed":
+    if status == "completed":
         if order.is_fully_paid:
             order.status = "paid"
         else:
             order.status = 'pending' # still waiting for the full payment
 
     # Case 2: Failed payment
-    elif instance.status == "failed":
+    elif status == "failed":
         if not order.is_fully_paid:
             order.status = "pending"
 
     # Case 3: Refunded (optional)
-    elif instance.status == "refunded":
+    elif status == "refunded":
         if not order.is_fully_paid:
             order.status = "pending"  
                   
-    order.save(update_fields=['status'])
\ No newline at end of file
+    order.save(update_fields=['status'])
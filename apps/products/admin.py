@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from apps.products.models import Category, Product, ProductSpecification, Review
+from apps.products.models import Category, Product, ProductSpecification, Review, StockReservation
 
 # -------------------------------
 # Inline for ProductSpecification
@@ -90,4 +90,24 @@ class ReviewAdmin(admin.ModelAdmin):
     list_filter = ("rating", "is_verified_purchase", "is_approved", "created_at")
     search_fields = ("product__name", "user__username", "comment")
     readonly_fields = ("created_at", "updated_at")
-    autocomplete_fields = ("product", "user")
\ No newline at end of file
+    autocomplete_fields = ("product", "user")
+
+# -------------------------------
+# Stock Reservation Admin
+# -------------------------------
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    """
+    Read-only: reservations move stock, so they change only through
+    apps.products.services.inventory_service.
+    """
+    list_display = ("product", "user", "quantity", "status", "reference", "expires_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("product__name", "product__sku", "user__username", "reference")
+    list_select_related = ("product", "user")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,42 @@
+import django_filters
+from rest_framework import filters
+
+from apps.products.models import Product
+from apps.products.services.category_service import get_category_tree
+
+
+class ProductOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that leaves search results in relevance order unless the
+    client asks for an explicit ?ordering=.
+    """
+
+    def get_default_ordering(self, view):
+        params = view.request.query_params
+        if params.get("q") or params.get("search"):
+            return None
+        return super().get_default_ordering(view)
+
+
+class ProductFilter(django_filters.FilterSet):
+    """
+    ``?category__slug=`` matches the category and all of its descendants
+    through the closure table (one join); the slug is resolved from the
+    cached category tree.
+    """
+    category__slug = django_filters.CharFilter(method="filter_category_subtree")
+
+    class Meta:
+        model = Product
+        fields = {
+            "brand": ["exact", "icontains"],
+            "is_available": ["exact"],
+            "price": ["gte", "lte"],
+            "discount_percentage": ["gte"],
+        }
+
+    def filter_category_subtree(self, queryset, name, value):
+        category = get_category_tree().get_by_slug(value)
+        if category is None:
+            return queryset.none()
+        return queryset.filter(category__ancestor_links__ancestor_id=category["id"])
@@ -1,4 +1,5 @@
 from rest_framework.pagination import PageNumberPagination
+from core.pagination import KeysetPagination
 
 class StandardResultsSetPagination(PageNumberPagination):
     """
@@ -8,4 +9,15 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size = 10                      # Default items per page
     page_size_query_param = 'page_size' # Allow ?page_size=20
     max_page_size = 100                 # Prevent abuse
-    page_query_param = 'page'           # Allow ?page=2
\ No newline at end of file
+    page_query_param = 'page'           # Allow ?page=2
+
+class ProductKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for the product catalogue (newest first).
+    Requests using ?ordering= or ?page=, and searches (ranked by relevance),
+    fall back to page numbers.
+    """
+    page_size = 10
+    max_page_size = 100
+    fallback_class = StandardResultsSetPagination
+    fallback_query_params = ("ordering", "page", "q", "search")
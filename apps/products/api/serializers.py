@@ -1,7 +1,8 @@
 from rest_framework import serializers
-from django.db.models import Avg
 from apps.products.models import Category, Product, ProductSpecification, Review
 from cloudinary.utils import cloudinary_url
+from apps.products.services.category_service import get_category_tree
+from core.mixins import SparseFieldsetMixin
 
 
 # ================================
@@ -15,9 +16,8 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "slug", "parent", "children"]
 
     def get_children(self, obj):
-        if obj.children.exists():
-            return CategorySerializer(obj.children.all(), many=True).data
-        return []
+        # assembled from the cached tree: no query per node
+        return get_category_tree().serialize_children(obj.pk)
 
 
 # ================================
@@ -52,7 +52,7 @@ class ReviewSerializer(serializers.ModelSerializer):
 # ================================
 # PRODUCT SERIALIZER (FINAL + CLEAN)
 # ================================
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     specifications = ProductSpecificationSerializer(many=True, read_only=True)
     reviews = ReviewSerializer(many=True, read_only=True)
@@ -62,6 +62,7 @@ class ProductSerializer(serializers.ModelSerializer):
     final_price = serializers.SerializerMethodField()
     avg_rating = serializers.SerializerMethodField()
     review_count = serializers.SerializerMethodField()
+    rating_histogram = serializers.ReadOnlyField()
 
     # Image URL helpers
     thumbnail_url = serializers.SerializerMethodField()
@@ -95,6 +96,7 @@ class ProductSerializer(serializers.ModelSerializer):
             "reviews",
             "avg_rating",
             "review_count",
+            "rating_histogram",
             "created_at",
         ]
 
@@ -108,11 +110,11 @@ class ProductSerializer(serializers.ModelSerializer):
         return obj.final_price
 
     def get_avg_rating(self, obj):
-        avg = obj.reviews.aggregate(avg=Avg("rating"))["avg"]
-        return round(avg, 1) if avg else 0.0
+        # denormalized on the product row (apps.products.services.rating_service)
+        return round(float(obj.rating_avg), 1)
 
     def get_review_count(self, obj):
-        return obj.reviews.filter(is_approved=True).count()
+        return obj.rating_count
 
     # ================================
     # IMAGE URL HELPERS
@@ -131,6 +133,29 @@ class ProductSerializer(serializers.ModelSerializer):
         return urls
 
 
+# ================================
+# PRODUCT CARD SERIALIZER (collections)
+# ================================
+class ProductCardSerializer(ProductSerializer):
+    """
+    Compact representation for list pages and nested product references.
+    Heavy fields (description, reviews, specifications...) are left out unless
+    requested with ?expand= or ?fields=.
+    """
+
+    class Meta(ProductSerializer.Meta):
+        default_fields = [
+            "id",
+            "slug",
+            "name",
+            "price",
+            "final_price",
+            "thumbnail_url",
+            "avg_rating",
+            "review_count",
+        ]
+
+
 class ProductReadSerializer(serializers.ModelSerializer):
     thumbnail_url = serializers.SerializerMethodField()
     images_urls = serializers.SerializerMethodField()
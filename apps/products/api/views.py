@@ -1,23 +1,53 @@
-from rest_framework import viewsets, filters, permissions
+import json
+
+from rest_framework import viewsets, permissions
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg, Count, Prefetch, Q
+from django.db.models import F, Prefetch
 from  django.db import transaction
 from rest_framework import status
 from rest_framework.response import Response
-from django.core.cache import cache
-from django.shortcuts import get_object_or_404
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.throttling import ScopedRateThrottle
 from apps.products.models import Category, Product, ProductSpecification, Review
 from apps.products.api.serializers import (
     CategorySerializer, 
     ProductSpecificationSerializer,
+    ProductCardSerializer,
     ProductSerializer,
     ReviewSerializer
 )
-from apps.products.api.pagination import StandardResultsSetPagination
+from apps.products.api.filters import ProductFilter, ProductOrderingFilter
+from apps.products.api.pagination import ProductKeysetPagination
+from apps.products.services import inventory_service
+from apps.products.services.category_service import get_category_tree
+from apps.products.services.facet_service import compute_facets
+from apps.products.services.search_service import search_products
+from apps.products.services.spec_service import apply_spec_filters, spec_facets
+from apps.products.services.stock_import_service import (
+    DEFAULT_BATCH_SIZE as STOCK_IMPORT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE as STOCK_IMPORT_CHUNK_SIZE,
+    FORMATS as STOCK_IMPORT_FORMATS,
+    StockImportError,
+    detect_format,
+    iter_stock_import,
+)
+from apps.products.services.cache_service import (
+    PRODUCT_COLLECTION_TAG,
+    collection_tags,
+    invalidate_products,
+    product_detail_key,
+    product_facets_key,
+    product_list_key,
+    product_spec_facets_key,
+    product_tags,
+)
+from core.caching import Tagged, read_through
+from core.mixins import parse_field_list
 
 # TTL for anonymous caching (seconds). Use a short TTL so updates propagate quickly.
 CACHE_TTL = 60 * 2  # 2 minutes
@@ -26,16 +56,38 @@ CACHE_TTL = 60 * 2  # 2 minutes
 class CategoryViewSet(viewsets.ModelViewSet):
     """
     Provides CRUD operations for product categories.
-    Supports nested category serialization.
+    Reads are served from the cached category tree (no per-node queries).
     """
-    queryset = Category.objects.prefetch_related('children').all()
+    queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = "slug" # Use slug for URL lookups like /categories/laptops/
 
     def get_queryset(self):
         """Return root categories if no parent specified."""
-        return Category.objects.filter(parent__isnull=True).prefetch_related('children')
+        if self.action == "list":
+            return Category.objects.filter(parent__isnull=True)
+        return Category.objects.all()
+
+    def list(self, request, *args, **kwargs):
+        tree = get_category_tree()
+        roots = [tree.serialize(node) for node in tree.roots]
+        page = self.paginate_queryset(roots)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(roots)
+
+    def retrieve(self, request, *args, **kwargs):
+        node = get_category_tree().get_by_slug(kwargs[self.lookup_field])
+        if node is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(get_category_tree().serialize(node))
+
+    def perform_update(self, serializer):
+        try:
+            serializer.save()
+        except ValueError as exc:
+            raise ValidationError({"parent": str(exc)})
 
 
 # 🛍 PRODUCT VIEWSET
@@ -43,53 +95,52 @@ class ProductViewSet(viewsets.ModelViewSet):
    """
     Production-grade product API:
       - optimized queryset with select_related / prefetch_related
-      - annotated avg_rating & review_count (only approved reviews)
+      - avg_rating & review_count read from the denormalized rating columns
       - public read endpoints are cached for anonymous users
       - admin-only write operations
-      - search, filters, ordering, pagination
+      - search, filters, ordering, keyset (cursor) pagination
       - admin-only bulk stock updates (atomic + bulk_update)
     """
    queryset = Product.objects.all()
    serializer_class = ProductSerializer
    lookup_field = "slug"
-   pagination_class = StandardResultsSetPagination
+   pagination_class = ProductKeysetPagination
    throttle_scope = "product_browse"
    throttle_classes = [ScopedRateThrottle]
 
-    # static base queryset: annotate aggregated fields to avoid per-instance DB hits
+    # static base queryset: rating aggregates are columns on the product row,
+    # aliased so filters/ordering keep their public names (no reviews JOIN)
    base_queryset = (
         Product.objects.select_related("category")
-        .prefetch_related(
-            "specifications",
-            Prefetch("reviews", queryset=Review.objects.filter(is_approved=True))
-        )
-        .annotate(
-            avg_rating=Avg("reviews__rating", filter=Q(reviews__is_approved=True)),
-            review_count=Count("reviews", filter=Q(reviews__is_approved=True)),
-        )
+        .annotate(avg_rating=F("rating_avg"), review_count=F("rating_count"))
     )
 
+    # related data each serializer field needs; only the fields actually
+    # rendered (card vs detail, ?fields= / ?expand=) get prefetched
+   field_prefetches = {
+        "specifications": ["specifications"],
+        "gallery": ["gallery"],
+        "gallery_urls": ["gallery"],
+        "reviews": [Prefetch("reviews", queryset=Review.objects.filter(is_approved=True).select_related("user"))],
+    }
+
+    # collection endpoints render the compact card representation
+   card_actions = ["list", "search", "discounted", "featured", "by_category"]
+
     # Filter / Search / Ordering config
-   filter_backends = [filters.SearchFilter, filters.OrderingFilter, filters.BaseFilterBackend]
-   search_fields = ["name", "sku", "brand", "description"]
+   filter_backends = [ProductOrderingFilter, DjangoFilterBackend]
    ordering_fields = ["price", "created_at", "stock", "review_count"]
    ordering = ["-created_at"]
 
-   filterset_fields = {
-        "category__slug": ["exact"],
-        "brand": ["exact", "icontains"],
-        "is_available": ["exact"],
-        "price": ["gte", "lte"],
-        "discount_percentage": ["gte"],
-    }
+   filterset_class = ProductFilter
 
  # -------- permissions --------
    def get_permissions(self):
         # read (list/retrieve/search) public
-        if self.action in ["list", "retrieve", "search", "discounted", "featured", "by_category"]:
+        if self.action in ["list", "retrieve", "search", "suggest", "discounted", "featured", "by_category", "facets", "spec_facets"]:
             return [permissions.AllowAny()]
         # admin-only for create/update/delete/bulk operations
-        if self.action in ["create", "update", "partial_update", "destroy", "bulk_update_stock", "set_availability"]:
+        if self.action in ["create", "update", "partial_update", "destroy", "bulk_update_stock", "import_stock", "set_availability"]:
             return [permissions.IsAdminUser()]
         return [permissions.IsAuthenticated()]
 
@@ -97,22 +148,27 @@ class ProductViewSet(viewsets.ModelViewSet):
    def get_queryset(self):
         """
         Return optimized queryset with dynamic filters applied from query params.
-        Use annotated aggregate fields for avg_rating & review_count.
+        avg_rating & review_count are indexed columns (rating_avg, rating_count).
         """
         qs = self.base_queryset
         request = getattr(self, "request", None)
 
+        prefetches = []
+        for field_name in self.get_serializer().fields:
+            for lookup in self.field_prefetches.get(field_name, []):
+                if lookup not in prefetches:
+                    prefetches.append(lookup)
+        qs = qs.prefetch_related(*prefetches)
+
         # Public users should see only available products
         if not request or not (request.user and request.user.is_staff):
             qs = qs.filter(is_available=True)
 
         # apply common query parameters
-        q = request.query_params.get("q") if request else None
+        # ?search= is kept as an alias of ?q= (both go through the search index)
+        q = (request.query_params.get("q") or request.query_params.get("search")) if request else None
         if q:
-            # simple DB search; for heavy use switch to full-text or external search engine
-            qs = qs.filter(
-                Q(name__icontains=q) | Q(description__icontains=q) | Q(sku__icontains=q) | Q(brand__icontains=q)
-            )
+            qs = search_products(qs, q)
 
         min_price = request.query_params.get("min_price")
         max_price = request.query_params.get("max_price")
@@ -143,41 +199,67 @@ class ProductViewSet(viewsets.ModelViewSet):
             elif in_stock.lower() in ("0", "false", "no"):
                 qs = qs.filter(stock__lte=0)
 
+        # ?spec[ram]=16GB, ?spec[ram][gte]=8GB ... (see services.spec_service)
+        qs = apply_spec_filters(qs, request.query_params)
+
+        if q:
+            return qs.order_by("-search_rank", *self.ordering)
         return qs.order_by(*self.ordering)
 
+    # -------- serializers --------
+   def get_serializer_class(self):
+        if self.action in self.card_actions:
+            return ProductCardSerializer
+        return ProductSerializer
+
+   def get_serializer(self, *args, **kwargs):
+        """Apply ?fields= / ?expand= sparse fieldsets to read requests."""
+        request = getattr(self, "request", None)
+        if request is not None and request.method == "GET":
+            kwargs.setdefault("fields", parse_field_list(request.query_params.get("fields")))
+            kwargs.setdefault("expand", parse_field_list(request.query_params.get("expand")))
+        return super().get_serializer(*args, **kwargs)
+
     # ---------- caching for anonymous users ----------
    def list(self, request, *args, **kwargs):
         """
         Cached for anonymous users. Cache key includes full path (querystring).
+        The cached page is tagged with the products it contains, so saving one
+        product only invalidates the pages that show it. Reads go through
+        `read_through`, so an expiring hot page is rebuilt by one worker while
+        the rest are served the previous copy.
         Admins & authenticated users get uncached, always fresh data.
         """
-        if not request.user.is_authenticated:
-            cache_key = f"product_list:{request.get_full_path()}"
-            cached = cache.get(cache_key)
-            if cached is not None:
-                return Response(cached)
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
 
-            resp = super().list(request, *args, **kwargs)
+        def compute():
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            products = page if page is not None else list(queryset)
+            serializer = self.get_serializer(products, many=True)
+            if page is not None:
+                data = self.get_paginated_response(serializer.data).data
+            else:
+                data = serializer.data
             # store only serialized data (not the response object)
-            cache.set(cache_key, resp.data, CACHE_TTL)
-            return resp
+            return Tagged(data, collection_tags(products))
 
-        return super().list(request, *args, **kwargs)
+        data = read_through(product_list_key(request.get_full_path()), compute, CACHE_TTL)
+        return Response(data)
    
    def retrieve(self, request, *args, **kwargs):
         # detail caching for anonymous users
         slug = kwargs.get("slug") or kwargs.get("pk")
-        if not request.user.is_authenticated:
-            cache_key = f"product_detail:{slug}"
-            cached = cache.get(cache_key)
-            if cached is not None:
-                return Response(cached)
+        if request.user.is_authenticated:
+            return super().retrieve(request, *args, **kwargs)
 
-            resp = super().retrieve(request, *args, **kwargs)
-            cache.set(cache_key, resp.data, CACHE_TTL)
-            return resp
+        def compute():
+            instance = self.get_object()
+            return Tagged(self.get_serializer(instance).data, product_tags(instance))
 
-        return super().retrieve(request, *args, **kwargs)
+        data = read_through(product_detail_key(slug), compute, CACHE_TTL)
+        return Response(data)
 
         # ---------- custom collection actions ----------
    @action(detail=False, methods=["get"], url_path="discounted")
@@ -186,9 +268,9 @@ class ProductViewSet(viewsets.ModelViewSet):
         qs = self.get_queryset().filter(discount_percentage__gt=0)
         page = self.paginate_queryset(qs)
         if page is not None:
-            serializer = ProductSerializer(page, many=True, context={"request": request})
+            serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
-        serializer = ProductSerializer(qs, many=True, context={"request": request})
+        serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
    
    @action(detail=False, methods=["get"], url_path="featured")
@@ -199,62 +281,155 @@ class ProductViewSet(viewsets.ModelViewSet):
          - Here we pick top by review_count then created_at (fast).
         """
         qs = self.get_queryset().order_by("-review_count", "-created_at")[:12]
-        serializer = ProductSerializer(qs, many=True, context={"request": request})
+        serializer = self.get_serializer(qs, many=True)
         return Response({"count": len(qs), "results": serializer.data})
    
    @action(detail=False, methods=["get"], url_path=r"by-category/(?P<category_slug>[^/.]+)")
    def by_category(self, request, category_slug=None):
-        category = get_object_or_404(Category, slug=category_slug)
-        qs = self.get_queryset().filter(category=category)
+        tree = get_category_tree()
+        category = tree.get_by_slug(category_slug)
+        if category is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        # the category and everything below it: one join on the closure table
+        qs = self.get_queryset().filter(category__ancestor_links__ancestor_id=category["id"])
         page = self.paginate_queryset(qs)
         if page is not None:
-            serializer = ProductSerializer(page, many=True, context={"request": request})
+            serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
-        serializer = ProductSerializer(qs, many=True, context={"request": request})
-        return Response({"category": category.name, "results": serializer.data})
+        serializer = self.get_serializer(qs, many=True)
+        return Response({"category": category["name"], "results": serializer.data})
    
    @action(detail=False, methods=["get"], url_path="search")
    def search(self, request):
         """
-        Exposes DB search as /products/search/?q=...
-        For production scale, use Elastic/OpenSearch or PostgreSQL full-text search.
+        Exposes product search as /products/search/?q=...
+        Results are ranked by relevance (see services.search_service).
         """
-        qs = self.get_queryset()  # get_queryset already accepts ?q=
-        return self.list(request)
+        return self.list(request)  # get_queryset already accepts ?q=
+
+   @action(detail=False, methods=["get"], url_path="facets")
+   def facets(self, request):
+        """
+        Facet counts (brand, category, price, rating, in stock) for the same
+        filters as the list: /products/facets/?q=laptop&min_price=500
+        Computed by one grouped query; cached for anonymous users and tagged
+        with every brand and category counted.
+        """
+        def compute():
+            return Tagged(*compute_facets(self.filter_queryset(self.get_queryset())))
+
+        if request.user.is_authenticated:
+            return Response(compute().value)
+        return Response(read_through(product_facets_key(request.get_full_path()), compute, CACHE_TTL))
+
+   @action(detail=False, methods=["get"], url_path="spec-facets")
+   def spec_facets(self, request):
+        """
+        Specification value counts for the same filters as the list:
+        /products/spec-facets/?keys=ram,cpu&spec[ram][gte]=8GB
+        One grouped query over the (key, value, product) index; numeric keys
+        also report min/max. Cached for anonymous users.
+        """
+        keys = parse_field_list(request.query_params.get("keys"))
+
+        def compute():
+            return Tagged(
+                spec_facets(self.filter_queryset(self.get_queryset()), keys), [PRODUCT_COLLECTION_TAG]
+            )
+
+        if request.user.is_authenticated:
+            return Response(compute().value)
+        return Response(read_through(product_spec_facets_key(request.get_full_path()), compute, CACHE_TTL))
+
+   @action(detail=False, methods=["get"], url_path="suggest")
+   def suggest(self, request):
+        """
+        Type-ahead suggestions: /products/suggest/?q=mac
+        Every term is prefix-matched; returns the 10 most relevant products.
+        """
+        q = request.query_params.get("q", "")
+        if not q.strip():
+            return Response([])
+        qs = search_products(Product.objects.filter(is_available=True), q)
+        return Response(qs.order_by("-search_rank")[:10].values("id", "name", "slug"))
 
  # ---------- admin-only bulk / detail actions ----------
    @action(detail=False, methods=["post"], url_path="bulk-update-stock", permission_classes=[permissions.IsAdminUser])
    def bulk_update_stock(self, request):
         """
-        Payload: [{ "sku": "MP123", "stock": 10 }, ...]
-        Uses bulk_update and transaction for performance and atomicity.
+        Payload: [{ "sku": "MP123", "stock": 10 }, { "sku": "MP124", "delta": -2 }, ...]
+          - "stock": on-hand count; units held by active reservations are
+            subtracted so they are not sold twice
+          - "delta": relative adjustment applied atomically (F-expression)
+        Each kind is applied with a single UPDATE, never read-modify-write.
         """
         updates = request.data
         if not isinstance(updates, list):
             return Response({"detail": "Expected a list"}, status=status.HTTP_400_BAD_REQUEST)
 
-        skus = [i.get("sku") for i in updates if i.get("sku")]
+        skus = [i.get("sku") for i in updates if isinstance(i, dict) and i.get("sku")]
         existing = {p.sku: p for p in Product.objects.filter(sku__in=skus)}
-        to_update = []
-        for item in updates:
-            sku = item.get("sku")
-            stock = item.get("stock")
-            if sku not in existing or stock is None:
-                continue
-            prod = existing[sku]
-            prod.stock = int(stock)
-            prod.is_available = prod.stock > 0
-            to_update.append(prod)
+        levels, deltas = {}, {}
+        try:
+            for item in updates:
+                prod = existing.get(item.get("sku")) if isinstance(item, dict) else None
+                if prod is None:
+                    continue
+                if item.get("stock") is not None:
+                    levels[prod.pk] = int(item["stock"])
+                elif item.get("delta") is not None:
+                    deltas[prod.pk] = int(item["delta"])
+        except (TypeError, ValueError):
+            return Response({"detail": "stock and delta must be integers"}, status=status.HTTP_400_BAD_REQUEST)
 
         with transaction.atomic():
-            Product.objects.bulk_update(to_update, ["stock", "is_available", "updated_at"])
+            updated = inventory_service.set_stock_levels(levels) + inventory_service.adjust_stock(deltas)
 
-            # invalidate cache (simple)
-            # NOTE: for django-redis you can use cache.delete_pattern('product_list:*')
-            cache.clear()
+            # queryset updates skip post_save, so invalidate the affected pages here
+            to_update = [p for p in existing.values() if p.pk in levels or p.pk in deltas]
+            transaction.on_commit(lambda: invalidate_products(to_update, membership_changed=True))
 
-        return Response({"updated": len(to_update)})
+        return Response({"updated": updated})
    
+   @action(detail=False, methods=["post"], url_path="import-stock", permission_classes=[permissions.IsAdminUser])
+   def import_stock(self, request):
+        """
+        Streaming stock import for supplier feeds (multipart "file" field):
+          - CSV with a header: sku,stock or sku,delta
+          - JSONL: one {"sku": ..., "stock"/"delta": ...} object per line
+        ?format=csv|jsonl (default: from the file name), ?chunk_size=, ?batch_size=
+        The file is read incrementally and applied chunk by chunk; the
+        response is NDJSON with one progress line per chunk (per-row errors,
+        rows/s) and a final {"done": true, ...} summary.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"detail": "Upload the feed as a 'file' field."}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.query_params.get("format") or detect_format(upload.name)
+        if fmt not in STOCK_IMPORT_FORMATS:
+            return Response({"detail": f"format must be one of: {', '.join(STOCK_IMPORT_FORMATS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            chunk_size = int(request.query_params.get("chunk_size", STOCK_IMPORT_CHUNK_SIZE))
+            batch_size = int(request.query_params.get("batch_size", STOCK_IMPORT_BATCH_SIZE))
+        except ValueError:
+            return Response({"detail": "chunk_size and batch_size must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        if chunk_size < 1 or batch_size < 1:
+            return Response({"detail": "chunk_size and batch_size must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+
+        reports = iter_stock_import(upload.file, fmt, chunk_size=chunk_size, batch_size=batch_size)
+        try:
+            first = next(reports)  # a malformed feed is reported before the stream starts
+        except StockImportError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def lines():
+            yield json.dumps(first, cls=DjangoJSONEncoder) + "\n"
+            for report in reports:
+                yield json.dumps(report, cls=DjangoJSONEncoder) + "\n"
+
+        return StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+
    @action(detail=True, methods=["post"], url_path="set-availability", permission_classes=[permissions.IsAdminUser])
    def set_availability(self, request, slug=None):
         product = self.get_object()
@@ -262,9 +437,8 @@ class ProductViewSet(viewsets.ModelViewSet):
         if is_available is None:
             return Response({"detail": "is_available required"}, status=status.HTTP_400_BAD_REQUEST)
         product.is_available = bool(is_available)
+        # post_save (apps.products.signals) invalidates the tagged caches
         product.save(update_fields=["is_available", "updated_at"])
-        cache.delete(f"product_detail:{product.slug}")
-        cache.clear()
         return Response({"detail": "ok"})
     
    def partial_update(self, request, *args, **kwargs):
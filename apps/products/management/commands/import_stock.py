@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.products.services.stock_import_service import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    StockImportError,
+    detect_format,
+    iter_stock_import,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import stock levels (sku,stock) or adjustments (sku,delta) from a CSV or JSONL supplier feed, "
+        "streaming the file and applying it chunk by chunk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Feed file (.csv, .jsonl/.ndjson).")
+        parser.add_argument("--format", choices=FORMATS, help="Feed format (default: from the file name).")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per transaction.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Products per UPDATE.")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or detect_format(options["path"])
+        try:
+            with open(options["path"], "rb") as feed:
+                for report in iter_stock_import(
+                    feed, fmt, chunk_size=options["chunk_size"], batch_size=options["batch_size"]
+                ):
+                    if report.get("done"):
+                        break
+                    for error in report["errors"]:
+                        self.stderr.write(f"line {error['line']} ({error['sku'] or '-'}): {error['error']}")
+                    self.stdout.write(
+                        f"chunk {report['chunk']}: {report['rows']} row(s), {report['updated']} updated, "
+                        f"{report['rows_per_second']} rows/s"
+                    )
+        except (OSError, StockImportError) as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['rows']} row(s) in {report['seconds']}s: {report['updated']} updated, "
+            f"{report['skipped']} skipped (would go below zero), {report['error_count']} error(s)."
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.products.services.rating_service import reconcile_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized rating columns on products from approved reviews "
+        "and fix any drift (e.g. after queryset.update() or raw SQL on reviews)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="Report drifted products without updating them.")
+
+    def handle(self, *args, **options):
+        count = reconcile_ratings(batch_size=options["batch_size"], dry_run=options["dry_run"])
+        verb = "would be updated" if options["dry_run"] else "updated"
+        self.stdout.write(self.style.SUCCESS(f"{count} product(s) {verb}."))
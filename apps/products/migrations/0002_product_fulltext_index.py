@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# FULLTEXT indexes are MySQL-specific; other backends use the in-memory
+# search index (apps.products.services.search_service).
+FULLTEXT_INDEXES = {
+    "product_search_ft": "name, sku, brand, description",
+    "product_name_ft": "name",
+}
+
+
+def create_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    for name, columns in FULLTEXT_INDEXES.items():
+        schema_editor.execute(f"CREATE FULLTEXT INDEX {name} ON products_product ({columns})")
+
+
+def drop_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    for name in FULLTEXT_INDEXES:
+        schema_editor.execute(f"DROP INDEX {name} ON products_product")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_indexes, drop_fulltext_indexes),
+    ]
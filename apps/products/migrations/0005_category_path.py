@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:20
+
+from django.db import migrations, models
+
+
+def backfill_category_paths(apps, schema_editor):
+    Category = apps.get_model("products", "Category")
+    parents = dict(Category.objects.values_list("pk", "parent_id"))
+    paths = {}
+
+    def path_of(pk):
+        if pk not in paths:
+            parent = parents[pk]
+            paths[pk] = f"{path_of(parent) if parent else ''}{pk}/"
+        return paths[pk]
+
+    for pk in parents:
+        path = path_of(pk)
+        Category.objects.filter(pk=pk).update(path=path, depth=path.count("/") - 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_stock_reservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_category_paths, migrations.RunPython.noop),
+    ]
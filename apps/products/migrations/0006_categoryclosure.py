@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_category_closure(apps, schema_editor):
+    Category = apps.get_model("products", "Category")
+    CategoryClosure = apps.get_model("products", "CategoryClosure")
+    links = []
+    for pk, path in Category.objects.values_list("pk", "path"):
+        ancestors = [int(part) for part in path.split("/") if part]
+        links += [
+            CategoryClosure(ancestor_id=ancestor_id, descendant_id=pk, depth=len(ancestors) - 1 - i)
+            for i, ancestor_id in enumerate(ancestors)
+        ]
+    CategoryClosure.objects.bulk_create(links, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_category_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='products.category')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='products.category')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'ancestor'], name='products_ca_descend_8417a9_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='uniq_category_closure_pair')],
+            },
+        ),
+        migrations.RunPython(backfill_category_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+def backfill_normalized_specs(apps, schema_editor):
+    from apps.products.services.spec_service import normalize_key, normalize_value, parse_number
+
+    ProductSpecification = apps.get_model("products", "ProductSpecification")
+    batch = []
+    for spec in ProductSpecification.objects.only("pk", "key", "value").iterator(chunk_size=1000):
+        spec.normalized_key = normalize_key(spec.key)
+        spec.normalized_value = normalize_value(spec.value)
+        spec.numeric_value, exact = parse_number(spec.value)
+        spec.value_type = "number" if exact else "text"
+        batch.append(spec)
+        if len(batch) == 1000:
+            ProductSpecification.objects.bulk_update(
+                batch, ["normalized_key", "normalized_value", "numeric_value", "value_type"]
+            )
+            batch = []
+    if batch:
+        ProductSpecification.objects.bulk_update(
+            batch, ["normalized_key", "normalized_value", "numeric_value", "value_type"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_categoryclosure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productspecification',
+            name='normalized_key',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='productspecification',
+            name='normalized_value',
+            field=models.CharField(blank=True, editable=False, max_length=191),
+        ),
+        migrations.AddField(
+            model_name='productspecification',
+            name='numeric_value',
+            field=models.DecimalField(blank=True, decimal_places=4, editable=False, max_digits=24, null=True),
+        ),
+        migrations.AddField(
+            model_name='productspecification',
+            name='value_type',
+            field=models.CharField(choices=[('number', 'Number'), ('text', 'Text')], default='text', editable=False, max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='productspecification',
+            index=models.Index(fields=['normalized_key', 'normalized_value', 'product'], name='products_pr_normali_02ca62_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productspecification',
+            index=models.Index(fields=['normalized_key', 'numeric_value', 'product'], name='products_pr_normali_15bdac_idx'),
+        ),
+        migrations.RunPython(backfill_normalized_specs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_productspecification_normalized'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='category',
+            name='depth',
+        ),
+        migrations.RemoveField(
+            model_name='category',
+            name='path',
+        ),
+    ]
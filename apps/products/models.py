@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from rest_framework.permissions import AllowAny
 from django.utils.text import slugify
 from django.conf import settings
@@ -30,14 +30,77 @@ class Category(models.Model):
         ordering = ["name"]
 
     def save(self, *args, **kwargs):
+        # ``parent`` is what the admin edits; CategoryClosure is the only
+        # derived hierarchy (subtree filters, cycle check) and is kept in step here
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            stored = Category.objects.filter(pk=self.pk).values("parent_id").first() if self.pk else None
+            if stored is not None and self.parent_id and CategoryClosure.objects.filter(
+                ancestor_id=self.pk, descendant_id=self.parent_id
+            ).exists():
+                raise ValueError("A category cannot be moved under itself or one of its descendants.")
+            super().save(*args, **kwargs)
+
+            if stored is None:
+                CategoryClosure.attach(self)
+            elif stored["parent_id"] != self.parent_id:
+                CategoryClosure.move_subtree(self)
 
     def __str__(self):
         return f"{self.name}"
 
 
+class CategoryClosure(models.Model):
+    """
+    One row per (ancestor, descendant) pair of the category tree, including
+    each category paired with itself at depth 0. "Products anywhere under
+    category X" is a single join:
+    ``Product.objects.filter(category__ancestor_links__ancestor_id=X)``.
+    Rows are written by ``Category.save`` and removed by the FK cascade when
+    a category is deleted.
+    """
+    ancestor = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="descendant_links")
+    descendant = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="ancestor_links")
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ancestor", "descendant"], name="uniq_category_closure_pair"),
+        ]
+        indexes = [
+            models.Index(fields=["descendant", "ancestor"]),
+        ]
+
+    @classmethod
+    def attach(cls, category):
+        """Link a new category to itself and to every ancestor of its parent."""
+        links = [cls(ancestor_id=category.pk, descendant_id=category.pk, depth=0)]
+        if category.parent_id:
+            links += [
+                cls(ancestor_id=ancestor_id, descendant_id=category.pk, depth=depth + 1)
+                for ancestor_id, depth in cls.objects.filter(descendant_id=category.parent_id)
+                .values_list("ancestor_id", "depth")
+            ]
+        cls.objects.bulk_create(links)
+
+    @classmethod
+    def move_subtree(cls, category):
+        """Re-link ``category``'s subtree below its (new) parent."""
+        subtree = list(cls.objects.filter(ancestor_id=category.pk).values_list("descendant_id", "depth"))
+        subtree_ids = [descendant_id for descendant_id, _ in subtree]
+        # cut the links from the old ancestors; links inside the subtree stay
+        cls.objects.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+        if category.parent_id:
+            ancestors = cls.objects.filter(descendant_id=category.parent_id).values_list("ancestor_id", "depth")
+            cls.objects.bulk_create([
+                cls(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + down + 1)
+                for ancestor_id, up in ancestors
+                for descendant_id, down in subtree
+            ])
+
+
 # product 
 class Product(models.Model):
     """
@@ -81,18 +144,48 @@ class Product(models.Model):
     # 🖼️ Media
     thumbnail = models.ImageField(upload_to="products/thumbnails/", blank=True, null=True)
 
+    # ⭐ Rating aggregates over approved reviews, kept in sync incrementally
+    # (see apps.products.services.rating_service)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_avg = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+
     # 🕒 Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     # ⚙️ Options
+    # every field a collection page filters, searches, orders or counts by
+    # (list/filterset params, ?q=, discounted, featured, facets); changing one
+    # can move the product between cached pages (see services.cache_service)
+    MEMBERSHIP_FIELDS = (
+        "is_available", "price", "stock", "category_id", "brand", "discount_percentage",
+        "name", "sku", "description", "rating_avg", "rating_count",
+    )
+
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["sku", "slug"]),
             models.Index(fields=["category", "is_available"]),
+            models.Index(fields=["rating_avg"]),
+            models.Index(fields=["rating_count"]),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the fields the list filters read, so a later save can
+        # tell whether the product may have moved between cached pages
+        if set(cls.MEMBERSHIP_FIELDS) <= set(field_names):
+            instance._membership_state = tuple(getattr(instance, field) for field in cls.MEMBERSHIP_FIELDS)
+        return instance
+
     def save(self, *args, **kwargs):
         """Automatically generate slug if missing."""
         if not self.slug:
@@ -117,6 +210,11 @@ class Product(models.Model):
     def final_price(self):
         """Get the price after discount."""
         return self.price - self.discount_amount
+
+    @property
+    def rating_histogram(self):
+        """Approved review count per star, e.g. {"5": 12, "4": 3, ...}."""
+        return {str(star): getattr(self, f"rating_{star}_count") for star in range(5, 0, -1)}
     
 # product specification model
 class ProductSpecification(models.Model):
@@ -130,17 +228,44 @@ class ProductSpecification(models.Model):
         on_delete=models.CASCADE,
         related_name="specifications"
     )
+    class ValueTypes(models.TextChoices):
+        NUMBER = "number", "Number"
+        TEXT = "text", "Text"
+
     key = models.CharField(max_length=255)     # Example: "CPU", "RAM", "Display"
     value = models.TextField()                 # Example: "Ryzen 7 7735HS"
 
+    # filtering copies, filled on save (see services.spec_service)
+    normalized_key = models.CharField(max_length=100, blank=True, editable=False)     # "ram"
+    normalized_value = models.CharField(max_length=191, blank=True, editable=False)   # "16gb ddr5"
+    numeric_value = models.DecimalField(
+        max_digits=24, decimal_places=4, null=True, blank=True, editable=False
+    )  # 16 (GB)
+    value_type = models.CharField(
+        max_length=10, choices=ValueTypes.choices, default=ValueTypes.TEXT, editable=False
+    )
+
     class Meta:
         indexes = [
             models.Index(fields=["product", "key"]),
+            models.Index(fields=["normalized_key", "normalized_value", "product"]),
+            models.Index(fields=["normalized_key", "numeric_value", "product"]),
         ]
         verbose_name = "Product Specification"
         verbose_name_plural = "Product Specifications"
         ordering = ["product", "key"]
 
+    def save(self, *args, **kwargs):
+        from apps.products.services.spec_service import normalize_spec  # local import to avoid cycles
+
+        normalize_spec(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"key", "value"} & set(update_fields):
+            kwargs["update_fields"] = {
+                *update_fields, "normalized_key", "normalized_value", "numeric_value", "value_type"
+            }
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.product.name} - {self.key}: {self.value}"
 
@@ -218,6 +343,15 @@ class Review(models.Model):
     def __str__(self):
         return f"{self.product.name} - {self.user.username} ({self.rating}⭐)"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember what this review contributed to the product's rating
+        # aggregates, so a later save can apply just the difference
+        if {"product_id", "rating", "is_approved"} <= set(field_names):
+            instance._rating_state = (instance.product_id, instance.rating) if instance.is_approved else None
+        return instance
+
     @property
     def short_comment(self):
         """Truncate comment for admin or preview."""
@@ -228,3 +362,46 @@ class Review(models.Model):
         """Return star icons for UI rendering."""
         return "★" * self.rating + "☆" * (5 - self.rating)
 
+
+
+class StockReservation(models.Model):
+    """
+    Units of a product taken out of `Product.stock` for a cart or an order.
+
+    Active reservations are temporary holds that give their units back when
+    they expire; committed ones belong to a placed order. The stock
+    bookkeeping lives in apps.products.services.inventory_service.
+    """
+    STATUS_ACTIVE = "active"
+    STATUS_COMMITTED = "committed"
+    STATUS_RELEASED = "released"
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, "Active"),
+        (STATUS_COMMITTED, "Committed"),
+        (STATUS_RELEASED, "Released"),
+    ]
+
+    product = models.ForeignKey("Product", on_delete=models.CASCADE, related_name="reservations")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="stock_reservations"
+    )
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    reference = models.CharField(max_length=64, blank=True, db_index=True)  # e.g. "cart", "order:42"
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "expires_at"]),
+            models.Index(fields=["product", "status"]),
+            models.Index(fields=["user", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} ({self.status})"
@@ -0,0 +1,100 @@
+# apps/products/services/cache_service.py
+from django.utils.text import slugify
+
+from apps.products.models import Product
+from core.caching import invalidate_tags
+
+PRODUCT_LIST_PREFIX = "product_list"
+PRODUCT_DETAIL_PREFIX = "product_detail"
+PRODUCT_FACETS_PREFIX = "product_facets"
+PRODUCT_SPEC_FACETS_PREFIX = "product_spec_facets"
+
+# Bumped when the set of products changes (create/delete), so every cached
+# collection page is rebuilt even if it did not contain the product.
+PRODUCT_COLLECTION_TAG = "product_collection"
+
+# Changing one of these can move a product onto a cached page it was never
+# tagged on, so it counts as a membership change.
+MEMBERSHIP_FIELDS = Product.MEMBERSHIP_FIELDS
+_MEMBERSHIP_UPDATE_FIELDS = {*MEMBERSHIP_FIELDS, "category"}
+
+
+def product_list_key(full_path):
+    return f"{PRODUCT_LIST_PREFIX}:{full_path}"
+
+
+def product_detail_key(slug):
+    return f"{PRODUCT_DETAIL_PREFIX}:{slug}"
+
+
+def product_facets_key(full_path):
+    return f"{PRODUCT_FACETS_PREFIX}:{full_path}"
+
+
+def product_spec_facets_key(full_path):
+    return f"{PRODUCT_SPEC_FACETS_PREFIX}:{full_path}"
+
+
+def product_tags(product):
+    """Tags a cached entry containing ``product`` must carry."""
+    tags = [f"product:{product.pk}", f"category:{product.category_id}"]
+    if product.brand:
+        tags.append(f"brand:{slugify(product.brand)}")
+    return tags
+
+
+def collection_tags(products):
+    """Tags for a cached page of products (list, search, by-category...)."""
+    tags = {PRODUCT_COLLECTION_TAG}
+    for product in products:
+        tags.update(product_tags(product))
+    return tags
+
+
+def membership_state(product):
+    return tuple(getattr(product, field) for field in MEMBERSHIP_FIELDS)
+
+
+def on_product_saving(product, update_fields=None):
+    """Load the stored membership fields of a product that was not fetched with them."""
+    if not product.pk or hasattr(product, "_membership_state"):
+        return
+    if update_fields is not None and not _MEMBERSHIP_UPDATE_FIELDS & set(update_fields):
+        product._membership_state = membership_state(product)
+        return
+    product._membership_state = Product.objects.filter(pk=product.pk).values_list(*MEMBERSHIP_FIELDS).first()
+
+
+def membership_changed_on_save(product):
+    """Whether the save moved the product's filter/sort fields; resets the snapshot."""
+    old = getattr(product, "_membership_state", None)
+    product._membership_state = membership_state(product)
+    return old != product._membership_state
+
+
+def invalidate_products(products, membership_changed=False):
+    """
+    Invalidate only the cached pages that contain ``products`` (or share
+    their category/brand). Pass ``membership_changed`` on create/delete and
+    when a ``MEMBERSHIP_FIELDS`` value changes.
+    """
+    tags = set()
+    for product in products:
+        tags.update(product_tags(product))
+    if membership_changed:
+        tags.add(PRODUCT_COLLECTION_TAG)
+    invalidate_tags(*tags)
+
+
+def invalidate_product_groups(products):
+    """
+    Coarser invalidation for bulk writes: every cached page sharing a
+    category or brand with ``products`` (detail pages carry those tags too),
+    without one tag bump per product.
+    """
+    tags = {PRODUCT_COLLECTION_TAG}
+    for product in products:
+        tags.add(f"category:{product.category_id}")
+        if product.brand:
+            tags.add(f"brand:{slugify(product.brand)}")
+    invalidate_tags(*tags)
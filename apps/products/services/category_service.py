@@ -0,0 +1,92 @@
+# apps/products/services/category_service.py
+"""
+Cached category hierarchy.
+
+The whole tree is loaded with a single ``values()`` query and assembled in
+memory; nested serialization then walks dicts instead of issuing a
+``children`` query per node. The flat rows are kept in Redis under the
+current version of ``CATEGORY_TREE_TAG`` and every process also keeps the
+assembled tree for that version, so a request normally costs one cache
+lookup for the version and nothing else. Saving or deleting a category bumps
+the version (after commit) and every process rebuilds on its next read.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+from core.caching import get_tag_versions, invalidate_tags
+
+CATEGORY_TREE_TAG = "category_tree"
+CATEGORY_TREE_PREFIX = "category_tree"
+CATEGORY_TREE_TTL = 60 * 60 * 24
+
+TREE_FIELDS = ("id", "name", "slug", "parent_id")
+
+# (version, CategoryTree) of the last tree this process assembled
+_local_tree = (None, None)
+
+
+class CategoryTree:
+    """In-memory category hierarchy built from flat rows."""
+
+    def __init__(self, rows):
+        self.nodes = {row["id"]: {**row, "children": []} for row in rows}
+        self.by_slug = {}
+        self.roots = []
+        for node in self.nodes.values():  # rows come ordered by name
+            self.by_slug[node["slug"]] = node
+            parent = self.nodes.get(node["parent_id"])
+            (parent["children"] if parent else self.roots).append(node)
+
+    def get(self, category_id):
+        return self.nodes.get(category_id)
+
+    def get_by_slug(self, slug):
+        return self.by_slug.get(slug)
+
+    def serialize(self, node):
+        """The ``CategorySerializer`` representation of ``node`` and its subtree."""
+        return {
+            "id": node["id"],
+            "name": node["name"],
+            "slug": node["slug"],
+            "parent": node["parent_id"],
+            "children": [self.serialize(child) for child in node["children"]],
+        }
+
+    def serialize_children(self, category_id):
+        node = self.nodes.get(category_id)
+        return [self.serialize(child) for child in node["children"]] if node else []
+
+
+def _load_rows():
+    from apps.products.models import Category  # local import to avoid cycles
+
+    return list(Category.objects.order_by("name").values(*TREE_FIELDS))
+
+
+def get_category_tree():
+    global _local_tree
+    version = get_tag_versions([CATEGORY_TREE_TAG])[CATEGORY_TREE_TAG]
+    local_version, tree = _local_tree
+    if tree is not None and local_version == version:
+        return tree
+
+    key = f"{CATEGORY_TREE_PREFIX}:{version}"
+    rows = cache.get(key)
+    if rows is None:
+        rows = _load_rows()
+        cache.set(key, rows, CATEGORY_TREE_TTL)
+    tree = CategoryTree(rows)
+    _local_tree = (version, tree)
+    return tree
+
+
+def invalidate_category_tree(category=None):
+    """Drop the cached tree once the current transaction commits."""
+    tags = [CATEGORY_TREE_TAG]
+    if category is not None:
+        # product pages embed the category with its children
+        tags.append(f"category:{category.pk}")
+        if category.parent_id:
+            tags.append(f"category:{category.parent_id}")
+    transaction.on_commit(lambda: invalidate_tags(*tags))
@@ -0,0 +1,107 @@
+# apps/products/services/facet_service.py
+"""
+Facet counts for a filtered product listing.
+
+Every facet is derived from one grouped query: the filtered products are
+grouped by (brand, category, price bucket, rating bucket, in stock) and the
+per-group counts are then summed per facet in Python. The number of groups
+is bounded by the distinct combinations, not the number of products, so the
+cost stays one query whatever the filter set.
+"""
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import BooleanField, Case, Count, IntegerField, Value, When
+from django.utils.text import slugify
+
+from apps.products.services.cache_service import PRODUCT_COLLECTION_TAG
+from apps.products.services.category_service import get_category_tree
+
+DEFAULT_PRICE_EDGES = (1000, 5000, 10000, 50000, 100000)
+RATING_FLOORS = (4, 3, 2, 1)
+
+
+def price_edges():
+    return tuple(getattr(settings, "PRODUCT_PRICE_FACET_EDGES", DEFAULT_PRICE_EDGES))
+
+
+def _price_bucket(edges):
+    return Case(
+        *[When(price__lt=edge, then=Value(i)) for i, edge in enumerate(edges)],
+        default=Value(len(edges)),
+        output_field=IntegerField(),
+    )
+
+
+def _rating_floor():
+    return Case(
+        *[When(rating_avg__gte=floor, then=Value(floor)) for floor in RATING_FLOORS],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def compute_facets(queryset):
+    """
+    Counts per brand, category, price bucket, minimum rating and stock
+    status for ``queryset``. Returns ``(facets, tags)``; the tags are the
+    cache tags of every brand and category counted.
+    """
+    edges = price_edges()
+    groups = (
+        queryset.order_by()
+        .annotate(
+            facet_price=_price_bucket(edges),
+            facet_rating=_rating_floor(),
+            facet_in_stock=Case(When(stock__gt=0, then=Value(True)), default=Value(False), output_field=BooleanField()),
+        )
+        .values("brand", "category_id", "facet_price", "facet_rating", "facet_in_stock")
+        .annotate(facet_count=Count("pk"))
+    )
+
+    total = 0
+    brands, categories, prices, ratings, stock = Counter(), Counter(), Counter(), Counter(), Counter()
+    for group in groups:
+        count = group["facet_count"]
+        total += count
+        if group["brand"]:
+            brands[group["brand"]] += count
+        categories[group["category_id"]] += count
+        prices[group["facet_price"]] += count
+        ratings[group["facet_rating"]] += count
+        stock[group["facet_in_stock"]] += count
+
+    tree = get_category_tree()
+    category_facets = []
+    for category_id, count in categories.most_common():
+        node = tree.get(category_id) or {}
+        category_facets.append(
+            {"id": category_id, "slug": node.get("slug"), "name": node.get("name"), "count": count}
+        )
+
+    bounds = (None, *edges, None)
+    facets = {
+        "total": total,
+        "brand": [{"value": brand, "count": count} for brand, count in brands.most_common()],
+        "category": category_facets,
+        "price": [
+            {
+                "min_price": Decimal(bounds[i]) if bounds[i] is not None else None,
+                "max_price": Decimal(bounds[i + 1]) if bounds[i + 1] is not None else None,
+                "count": prices[i],
+            }
+            for i in range(len(edges) + 1)
+        ],
+        # "N stars & up": each floor also counts every higher one
+        "rating": [
+            {"min_rating": floor, "count": sum(n for rating, n in ratings.items() if rating >= floor)}
+            for floor in RATING_FLOORS
+        ],
+        "in_stock": {"true": stock[True], "false": stock[False]},
+    }
+
+    tags = {PRODUCT_COLLECTION_TAG}
+    tags.update(f"brand:{slugify(brand)}" for brand in brands)
+    tags.update(f"category:{category_id}" for category_id in categories)
+    return facets, tags
@@ -0,0 +1,309 @@
+# apps/products/services/inventory_service.py
+"""
+Stock reservations.
+
+Stock is taken with conditional UPDATEs (``stock = stock - n WHERE stock >= n``)
+instead of read-modify-write or SELECT ... FOR UPDATE: the database checks
+and decrements in one statement, so concurrent checkouts on a hot SKU can
+never oversell and never wait on each other longer than that statement.
+
+A whole cart is reserved with a single UPDATE (one CASE branch per product);
+if any product is short, no row is touched.
+
+Reservations move active -> committed (order placed) or active/committed ->
+released (expired, abandoned, order cancelled). Every transition is a
+conditional UPDATE on the status, so releasing twice never restocks twice.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    BooleanField,
+    Case,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from apps.products.models import Product, StockReservation
+from apps.products.services.cache_service import PRODUCT_COLLECTION_TAG
+from core.caching import invalidate_tags
+
+# How long a cart hold keeps its units (seconds).
+DEFAULT_RESERVATION_TTL = 15 * 60
+
+CART_REFERENCE = "cart"
+
+
+class InsufficientStock(ValueError):
+    """Raised when some products cannot cover the requested quantity."""
+
+    def __init__(self, shortages):
+        self.shortages = shortages  # {product_id: units available}
+        ids = ", ".join(str(pid) for pid in shortages)
+        super().__init__(f"Insufficient stock for product(s): {ids}")
+
+
+class _Short(Exception):
+    pass
+
+
+def get_reservation_ttl():
+    return getattr(settings, "STOCK_RESERVATION_TTL", DEFAULT_RESERVATION_TTL)
+
+
+def order_reference(order):
+    return f"order:{order.pk}"
+
+
+def _merge(items):
+    """Normalise ``{product_id: qty}`` or ``[(product_id, qty), ...]``."""
+    pairs = items.items() if isinstance(items, dict) else items
+    quantities = {}
+    for product_id, quantity in pairs:
+        quantity = int(quantity)
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive")
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+def _stock_changed(product_ids):
+    """
+    Follow up a stock UPDATE on ``product_ids``: keep ``is_available`` in
+    step and, after commit, expire their detail pages and every collection
+    page (stock decides ``?in_stock=`` membership and the facet counts).
+    """
+    product_ids = list(product_ids)
+    _sync_availability(product_ids)
+    transaction.on_commit(
+        lambda: invalidate_tags(PRODUCT_COLLECTION_TAG, *[f"product:{pid}" for pid in product_ids])
+    )
+
+
+def _decrement(quantities):
+    """One UPDATE for all products; returns how many rows could be decremented."""
+    enough = Q()
+    for product_id, quantity in quantities.items():
+        enough |= Q(pk=product_id, stock__gte=quantity)
+    return Product.objects.filter(enough).update(
+        stock=Case(
+            *[When(pk=product_id, then=F("stock") - quantity) for product_id, quantity in quantities.items()],
+            default=F("stock"),
+            output_field=IntegerField(),
+        )
+    )
+
+
+def reserve_items(items, user=None, reference="", ttl=None, commit=False, _retry=True):
+    """
+    Take ``items`` out of stock, all or nothing, and record the reservations.
+
+    ``commit=True`` records them as already committed (placed order);
+    otherwise they are holds that expire after ``ttl`` seconds. Raises
+    ``InsufficientStock`` when any product is short, after first giving back
+    expired holds on those products and retrying once.
+    """
+    quantities = _merge(items)
+    if not quantities:
+        return []
+
+    expires_at = timezone.now() + timedelta(seconds=ttl if ttl is not None else get_reservation_ttl())
+    status = StockReservation.STATUS_COMMITTED if commit else StockReservation.STATUS_ACTIVE
+    try:
+        with transaction.atomic():
+            if _decrement(quantities) != len(quantities):
+                raise _Short  # rolls back the rows that were decremented
+            reservations = StockReservation.objects.bulk_create([
+                StockReservation(
+                    product_id=product_id,
+                    user=user,
+                    quantity=quantity,
+                    status=status,
+                    reference=reference,
+                    expires_at=expires_at,
+                )
+                for product_id, quantity in quantities.items()
+            ])
+            _stock_changed(quantities)
+            return reservations
+    except _Short:
+        pass
+
+    if _retry and release_expired_reservations(product_ids=list(quantities)):
+        return reserve_items(quantities, user, reference, ttl, commit, _retry=False)
+
+    available = dict(Product.objects.filter(pk__in=quantities).values_list("pk", "stock"))
+    raise InsufficientStock({
+        product_id: available.get(product_id, 0)
+        for product_id, quantity in quantities.items()
+        if available.get(product_id, 0) < quantity
+    })
+
+
+def _locked_rows(reservations, status):
+    """``[(pk, product_id, quantity)]`` of the rows still in ``status``, locked."""
+    # locking read: a concurrent transition waits here and then no longer
+    # sees the rows the first one flipped, so stock is never returned twice
+    return list(
+        reservations.filter(status=status).select_for_update().values_list("pk", "product_id", "quantity")
+    )
+
+
+def _restock(rows):
+    """Give the units of ``rows`` back with one UPDATE for all products."""
+    units = defaultdict(int)
+    for _, product_id, quantity in rows:
+        units[product_id] += quantity
+    Product.objects.filter(pk__in=units).update(
+        stock=Case(
+            *[When(pk=product_id, then=F("stock") + quantity) for product_id, quantity in units.items()],
+            default=F("stock"),
+            output_field=IntegerField(),
+        )
+    )
+    _stock_changed(units)
+
+
+def _flip(rows, to_status, restock):
+    StockReservation.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(status=to_status)
+    if restock:
+        _restock(rows)
+
+
+def _transition(reservations, from_status, to_status, restock):
+    with transaction.atomic():
+        rows = _locked_rows(reservations, from_status)
+        if rows:
+            _flip(rows, to_status, restock)
+    return len(rows)
+
+
+def release_reservations(reservations):
+    """Give the units of the active reservations in ``reservations`` back."""
+    return _transition(reservations, StockReservation.STATUS_ACTIVE, StockReservation.STATUS_RELEASED, restock=True)
+
+
+def commit_reservations(reservations, reference):
+    """Attach still-active holds to an order; their units stay out of stock."""
+    return reservations.filter(status=StockReservation.STATUS_ACTIVE).update(
+        status=StockReservation.STATUS_COMMITTED, reference=reference
+    )
+
+
+def take_checkout_stock(user, items, reference):
+    """
+    Take the stock of a checkout's ``items`` as committed reservations under
+    ``reference``. When the user's checkout hold covers exactly ``items`` it
+    is committed as is (its units are already out of stock); otherwise it is
+    given back and ``items`` are reserved afresh. Either way the query count
+    does not depend on the number of lines. Raises ``InsufficientStock``.
+    """
+    quantities = _merge(items)
+    with transaction.atomic():
+        holds = _locked_rows(
+            StockReservation.objects.filter(user=user, reference=CART_REFERENCE), StockReservation.STATUS_ACTIVE
+        )
+        held = defaultdict(int)
+        for _, product_id, quantity in holds:
+            held[product_id] += quantity
+        if holds and held == quantities:
+            return commit_reservations(StockReservation.objects.filter(pk__in=[pk for pk, _, _ in holds]), reference)
+        if holds:
+            _flip(holds, StockReservation.STATUS_RELEASED, restock=True)
+        return len(reserve_items(quantities, user=user, reference=reference, commit=True))
+
+
+def release_expired_reservations(product_ids=None):
+    """Release holds past their expiry (optionally only for ``product_ids``)."""
+    expired = StockReservation.objects.filter(expires_at__lte=timezone.now())
+    if product_ids is not None:
+        expired = expired.filter(product_id__in=product_ids)
+    return release_reservations(expired)
+
+
+def restock_order(order):
+    """Return the units of a cancelled order to stock (idempotent)."""
+    committed = StockReservation.objects.filter(reference=order_reference(order))
+    return _transition(committed, StockReservation.STATUS_COMMITTED, StockReservation.STATUS_RELEASED, restock=True)
+
+
+def hold_cart(user, cart, ttl=None):
+    """
+    (Re)place a time-limited hold on every item of ``cart`` for checkout.
+    The previous hold is released in the same transaction, so units it held
+    cannot be taken by someone else in between.
+    """
+    with transaction.atomic():
+        release_reservations(StockReservation.objects.filter(user=user, reference=CART_REFERENCE))
+        items = list(cart.items.values_list("product_id", "quantity"))
+        return reserve_items(items, user=user, reference=CART_REFERENCE, ttl=ttl)
+
+
+def set_stock_levels(levels):
+    """
+    Set on-hand stock from ``{product_id: units}`` (e.g. a warehouse count).
+    Units held by active reservations are subtracted in the same UPDATE, so a
+    recount never hands out units that are already reserved.
+    """
+    if not levels:
+        return 0
+    held = (
+        StockReservation.objects.filter(product=OuterRef("pk"), status=StockReservation.STATUS_ACTIVE)
+        .values("product")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    with transaction.atomic():
+        updated = Product.objects.filter(pk__in=levels).update(
+            stock=Greatest(
+                Case(
+                    *[When(pk=product_id, then=Value(int(units))) for product_id, units in levels.items()],
+                    output_field=IntegerField(),
+                )
+                - Coalesce(Subquery(held, output_field=IntegerField()), 0),
+                0,
+            )
+        )
+        _sync_availability(levels)
+    return updated
+
+
+def adjust_stock(deltas):
+    """
+    Add (or remove, with negative values) units from ``{product_id: delta}``
+    relative to the current stock. Removals that would go below zero are
+    skipped; returns the number of products updated.
+    """
+    if not deltas:
+        return 0
+    allowed = Q()
+    for product_id, delta in deltas.items():
+        allowed |= Q(pk=product_id, stock__gte=max(-int(delta), 0))
+    with transaction.atomic():
+        updated = Product.objects.filter(allowed).update(
+            stock=Case(
+                *[When(pk=product_id, then=F("stock") + int(delta)) for product_id, delta in deltas.items()],
+                default=F("stock"),
+                output_field=IntegerField(),
+            )
+        )
+        _sync_availability(deltas)
+    return updated
+
+
+def _sync_availability(product_ids):
+    Product.objects.filter(pk__in=list(product_ids)).update(
+        is_available=ExpressionWrapper(Q(stock__gt=0), output_field=BooleanField()),
+        updated_at=timezone.now(),
+    )
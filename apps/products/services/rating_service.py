@@ -0,0 +1,118 @@
+# apps/products/services/rating_service.py
+"""
+Incremental maintenance of the rating aggregates stored on Product
+(rating_sum, rating_count, rating_avg and the per-star histogram).
+
+Only approved reviews count. Every change is applied as an atomic
+F-expression UPDATE, so concurrent reviews never lose increments;
+`reconcile_ratings` rebuilds the columns from the reviews table.
+"""
+from django.db import transaction
+from django.db.models import Avg, Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+from apps.products.models import Product, Review
+from apps.products.services.cache_service import PRODUCT_COLLECTION_TAG
+from core.caching import invalidate_tags
+
+STARS = range(1, 6)
+
+
+def histogram_field(rating):
+    return f"rating_{rating}_count"
+
+
+def review_rating_state(review):
+    """(product_id, rating) the review contributes, or None if it does not count."""
+    if review.is_approved:
+        return review.product_id, review.rating
+    return None
+
+
+def apply_rating_delta(product_id, rating, sign):
+    """Add (sign=1) or remove (sign=-1) one rating from a product's aggregates."""
+    with transaction.atomic():
+        Product.objects.filter(pk=product_id).update(
+            rating_sum=F("rating_sum") + sign * rating,
+            rating_count=F("rating_count") + sign,
+            **{histogram_field(rating): F(histogram_field(rating)) + sign},
+        )
+        # second statement so the average is computed from the new totals on
+        # every backend (MySQL evaluates SET clauses left to right)
+        Product.objects.filter(pk=product_id).update(
+            rating_avg=Case(
+                When(rating_count__gt=0, then=Cast("rating_sum", FloatField()) / F("rating_count")),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+        # rating_avg/rating_count drive min_rating, review_count ordering and
+        # the rating facet, so collection pages go stale along with the product
+        transaction.on_commit(lambda: invalidate_tags(PRODUCT_COLLECTION_TAG, f"product:{product_id}"))
+
+
+def on_review_saving(review):
+    """Load the stored state of a review that was not fetched with its rating fields."""
+    if review.pk and not hasattr(review, "_rating_state"):
+        stored = Review.objects.filter(pk=review.pk).values("product_id", "rating", "is_approved").first()
+        review._rating_state = (stored["product_id"], stored["rating"]) if stored and stored["is_approved"] else None
+
+
+def on_review_saved(review):
+    old = getattr(review, "_rating_state", None)
+    new = review_rating_state(review)
+    if old == new:
+        return
+    if old is not None:
+        apply_rating_delta(old[0], old[1], -1)
+    if new is not None:
+        apply_rating_delta(new[0], new[1], 1)
+    review._rating_state = new
+
+
+def on_review_deleted(review):
+    state = getattr(review, "_rating_state", review_rating_state(review))
+    if state is not None:
+        apply_rating_delta(state[0], state[1], -1)
+
+
+def reconcile_ratings(batch_size=500, dry_run=False):
+    """
+    Recompute every product's rating columns from approved reviews in one
+    grouped query and fix the rows that drifted. Returns the number of
+    products that were (or would be) updated.
+    """
+    aggregates = {
+        row["product_id"]: row
+        for row in Review.objects.filter(is_approved=True)
+        .values("product_id")
+        .annotate(
+            rating_sum=Sum("rating"),
+            rating_count=Count("id"),
+            rating_avg=Avg("rating"),
+            **{histogram_field(star): Count("id", filter=Q(rating=star)) for star in STARS},
+        )
+    }
+
+    fields = ["rating_sum", "rating_count", "rating_avg"] + [histogram_field(star) for star in STARS]
+    drifted = []
+    for product in Product.objects.only("id", *fields).iterator(chunk_size=batch_size):
+        expected = aggregates.get(product.pk, {})
+        changed = False
+        for field in fields:
+            value = expected.get(field) or 0
+            if field == "rating_avg":
+                value = round(float(value), 2)
+                current = round(float(product.rating_avg), 2)
+            else:
+                current = getattr(product, field)
+            if current != value:
+                setattr(product, field, value)
+                changed = True
+        if changed:
+            drifted.append(product)
+
+    if not dry_run and drifted:
+        Product.objects.bulk_update(drifted, fields, batch_size=batch_size)
+        invalidate_tags(PRODUCT_COLLECTION_TAG, *[f"product:{product.pk}" for product in drifted])
+    return len(drifted)
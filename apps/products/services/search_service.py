@@ -0,0 +1,184 @@
+# apps/products/services/search_service.py
+"""
+Product search backends.
+
+- ``MySQLFullTextBackend``: MATCH ... AGAINST over the FULLTEXT indexes added
+  in migration 0002 (InnoDB keeps them up to date on write).
+- ``InMemorySearchBackend``: an in-process inverted index, used for tests and
+  non-MySQL databases. Maintained from the product post_save/post_delete
+  signals.
+
+Both rank results (``search_rank``, name matches weigh more) and treat each
+query term as a prefix, so "mac pro" matches "MacBook Pro" for type-ahead.
+"""
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Relative weight of a term match per field.
+FIELD_WEIGHTS = {"name": 3.0, "sku": 3.0, "brand": 2.0, "description": 1.0}
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class MySQLFullTextBackend:
+    """Boolean-mode FULLTEXT search: every term is required and prefix-matched."""
+
+    def build_query(self, text):
+        # BOOLEAN MODE operators in user input are dropped by the tokenizer
+        return " ".join(f"+{term}*" for term in tokenize(text))
+
+    def search(self, queryset, text):
+        query = self.build_query(text)
+        if not query:
+            return queryset
+        table = queryset.model._meta.db_table
+        all_fields = f"{table}.name, {table}.sku, {table}.brand, {table}.description"
+        return queryset.annotate(
+            search_rank=RawSQL(
+                f"MATCH({table}.name) AGAINST (%s IN BOOLEAN MODE) * 2 "
+                f"+ MATCH({all_fields}) AGAINST (%s IN BOOLEAN MODE)",
+                [query, query],
+                output_field=FloatField(),
+            )
+        ).filter(search_rank__gt=0)  # a name match is also an all-fields match
+
+    def index_product(self, product):
+        """InnoDB maintains FULLTEXT indexes itself."""
+
+    def remove_product(self, product_id):
+        pass
+
+
+class InMemorySearchBackend:
+    """
+    In-process inverted index: ``term -> {product_id: score}``.
+    Built lazily from the database on first search, then kept current by the
+    product signals.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._postings = defaultdict(dict)
+        self._doc_terms = {}
+        self._sorted_terms = []
+        self._dirty = False
+        self._built = False
+
+    def _add(self, product_id, fields):
+        self._drop(product_id)
+        scores = defaultdict(float)
+        for field, text in fields.items():
+            for term in tokenize(text):
+                scores[term] += FIELD_WEIGHTS[field]
+        for term, score in scores.items():
+            self._postings[term][product_id] = score
+        self._doc_terms[product_id] = set(scores)
+        self._dirty = True
+
+    def _drop(self, product_id):
+        for term in self._doc_terms.pop(product_id, ()):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(product_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._dirty = True
+
+    def _build(self, model):
+        for row in model.objects.values("id", *FIELD_WEIGHTS):
+            self._add(row.pop("id"), row)
+        self._built = True
+
+    def _prefix_terms(self, prefix):
+        if self._dirty:
+            self._sorted_terms = sorted(self._postings)
+            self._dirty = False
+        start = bisect.bisect_left(self._sorted_terms, prefix)
+        for term in self._sorted_terms[start:]:
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def rank(self, model, text):
+        """Return ``{product_id: score}`` for products matching every term."""
+        terms = tokenize(text)
+        with self._lock:
+            if not self._built:
+                self._build(model)
+            ranked = None
+            for term in terms:
+                matches = defaultdict(float)
+                for indexed_term in self._prefix_terms(term):
+                    for product_id, score in self._postings[indexed_term].items():
+                        matches[product_id] += score
+                if ranked is None:
+                    ranked = dict(matches)
+                else:
+                    ranked = {pid: ranked[pid] + score for pid, score in matches.items() if pid in ranked}
+                if not ranked:
+                    break
+        return ranked or {}
+
+    def search(self, queryset, text):
+        if not tokenize(text):
+            return queryset
+        ranked = self.rank(queryset.model, text)
+        if not ranked:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+        return queryset.filter(pk__in=ranked).annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(score)) for pk, score in ranked.items()],
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+
+    def index_product(self, product):
+        with self._lock:
+            if self._built:
+                self._add(product.pk, {field: getattr(product, field) for field in FIELD_WEIGHTS})
+
+    def remove_product(self, product_id):
+        with self._lock:
+            if self._built:
+                self._drop(product_id)
+
+
+_backend = None
+
+
+def get_search_backend():
+    """
+    Return the configured backend (``settings.PRODUCT_SEARCH_BACKEND``),
+    defaulting to FULLTEXT on MySQL and the in-memory index elsewhere.
+    """
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "PRODUCT_SEARCH_BACKEND", None)
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == "mysql":
+            _backend = MySQLFullTextBackend()
+        else:
+            _backend = InMemorySearchBackend()
+    return _backend
+
+
+def search_products(queryset, text):
+    """Filter ``queryset`` to products matching ``text``, annotated with ``search_rank``."""
+    return get_search_backend().search(queryset, text)
@@ -0,0 +1,173 @@
+# apps/products/services/spec_service.py
+"""
+Typed, normalized product specifications.
+
+``ProductSpecification`` keeps the free-form ``key`` / ``value`` for display
+and, on save, a normalized copy for filtering: the key slugified ("Screen
+Size" -> "screen-size"), the value lowercased with whitespace collapsed
+("16 gb ddr5"), and, when the value starts with a number, that number in
+the base unit of its dimension ("1TB" -> 1024 GB, "3.2GHz" -> 3.2e9 Hz).
+Composite ``(normalized_key, normalized_value, product)`` and
+``(normalized_key, numeric_value, product)`` indexes turn each attribute
+filter into one index range scan.
+
+Query syntax (``ProductViewSet`` list, search, facets...):
+
+    ?spec[ram]=16GB               normalized / numeric equality
+    ?spec[brand]=amd,intel        any of several values
+    ?spec[ram][gte]=8GB           numeric range (gte, lte, gt, lt)
+    ?spec[cpu][contains]=ryzen    substring of the normalized value
+
+Each ``spec[...]`` parameter is one ``pk IN (SELECT product_id ...)``
+semi-join, so several attributes AND together without self-joins.
+"""
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Max, Min
+from django.utils.text import slugify
+
+from apps.products.models import ProductSpecification
+
+MAX_NORMALIZED_VALUE_LENGTH = 191
+MAX_FACET_VALUES = 50
+
+# unit -> (base unit, factor)
+UNITS = {
+    "kb": ("gb", Decimal(1) / 1024 / 1024),
+    "mb": ("gb", Decimal(1) / 1024),
+    "gb": ("gb", Decimal(1)),
+    "tb": ("gb", Decimal(1024)),
+    "hz": ("hz", Decimal(1)),
+    "khz": ("hz", Decimal(10) ** 3),
+    "mhz": ("hz", Decimal(10) ** 6),
+    "ghz": ("hz", Decimal(10) ** 9),
+    "mm": ("mm", Decimal(1)),
+    "cm": ("mm", Decimal(10)),
+    "g": ("g", Decimal(1)),
+    "kg": ("g", Decimal(1000)),
+    "mah": ("mah", Decimal(1)),
+    "w": ("w", Decimal(1)),
+    "mp": ("mp", Decimal(1)),
+    "in": ("in", Decimal(1)),
+    '"': ("in", Decimal(1)),
+    "inch": ("in", Decimal(1)),
+    "%": ("%", Decimal(1)),
+}
+
+_NUMBER_RE = re.compile(r'^(-?\d+(?:[.,]\d+)?)\s*([a-z%"]*)(.*)$')
+_SPEC_PARAM_RE = re.compile(r"^spec\[([^\]]+)\](?:\[(gte|lte|gt|lt|contains)\])?$")
+_NUMERIC_PLACES = Decimal("0.0001")
+
+
+def normalize_key(key):
+    return slugify(key)[:100]
+
+
+def normalize_value(value):
+    return " ".join(str(value).split()).lower()[:MAX_NORMALIZED_VALUE_LENGTH]
+
+
+def parse_number(value):
+    """
+    ``(number, exact)`` for a value starting with a number, converted to the
+    base unit of a known unit suffix; ``exact`` is False when text follows
+    ("16GB DDR5"). ``(None, False)`` when the value is not numeric.
+    """
+    match = _NUMBER_RE.match(normalize_value(value))
+    if match is None:
+        return None, False
+    number, unit, rest = match.groups()
+    if unit and unit not in UNITS:
+        return None, False
+    try:
+        number = Decimal(number.replace(",", "."))
+    except InvalidOperation:
+        return None, False
+    if unit:
+        number *= UNITS[unit][1]
+    return number.quantize(_NUMERIC_PLACES), not rest.strip()
+
+
+def normalize_spec(spec):
+    """Fill the normalized columns of a ``ProductSpecification`` from key/value."""
+    spec.normalized_key = normalize_key(spec.key)
+    spec.normalized_value = normalize_value(spec.value)
+    number, exact = parse_number(spec.value)
+    spec.numeric_value = number
+    spec.value_type = (
+        ProductSpecification.ValueTypes.NUMBER if exact else ProductSpecification.ValueTypes.TEXT
+    )
+    return spec
+
+
+def parse_spec_params(params):
+    """``[(key, operator, raw value)]`` for the ``spec[...]`` query parameters."""
+    filters = []
+    for name in params:
+        match = _SPEC_PARAM_RE.match(name)
+        if match is None:
+            continue
+        key, operator = match.groups()
+        for raw in params.getlist(name):
+            if raw:
+                filters.append((normalize_key(key), operator or "exact", raw))
+    return filters
+
+
+def _spec_condition(key, operator, raw):
+    specs = ProductSpecification.objects.filter(normalized_key=key)
+    if operator == "contains":
+        return specs.filter(normalized_value__contains=normalize_value(raw))
+    if operator != "exact":
+        number, _ = parse_number(raw)
+        if number is None:
+            return None  # a range needs a number; ignored like other malformed filters
+        return specs.filter(**{f"numeric_value__{operator}": number})
+
+    values = [value for value in (part.strip() for part in raw.split(",")) if value]
+    numbers = [number for number, exact in map(parse_number, values) if number is not None and exact]
+    if numbers and len(numbers) == len(values):
+        # "16GB" also matches "16 GB" and "16GB DDR5"
+        return specs.filter(numeric_value__in=numbers)
+    return specs.filter(normalized_value__in=[normalize_value(value) for value in values])
+
+
+def apply_spec_filters(queryset, params):
+    for key, operator, raw in parse_spec_params(params):
+        condition = _spec_condition(key, operator, raw)
+        if condition is not None:
+            queryset = queryset.filter(pk__in=condition.values("product_id"))
+    return queryset
+
+
+def spec_facets(queryset, keys=None):
+    """
+    Value counts per specification key for the products of ``queryset``,
+    from one grouped query over the ``(key, value, product)`` index.
+    Numeric keys also report their min/max.
+    """
+    specs = ProductSpecification.objects.filter(product__in=queryset.order_by().values("pk"))
+    if keys:
+        specs = specs.filter(normalized_key__in=[normalize_key(key) for key in keys])
+    groups = (
+        specs.values("normalized_key", "normalized_value")
+        .annotate(label=Min("key"), display=Min("value"), number=Max("numeric_value"),
+                  count=Count("product_id", distinct=True))
+        .order_by("normalized_key", "-count", "normalized_value")
+    )
+
+    facets = {}
+    for group in groups:
+        facet = facets.setdefault(
+            group["normalized_key"], {"key": group["label"], "values": [], "min": None, "max": None}
+        )
+        if len(facet["values"]) < MAX_FACET_VALUES:
+            facet["values"].append(
+                {"value": group["normalized_value"], "label": group["display"], "count": group["count"]}
+            )
+        number = group["number"]
+        if number is not None:
+            facet["min"] = number if facet["min"] is None else min(facet["min"], number)
+            facet["max"] = number if facet["max"] is None else max(facet["max"], number)
+    return facets
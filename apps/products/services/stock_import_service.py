@@ -0,0 +1,202 @@
+# apps/products/services/stock_import_service.py
+"""
+Streaming stock import for supplier feeds.
+
+Rows are read incrementally from a CSV (``sku,stock`` or ``sku,delta``
+columns) or JSONL (``{"sku": ..., "stock": ...}`` per line) file and handled
+``chunk_size`` rows at a time: one query resolves the chunk's SKUs, then the
+stock levels and deltas go through ``inventory_service`` (reservation-aware
+CASE UPDATEs) ``batch_size`` products per statement, in one transaction per
+chunk. Memory is bounded by the chunk, not the feed, and a bad row only
+costs its own error entry.
+
+``iter_stock_import`` yields a report per chunk (rows, updated, per-row
+errors, rows/s) and a final summary, so callers can stream progress.
+"""
+import csv
+import io
+import json
+import time
+
+from django.db import transaction
+
+from apps.products.models import Product
+from apps.products.services import inventory_service
+from apps.products.services.cache_service import invalidate_product_groups
+
+FORMATS = ("csv", "jsonl")
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+class StockImportError(ValueError):
+    """The feed as a whole cannot be read (unknown format, missing columns)."""
+
+
+def detect_format(filename, default="csv"):
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    return default
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line, row, error)`` from a binary stream, one row at a time."""
+    if fmt not in FORMATS:
+        raise StockImportError(f"format must be one of: {', '.join(FORMATS)}.")
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        if not reader.fieldnames or "sku" not in reader.fieldnames:
+            raise StockImportError("CSV header must include a sku column.")
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError:
+            yield line, None, "invalid JSON"
+            continue
+        if isinstance(row, dict):
+            yield line, row, None
+        else:
+            yield line, None, "expected a JSON object"
+
+
+def parse_row(row):
+    """``(sku, "stock" | "delta", value)`` or ValueError with a message."""
+    sku = str(row.get("sku") or "").strip()
+    if not sku:
+        raise ValueError("missing sku")
+    for kind in ("stock", "delta"):
+        raw = row.get(kind)
+        if raw is None or raw == "":
+            continue
+        try:
+            value = int(raw)
+        except (TypeError, ValueError):
+            raise ValueError(f"{kind} must be an integer")
+        if kind == "stock" and value < 0:
+            raise ValueError("stock must not be negative")
+        return sku, kind, value
+    raise ValueError("stock or delta is required")
+
+
+def _batches(items, size):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield dict(items[i:i + size])
+
+
+def apply_chunk(parsed, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Apply ``[(line, sku, kind, value)]``; later rows for the same SKU win
+    (a delta after a stock level adjusts that level). Returns
+    ``(updated, skipped, errors)``.
+    """
+    products = {
+        product.sku: product
+        for product in Product.objects.filter(sku__in={sku for _, sku, _, _ in parsed})
+        .only("pk", "sku", "category_id", "brand")
+    }
+    levels, deltas, errors = {}, {}, []
+    for line, sku, kind, value in parsed:
+        product = products.get(sku)
+        if product is None:
+            errors.append({"line": line, "sku": sku, "error": "unknown sku"})
+        elif kind == "stock":
+            levels[product.pk] = value
+            deltas.pop(product.pk, None)
+        elif product.pk in levels:
+            levels[product.pk] = max(levels[product.pk] + value, 0)
+        else:
+            deltas[product.pk] = deltas.get(product.pk, 0) + value
+
+    touched = [product for product in products.values() if product.pk in levels or product.pk in deltas]
+    with transaction.atomic():
+        updated = sum(inventory_service.set_stock_levels(batch) for batch in _batches(levels.items(), batch_size))
+        adjusted = sum(inventory_service.adjust_stock(batch) for batch in _batches(deltas.items(), batch_size))
+        # queryset updates skip post_save
+        if touched:
+            transaction.on_commit(lambda: invalidate_product_groups(touched))
+    # removals that would take the stock below zero are left alone
+    return updated + adjusted, len(deltas) - adjusted, errors
+
+
+def iter_stock_import(stream, fmt, chunk_size=DEFAULT_CHUNK_SIZE, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Import the feed chunk by chunk, yielding ``{"chunk", "rows", "updated",
+    "skipped", "errors", "rows_per_second"}`` after each one and a final
+    ``{"done": True, ...}`` summary with the totals.
+    """
+    started = time.monotonic()
+    totals = {"rows": 0, "updated": 0, "skipped": 0, "error_count": 0}
+    reported = 0
+    chunk, parse_errors, number = [], [], 0
+
+    def flush():
+        nonlocal reported
+        updated, skipped, errors = apply_chunk(chunk, batch_size) if chunk else (0, 0, [])
+        errors = sorted(parse_errors + errors, key=lambda error: error["line"])
+        rows = len(chunk) + len(parse_errors)
+        totals["rows"] += rows
+        totals["updated"] += updated
+        totals["skipped"] += skipped
+        totals["error_count"] += len(errors)
+        # cap what is echoed back so a feed full of errors stays bounded
+        errors = errors[:max(MAX_REPORTED_ERRORS - reported, 0)]
+        reported += len(errors)
+        elapsed = time.monotonic() - started
+        return {
+            "chunk": number,
+            "rows": rows,
+            "updated": updated,
+            "skipped": skipped,
+            "errors": errors,
+            "rows_per_second": round(totals["rows"] / elapsed, 1) if elapsed else None,
+        }
+
+    for line, row, error in read_rows(stream, fmt):
+        if error is None:
+            try:
+                sku, kind, value = parse_row(row)
+            except ValueError as exc:
+                error = str(exc)
+            else:
+                chunk.append((line, sku, kind, value))
+        if error is not None:
+            parse_errors.append({"line": line, "sku": (row or {}).get("sku"), "error": error})
+        if len(chunk) + len(parse_errors) >= chunk_size:
+            number += 1
+            yield flush()
+            chunk, parse_errors = [], []
+
+    if chunk or parse_errors:
+        number += 1
+        yield flush()
+
+    elapsed = time.monotonic() - started
+    yield {
+        "done": True,
+        "chunks": number,
+        **totals,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(totals["rows"] / elapsed, 1) if elapsed else None,
+    }
+
+
+def import_stock(stream, fmt, chunk_size=DEFAULT_CHUNK_SIZE, batch_size=DEFAULT_BATCH_SIZE):
+    """Run the whole import and return the final summary plus every reported error."""
+    errors = []
+    for report in iter_stock_import(stream, fmt, chunk_size, batch_size):
+        if report.get("done"):
+            return {**report, "errors": errors}
+        errors.extend(report["errors"])
@@ -1,18 +1,69 @@
 # apps/product/signals.py
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from django.core.cache import cache
-from apps.products.models import Product
+from apps.products.models import Category, Product, ProductSpecification, Review
+from apps.products.services import rating_service
+from apps.products.services.category_service import invalidate_category_tree
+from apps.products.services.cache_service import (
+    invalidate_products,
+    membership_changed_on_save,
+    on_product_saving,
+)
+from apps.products.services.search_service import get_search_backend
+
+@receiver([post_save, post_delete], sender=Category)
+def clear_category_tree(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_category_tree(instance)
+
+
+@receiver(pre_save, sender=Product)
+def snapshot_product_membership(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        on_product_saving(instance, update_fields)
+
 
 @receiver([post_save, post_delete], sender=Product)
 def clear_product_cache(sender, instance, **kwargs):
-    # delete detail cache key
-    cache.delete(f"product_detail:{instance.slug}")
-    # If you use redis and delete_pattern is available:
-    try:
-        cache.delete_pattern("product_list:*")
-    except AttributeError:
-        # fallback to clearing entire cache (use cautiously on large deployments)
-        cache.clear()
-    # Optionally, you can also clear the entire product list cache
-    cache.delete("product_list")
\ No newline at end of file
+    # Surgical invalidation: only pages tagged with this product, its category
+    # or its brand go stale. Creates/deletes, and edits to the fields the list
+    # filters read, also change list membership.
+    # (a created product has no snapshot, so it always counts as changed)
+    membership_changed = kwargs["signal"] is post_delete or membership_changed_on_save(instance)
+    invalidate_products([instance], membership_changed=membership_changed)
+
+
+@receiver([post_save, post_delete], sender=ProductSpecification)
+def clear_spec_cache(sender, instance, raw=False, **kwargs):
+    # spec filters decide list membership, so every collection page may change
+    if not raw:
+        invalidate_products([instance.product], membership_changed=True)
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    get_search_backend().index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    get_search_backend().remove_product(instance.pk)
+
+
+@receiver(pre_save, sender=Review)
+def snapshot_review_rating(sender, instance, raw=False, **kwargs):
+    if not raw:
+        rating_service.on_review_saving(instance)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_aggregates(sender, instance, raw=False, **kwargs):
+    # create, rating change and approval change all come down to
+    # "remove the old contribution, add the new one"
+    if not raw:
+        rating_service.on_review_saved(instance)
+
+
+@receiver(post_delete, sender=Review)
+def remove_rating_aggregates(sender, instance, **kwargs):
+    rating_service.on_review_deleted(instance)
@@ -0,0 +1,14 @@
+# apps/products/tasks.py
+from celery import shared_task
+
+from apps.products.services.inventory_service import release_expired_reservations
+
+
+@shared_task
+def release_expired_stock_reservations():
+    """
+    Periodic sweep (schedule with celery beat, e.g. every minute): give the
+    units of expired checkout holds back to stock. Reservations that fail on a
+    short product also sweep that product's expired holds on the spot.
+    """
+    return release_expired_reservations()
@@ -0,0 +1,134 @@
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.models import Category, Product
+from apps.products.services.cache_service import product_detail_key, product_list_key
+from core.caching import LOCK_PREFIX, get_tagged, invalidate_tags, read_through, set_tagged
+
+User = get_user_model()
+
+
+class TaggedCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_invalidating_a_tag_only_expires_entries_carrying_it(self):
+        set_tagged("a", "value-a", ["product:1"], 60)
+        set_tagged("b", "value-b", ["product:2"], 60)
+
+        invalidate_tags("product:1")
+
+        self.assertIsNone(get_tagged("a"))
+        self.assertEqual(get_tagged("b"), "value-b")
+
+
+class ReadThroughCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return f"v{self.calls}"
+
+    def test_hit_does_not_recompute(self):
+        self.assertEqual(read_through("rt", self.compute, 60, beta=0), "v1")
+        self.assertEqual(read_through("rt", self.compute, 60, beta=0), "v1")
+        self.assertEqual(self.calls, 1)
+
+    def test_serves_stale_while_another_worker_refreshes(self):
+        read_through("rt", self.compute, 60, tags=["product:1"], beta=0)
+        invalidate_tags("product:1")
+        cache.add(f"{LOCK_PREFIX}:rt", "other-worker", 30)
+
+        self.assertEqual(read_through("rt", self.compute, 60, tags=["product:1"], beta=0), "v1")
+        self.assertEqual(self.calls, 1)
+
+    def test_lock_winner_refreshes_invalidated_entry(self):
+        read_through("rt", self.compute, 60, tags=["product:1"], beta=0)
+        invalidate_tags("product:1")
+
+        self.assertEqual(read_through("rt", self.compute, 60, tags=["product:1"], beta=0), "v2")
+
+
+class ProductCacheInvalidationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        self.laptops = Category.objects.create(name="Laptops")
+        self.phones = Category.objects.create(name="Phones")
+        self.laptop = Product.objects.create(
+            vendor=self.vendor, name="Laptop", sku="LP1", brand="Acme", price=1000, stock=5, category=self.laptops
+        )
+        self.phone = Product.objects.create(
+            vendor=self.vendor, name="Phone", sku="PH1", brand="Globex", price=500, stock=5, category=self.phones
+        )
+        self.list_url = reverse("product-list")
+
+    def _cache_page(self, query):
+        url = f"{self.list_url}?{query}"
+        self.client.get(url)
+        return product_list_key(url)
+
+    def test_saving_a_product_only_invalidates_pages_that_contain_it(self):
+        acme_key = self._cache_page("brand=Acme")
+        globex_key = self._cache_page("brand=Globex")
+        self.assertIsNotNone(get_tagged(acme_key))
+        self.assertIsNotNone(get_tagged(globex_key))
+
+        self.phone.warranty = "2 years"
+        self.phone.save()
+
+        self.assertIsNotNone(get_tagged(acme_key))
+        self.assertIsNone(get_tagged(globex_key))
+
+    def test_changing_a_filtered_field_invalidates_collection_pages(self):
+        in_stock_key = self._cache_page("in_stock=true")
+        acme_key = self._cache_page("brand=Acme")
+
+        self.phone.stock = 0
+        self.phone.save()
+        self.assertIsNone(get_tagged(in_stock_key))
+        self.assertIsNone(get_tagged(acme_key))
+
+        acme_key = self._cache_page("brand=Acme")
+        phone = Product.objects.get(pk=self.phone.pk)
+        phone.brand = "Acme"
+        phone.save(update_fields=["brand"])
+        self.assertIsNone(get_tagged(acme_key))
+
+    def test_raising_a_discount_invalidates_discount_filtered_pages(self):
+        discounted_key = self._cache_page("discount_percentage__gte=10")
+
+        self.phone.discount_percentage = 50
+        self.phone.save()
+
+        self.assertIsNone(get_tagged(discounted_key))
+
+    def test_update_fields_outside_the_filters_keep_collection_pages(self):
+        acme_key = self._cache_page("brand=Acme")
+
+        Product.objects.get(pk=self.phone.pk).save(update_fields=["warranty"])
+
+        self.assertIsNotNone(get_tagged(acme_key))
+
+    def test_creating_a_product_invalidates_collection_pages(self):
+        acme_key = self._cache_page("brand=Acme")
+
+        Product.objects.create(
+            vendor=self.vendor, name="Laptop 2", sku="LP2", brand="Acme", price=900, category=self.laptops
+        )
+
+        self.assertIsNone(get_tagged(acme_key))
+
+    def test_detail_cache_invalidated_on_save(self):
+        self.client.get(reverse("product-detail", kwargs={"slug": self.laptop.slug}))
+        key = product_detail_key(self.laptop.slug)
+        self.assertIsNotNone(get_tagged(key))
+
+        self.laptop.stock = 0
+        self.laptop.save()
+
+        self.assertIsNone(get_tagged(key))
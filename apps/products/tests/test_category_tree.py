@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.models import Category, CategoryClosure, Product
+from apps.products.services.category_service import get_category_tree
+
+User = get_user_model()
+
+
+class CategoryTreeTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        self.computers = Category.objects.create(name="Computers")
+        self.laptops = Category.objects.create(name="Laptops", parent=self.computers)
+        self.gaming = Category.objects.create(name="Gaming Laptops", parent=self.laptops)
+        self.phones = Category.objects.create(name="Phones")
+
+    def closure(self, category):
+        return set(
+            CategoryClosure.objects.filter(descendant=category).values_list("ancestor_id", "depth")
+        )
+
+    def test_closure_links_every_ancestor(self):
+        self.assertEqual(
+            self.closure(self.gaming), {(self.gaming.pk, 0), (self.laptops.pk, 1), (self.computers.pk, 2)}
+        )
+
+    def test_move_relinks_the_subtree_and_delete_cascades(self):
+        self.laptops.parent = self.phones
+        self.laptops.save()
+        self.assertEqual(
+            self.closure(self.gaming), {(self.gaming.pk, 0), (self.laptops.pk, 1), (self.phones.pk, 2)}
+        )
+
+        self.laptops.delete()
+        self.assertFalse(CategoryClosure.objects.filter(ancestor=self.phones, depth__gt=0).exists())
+
+    def test_cannot_move_under_own_descendant(self):
+        self.computers.parent = self.gaming
+        with self.assertRaises(ValueError):
+            self.computers.save()
+
+    def test_tree_is_loaded_once_and_served_from_memory(self):
+        get_category_tree()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("category-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        computers = next(c for c in response.data["results"] if c["slug"] == "computers")
+        self.assertEqual(computers["children"][0]["children"][0]["slug"], "gaming-laptops")
+
+    def test_save_invalidates_the_tree(self):
+        self.assertIsNotNone(get_category_tree().get_by_slug("laptops"))
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Tablets", parent=self.computers)
+
+        node = get_category_tree().get_by_slug("tablets")
+        self.assertEqual(node["parent_id"], self.computers.pk)
+
+    def test_by_category_includes_descendants(self):
+        Product.objects.create(vendor=self.vendor, name="Rig", sku="R1", price=2000, stock=1, category=self.gaming)
+        Product.objects.create(vendor=self.vendor, name="Phone", sku="P1", price=500, stock=1, category=self.phones)
+
+        response = self.client.get(reverse("product-by-category", kwargs={"category_slug": "computers"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["name"] for p in response.data["results"]], ["Rig"])
+
+    def test_category_slug_filter_includes_descendants(self):
+        Product.objects.create(vendor=self.vendor, name="Rig", sku="R1", price=2000, stock=1, category=self.gaming)
+        Product.objects.create(vendor=self.vendor, name="Phone", sku="P1", price=500, stock=1, category=self.phones)
+
+        response = self.client.get(reverse("product-list"), {"category__slug": "laptops"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["name"] for p in response.data["results"]], ["Rig"])
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.models import Category, Product
+
+User = get_user_model()
+
+
+class ProductFacetsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        self.laptops = Category.objects.create(name="Laptops")
+        self.phones = Category.objects.create(name="Phones")
+        self.create("Laptop A", "Acme", 800, 5, self.laptops, rating=4.5)
+        self.create("Laptop B", "Acme", 60000, 0, self.laptops, rating=3.2)
+        self.create("Phone A", "Globex", 7000, 2, self.phones, rating=0)
+
+    def create(self, name, brand, price, stock, category, rating):
+        return Product.objects.create(
+            vendor=self.vendor, name=name, sku=name.replace(" ", ""), brand=brand,
+            price=price, stock=stock, category=category, rating_avg=rating,
+        )
+
+    def test_counts_every_facet(self):
+        response = self.client.get(reverse("product-facets"))
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+
+        self.assertEqual(data["total"], 3)
+        self.assertEqual(data["brand"], [{"value": "Acme", "count": 2}, {"value": "Globex", "count": 1}])
+        self.assertEqual([(c["slug"], c["count"]) for c in data["category"]], [("laptops", 2), ("phones", 1)])
+        self.assertEqual([bucket["count"] for bucket in data["price"]], [1, 0, 1, 0, 1, 0])
+        self.assertEqual({r["min_rating"]: r["count"] for r in data["rating"]}, {4: 1, 3: 2, 2: 2, 1: 2})
+        self.assertEqual(data["in_stock"], {"true": 2, "false": 1})
+
+    def test_honours_the_list_filters_in_one_query(self):
+        self.client.force_authenticate(self.vendor)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("product-facets"), {"brand": "Acme", "in_stock": "true"})
+        self.assertEqual(response.data["total"], 1)
+        self.assertEqual(response.data["brand"], [{"value": "Acme", "count": 1}])
+        facet_queries = [q for q in ctx.captured_queries if "GROUP BY" in q["sql"]]
+        self.assertEqual(len(facet_queries), 1)
+
+    def test_cached_counts_follow_product_changes(self):
+        self.client.get(reverse("product-facets"))
+        product = Product.objects.get(sku="PhoneA")
+        product.stock = 0
+        product.save()
+
+        response = self.client.get(reverse("product-facets"))
+        self.assertEqual(response.data["in_stock"], {"true": 1, "false": 2})
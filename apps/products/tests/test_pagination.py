@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.models import Category, Product
+
+User = get_user_model()
+
+
+class ProductKeysetPaginationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        self.client.force_authenticate(user=self.vendor)
+        category = Category.objects.create(name="Laptops")
+        self.products = [
+            Product.objects.create(vendor=self.vendor, name=f"P{i}", sku=f"SKU{i}", price=10, category=category)
+            for i in range(25)
+        ]
+        self.url = reverse("product-list")
+
+    def test_walks_every_product_once_newest_first(self):
+        seen = []
+        response = self.client.get(self.url, {"page_size": 10})
+        while True:
+            seen.extend(item["id"] for item in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        expected = [p.id for p in sorted(self.products, key=lambda p: (p.created_at, p.id), reverse=True)]
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_the_previous_page(self):
+        first = self.client.get(self.url, {"page_size": 10})
+        self.assertIsNone(first.data["previous"])
+
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_estimated_count_on_request(self):
+        response = self.client.get(self.url, {"count": "estimate"})
+        self.assertEqual(response.data["count"], 25)
+        self.assertTrue(response.data["count_is_estimate"])
+        self.assertNotIn("count", self.client.get(self.url).data)
+
+    def test_page_number_and_custom_ordering_fall_back(self):
+        response = self.client.get(self.url, {"page": 2})
+        self.assertEqual(response.data["count"], 25)
+
+        response = self.client.get(self.url, {"ordering": "price"})
+        self.assertIn("count", response.data)
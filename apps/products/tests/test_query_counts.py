@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.models import Category, Product, ProductImage, ProductSpecification, Review
+
+User = get_user_model()
+
+
+class ProductListQueryCountTest(APITestCase):
+    """A page of products must cost the same number of queries regardless of its size."""
+
+    def setUp(self):
+        cache.clear()
+        self.vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        self.reviewers = [
+            User.objects.create_user(username=f"reviewer{i}", email=f"r{i}@example.com", password="pass12345")
+            for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.vendor)  # bypass the anonymous cache
+        self.parent = Category.objects.create(name="Computers")
+        self.category = Category.objects.create(name="Laptops", parent=self.parent)
+
+    def create_products(self, count, offset=0):
+        for i in range(offset, offset + count):
+            product = Product.objects.create(
+                vendor=self.vendor, name=f"Product {i}", sku=f"SKU{i}", brand="Acme",
+                price=100 + i, stock=3, category=self.category,
+            )
+            ProductSpecification.objects.create(product=product, key="RAM", value="16GB")
+            ProductImage.objects.create(product=product, image=f"products/gallery/{i}.jpg")
+            for reviewer in self.reviewers:
+                Review.objects.create(user=reviewer, product=product, rating=4)
+
+    def count_list_queries(self, page_size):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("product-list"), {"page_size": page_size})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), page_size)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        self.create_products(5)
+        small_page = self.count_list_queries(5)
+
+        self.create_products(45, offset=5)
+        full_page = self.count_list_queries(50)
+
+        self.assertEqual(small_page, full_page)
+        self.assertLessEqual(full_page, 10)
+
+    def test_list_uses_annotated_rating(self):
+        self.create_products(1)
+        response = self.client.get(reverse("product-list"))
+        product = response.data["results"][0]
+        self.assertEqual(product["avg_rating"], 4.0)
+        self.assertEqual(product["review_count"], 3)
@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.models import Category, Product, Review
+from apps.products.services.cache_service import product_list_key
+from core.caching import get_tagged
+
+User = get_user_model()
+
+
+class RatingAggregatesTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        self.users = [
+            User.objects.create_user(username=f"user{i}", email=f"user{i}@example.com", password="pass12345")
+            for i in range(3)
+        ]
+        category = Category.objects.create(name="Phones")
+        self.product = Product.objects.create(vendor=self.vendor, name="Phone", sku="PH1", price=500, category=category)
+        self.other = Product.objects.create(vendor=self.vendor, name="Case", sku="CS1", price=10, category=category)
+
+    def review(self, user, rating, **kwargs):
+        return Review.objects.create(user=user, product=self.product, rating=rating, **kwargs)
+
+    def assertRatings(self, product, total, count, histogram):
+        product.refresh_from_db()
+        self.assertEqual(product.rating_sum, total)
+        self.assertEqual(product.rating_count, count)
+        self.assertEqual(product.rating_histogram, histogram)
+
+    def test_create_update_delete(self):
+        first = self.review(self.users[0], 5)
+        self.review(self.users[1], 3)
+        self.assertRatings(self.product, 8, 2, {"5": 1, "4": 0, "3": 1, "2": 0, "1": 0})
+        self.assertEqual(float(self.product.rating_avg), 4.0)
+
+        first = Review.objects.get(pk=first.pk)
+        first.rating = 4
+        first.save()
+        self.assertRatings(self.product, 7, 2, {"5": 0, "4": 1, "3": 1, "2": 0, "1": 0})
+
+        first.delete()
+        self.assertRatings(self.product, 3, 1, {"5": 0, "4": 0, "3": 1, "2": 0, "1": 0})
+
+    def test_only_approved_reviews_count(self):
+        review = self.review(self.users[0], 2, is_approved=False)
+        self.assertRatings(self.product, 0, 0, {"5": 0, "4": 0, "3": 0, "2": 0, "1": 0})
+
+        review.is_approved = True
+        review.save()
+        self.assertRatings(self.product, 2, 1, {"5": 0, "4": 0, "3": 0, "2": 1, "1": 0})
+
+        # instance loaded without the tracked fields still applies the difference
+        review = Review.objects.only("id").get(pk=review.pk)
+        review.is_approved = False
+        review.save()
+        self.assertRatings(self.product, 0, 0, {"5": 0, "4": 0, "3": 0, "2": 0, "1": 0})
+
+    def test_reconcile_command_fixes_drift(self):
+        self.review(self.users[0], 4)
+        Review.objects.filter(product=self.product).update(rating=1)  # bypasses signals
+        Product.objects.filter(pk=self.other.pk).update(rating_count=7)
+
+        out = StringIO()
+        call_command("reconcile_product_ratings", stdout=out)
+        self.assertIn("2 product(s) updated", out.getvalue())
+        self.assertRatings(self.product, 1, 1, {"5": 0, "4": 0, "3": 0, "2": 0, "1": 1})
+        self.assertRatings(self.other, 0, 0, {"5": 0, "4": 0, "3": 0, "2": 0, "1": 0})
+
+    def test_min_rating_and_ordering_use_columns(self):
+        self.review(self.users[0], 5)
+        response = self.client.get(reverse("product-list"), {"min_rating": 4, "ordering": "-review_count"})
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.product.id])
+        self.assertEqual(response.data["results"][0]["avg_rating"], 5.0)
+        self.assertEqual(response.data["results"][0]["review_count"], 1)
+
+    def test_new_rating_expires_cached_rating_pages(self):
+        url = f"{reverse('product-list')}?min_rating=4"
+        self.assertEqual(self.client.get(url).data["results"], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review(self.users[0], 5)
+
+        self.assertIsNone(get_tagged(product_list_key(url)))
+        self.assertEqual([p["name"] for p in self.client.get(url).data["results"]], ["Phone"])
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.models import Category, Product
+from apps.products.services.search_service import get_search_backend, tokenize, MySQLFullTextBackend
+
+User = get_user_model()
+
+
+class ProductSearchTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        get_search_backend().reset()
+        self.vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        category = Category.objects.create(name="Laptops")
+        self.macbook = Product.objects.create(
+            vendor=self.vendor, name="MacBook Pro 16", sku="MBP16", brand="Apple", price=2500, category=category,
+            description="Apple laptop with M3 chip",
+        )
+        self.sleeve = Product.objects.create(
+            vendor=self.vendor, name="Laptop Sleeve", sku="SLV1", brand="Generic", price=20, category=category,
+            description="Fits MacBook Pro and other laptops",
+        )
+        self.mouse = Product.objects.create(
+            vendor=self.vendor, name="Wireless Mouse", sku="MS1", brand="Logi", price=30, category=category,
+        )
+
+    def search(self, q):
+        response = self.client.get(reverse("product-list"), {"q": q})
+        return [item["id"] for item in response.data["results"]]
+
+    def test_results_ranked_by_relevance(self):
+        self.assertEqual(self.search("macbook pro"), [self.macbook.id, self.sleeve.id])
+
+    def test_terms_are_prefix_matched(self):
+        self.assertEqual(self.search("wirel mou"), [self.mouse.id])
+
+    def test_every_term_is_required(self):
+        self.assertEqual(self.search("macbook mouse"), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(self.search("mouse"), [self.mouse.id])
+
+        self.mouse.name = "Wireless Trackball"
+        self.mouse.save()
+        self.assertEqual(self.search("mouse"), [])
+        self.assertEqual(self.search("trackball"), [self.mouse.id])
+
+        self.mouse.delete()
+        self.assertEqual(self.search("trackball"), [])
+
+    def test_suggest_returns_top_matches(self):
+        response = self.client.get(reverse("product-suggest"), {"q": "mac"})
+        self.assertEqual([item["slug"] for item in response.data], [self.macbook.slug, self.sleeve.slug])
+
+    def test_mysql_boolean_query_strips_operators(self):
+        self.assertEqual(MySQLFullTextBackend().build_query('mac +"pro"*'), "+mac* +pro*")
+        self.assertEqual(tokenize("-()~"), [])
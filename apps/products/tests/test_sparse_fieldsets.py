@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.models import Category, Product, ProductSpecification, Review
+
+User = get_user_model()
+
+CARD_FIELDS = {"id", "slug", "name", "price", "final_price", "thumbnail_url", "avg_rating", "review_count"}
+
+
+class ProductSparseFieldsetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        self.category = Category.objects.create(name="Laptops")
+        self.product = Product.objects.create(
+            vendor=self.vendor, name="Laptop", sku="LP1", description="Long text", price=1000,
+            discount_percentage=10, stock=5, category=self.category,
+        )
+        ProductSpecification.objects.create(product=self.product, key="RAM", value="16GB")
+        Review.objects.create(user=self.vendor, product=self.product, rating=5)
+        self.list_url = reverse("product-list")
+
+    def test_list_returns_cards(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(set(response.data["results"][0]), CARD_FIELDS)
+
+    def test_collection_actions_return_cards(self):
+        for url in (
+            reverse("product-discounted"),
+            reverse("product-featured"),
+            reverse("product-by-category", kwargs={"category_slug": self.category.slug}),
+        ):
+            response = self.client.get(url)
+            self.assertEqual(set(response.data["results"][0]), CARD_FIELDS, url)
+
+    def test_expand_adds_heavy_fields(self):
+        response = self.client.get(self.list_url, {"expand": "specifications,reviews"})
+        card = response.data["results"][0]
+        self.assertEqual(set(card), CARD_FIELDS | {"specifications", "reviews"})
+        self.assertEqual(card["specifications"], [{"key": "RAM", "value": "16GB"}])
+
+    def test_fields_restricts_output(self):
+        response = self.client.get(self.list_url, {"fields": "id,name,unknown"})
+        self.assertEqual(set(response.data["results"][0]), {"id", "name"})
+
+    def test_detail_returns_full_representation(self):
+        response = self.client.get(reverse("product-detail", kwargs={"slug": self.product.slug}))
+        self.assertIn("description", response.data)
+        self.assertIn("reviews", response.data)
+        self.assertEqual(response.data["review_count"], 1)
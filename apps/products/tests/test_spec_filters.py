@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.models import Category, Product, ProductSpecification
+from apps.products.services.spec_service import parse_number
+
+User = get_user_model()
+
+
+class SpecNormalizationTest(APITestCase):
+    def test_numbers_are_converted_to_the_base_unit(self):
+        self.assertEqual(parse_number("16GB"), (Decimal("16.0000"), True))
+        self.assertEqual(parse_number("1 TB"), (Decimal("1024.0000"), True))
+        self.assertEqual(parse_number("16GB DDR5"), (Decimal("16.0000"), False))
+        self.assertEqual(parse_number("Ryzen 7"), (None, False))
+
+    def test_save_fills_the_normalized_columns(self):
+        vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        product = Product.objects.create(
+            vendor=vendor, name="Laptop", sku="L1", price=100, category=Category.objects.create(name="Laptops")
+        )
+        spec = ProductSpecification.objects.create(product=product, key="Screen Size", value='15.6 "')
+        self.assertEqual(spec.normalized_key, "screen-size")
+        self.assertEqual(spec.numeric_value, Decimal("15.6000"))
+        self.assertEqual(spec.value_type, ProductSpecification.ValueTypes.NUMBER)
+
+
+class SpecFilterTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = User.objects.create_user(username="vendor", email="vendor@example.com", password="pass12345")
+        category = Category.objects.create(name="Laptops")
+        specs = {
+            "Zen": {"RAM": "16GB DDR5", "CPU": "AMD Ryzen 7 7735HS"},
+            "Core": {"RAM": "16 GB", "CPU": "Intel Core i7"},
+            "Lite": {"RAM": "8GB", "CPU": "AMD Ryzen 5"},
+        }
+        for name, values in specs.items():
+            product = Product.objects.create(vendor=self.vendor, name=name, sku=name, price=100, stock=1, category=category)
+            for key, value in values.items():
+                ProductSpecification.objects.create(product=product, key=key, value=value)
+
+    def names(self, params):
+        response = self.client.get(reverse("product-list"), params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(p["name"] for p in response.data["results"])
+
+    def test_attributes_and_together(self):
+        self.assertEqual(self.names({"spec[ram]": "16GB"}), ["Core", "Zen"])
+        self.assertEqual(self.names({"spec[ram]": "16GB", "spec[cpu][contains]": "ryzen"}), ["Zen"])
+        self.assertEqual(self.names({"spec[ram][lte]": "8192MB"}), ["Lite"])
+        self.assertEqual(self.names({"spec[cpu]": "intel core i7,amd ryzen 5"}), ["Core", "Lite"])
+
+    def test_spec_facets_count_values(self):
+        response = self.client.get(reverse("product-spec-facets"), {"keys": "ram", "spec[cpu][contains]": "amd"})
+        self.assertEqual(response.status_code, 200)
+        ram = response.data["ram"]
+        self.assertEqual(ram["key"], "RAM")
+        self.assertEqual({v["value"]: v["count"] for v in ram["values"]}, {"16gb ddr5": 1, "8gb": 1})
+        self.assertEqual((ram["min"], ram["max"]), (Decimal("8.0000"), Decimal("16.0000")))
@@ -0,0 +1,63 @@
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.models import Category, Product
+from apps.products.services.stock_import_service import import_stock
+
+User = get_user_model()
+
+
+class StockImportTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass12345")
+        category = Category.objects.create(name="Consoles")
+        for sku in ("A1", "A2", "A3"):
+            Product.objects.create(vendor=self.admin, name=sku, sku=sku, price=10, stock=5, category=category)
+
+    def stock(self, sku):
+        return Product.objects.get(sku=sku).stock
+
+    def test_csv_is_applied_in_chunks_with_per_row_errors(self):
+        feed = io.BytesIO(b"sku,stock,delta\nA1,20,\nA2,,-2\nNOPE,1,\nA3,abc,\nA1,,3\n")
+        result = import_stock(feed, "csv", chunk_size=2, batch_size=1)
+
+        self.assertEqual(result["rows"], 5)
+        self.assertEqual(result["chunks"], 3)
+        self.assertEqual(self.stock("A1"), 23)
+        self.assertEqual(self.stock("A2"), 3)
+        self.assertEqual(self.stock("A3"), 5)
+        self.assertEqual(
+            [(error["line"], error["error"]) for error in result["errors"]],
+            [(4, "unknown sku"), (5, "stock must be an integer")],
+        )
+
+    def test_jsonl_delta_below_zero_is_skipped(self):
+        feed = io.BytesIO(b'{"sku": "A1", "delta": -9}\n{"sku": "A2", "stock": 0}\nnot json\n')
+        result = import_stock(feed, "jsonl")
+
+        self.assertEqual((result["updated"], result["skipped"], result["error_count"]), (1, 1, 1))
+        self.assertEqual(self.stock("A1"), 5)
+        self.assertFalse(Product.objects.get(sku="A2").is_available)
+
+    def test_endpoint_streams_progress(self):
+        self.client.force_authenticate(self.admin)
+        upload = SimpleUploadedFile("feed.jsonl", b'{"sku": "A1", "stock": 7}\n{"sku": "ZZ", "stock": 1}\n')
+        response = self.client.post(reverse("product-import-stock"), {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, 200)
+        reports = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(reports[0]["errors"], [{"line": 2, "sku": "ZZ", "error": "unknown sku"}])
+        self.assertTrue(reports[-1]["done"])
+        self.assertEqual(reports[-1]["updated"], 1)
+        self.assertEqual(self.stock("A1"), 7)
+
+    def test_endpoint_rejects_a_csv_without_sku_column(self):
+        self.client.force_authenticate(self.admin)
+        upload = SimpleUploadedFile("feed.csv", b"code,stock\nA1,3\n")
+        response = self.client.post(reverse("product-import-stock"), {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.cart.models import Cart, CartItem
+from apps.orders.models import Order
+from apps.orders.services import create_order_from_cart
+from apps.products.models import Category, Product, StockReservation
+from apps.products.services import inventory_service
+from apps.products.services.cache_service import product_list_key
+from apps.products.services.inventory_service import InsufficientStock
+from core.caching import get_tagged
+
+User = get_user_model()
+
+
+class StockReservationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="pass12345")
+        category = Category.objects.create(name="Consoles")
+        self.console = Product.objects.create(vendor=self.user, name="Console", sku="C1", price=500, stock=3, category=category)
+        self.pad = Product.objects.create(vendor=self.user, name="Gamepad", sku="P1", price=60, stock=10, category=category)
+
+    def stock(self, product):
+        product.refresh_from_db()
+        return product.stock
+
+    def test_reserve_decrements_all_or_nothing(self):
+        inventory_service.reserve_items({self.console.pk: 2, self.pad.pk: 4})
+        self.assertEqual((self.stock(self.console), self.stock(self.pad)), (1, 6))
+
+        with self.assertRaises(InsufficientStock) as ctx:
+            inventory_service.reserve_items({self.console.pk: 2, self.pad.pk: 1})
+        self.assertEqual(ctx.exception.shortages, {self.console.pk: 1})
+        # the gamepad row was not touched either
+        self.assertEqual((self.stock(self.console), self.stock(self.pad)), (1, 6))
+
+    def test_expired_holds_are_released_on_demand(self):
+        inventory_service.reserve_items({self.console.pk: 3}, ttl=60)
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        inventory_service.reserve_items({self.console.pk: 2})
+        self.assertEqual(self.stock(self.console), 1)
+        self.assertEqual(StockReservation.objects.filter(status=StockReservation.STATUS_RELEASED).count(), 1)
+
+    def test_release_is_idempotent(self):
+        inventory_service.reserve_items({self.console.pk: 2}, user=self.user)
+        holds = StockReservation.objects.filter(user=self.user)
+        self.assertEqual(inventory_service.release_reservations(holds), 1)
+        self.assertEqual(inventory_service.release_reservations(holds), 0)
+        self.assertEqual(self.stock(self.console), 3)
+
+    def test_crossing_zero_syncs_availability_and_list_pages(self):
+        url = f"{reverse('product-list')}?in_stock=false"
+        self.client.get(url)
+        self.assertIsNotNone(get_tagged(product_list_key(url)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory_service.reserve_items({self.console.pk: 3}, user=self.user)
+        self.console.refresh_from_db()
+        self.assertFalse(self.console.is_available)
+        self.assertIsNone(get_tagged(product_list_key(url)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory_service.release_reservations(StockReservation.objects.filter(user=self.user))
+        self.console.refresh_from_db()
+        self.assertTrue(self.console.is_available)
+
+    def test_checkout_takes_stock_and_cancel_restocks(self):
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.console, quantity=2)
+        order = create_order_from_cart(self.user)
+        self.assertEqual(self.stock(self.console), 1)
+
+        inventory_service.restock_order(order)
+        inventory_service.restock_order(order)
+        self.assertEqual(self.stock(self.console), 3)
+
+    def test_checkout_fails_when_short(self):
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.console, quantity=5)
+        with self.assertRaises(InsufficientStock):
+            create_order_from_cart(self.user)
+        self.assertEqual(Order.objects.count(), 0)
+        self.assertEqual(self.stock(self.console), 3)
+
+    def test_cart_hold_is_reused_by_checkout(self):
+        self.client.force_authenticate(self.user)
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.console, quantity=3)
+
+        response = self.client.post(reverse("cart-reserve", args=[cart.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.stock(self.console), 0)
+
+        create_order_from_cart(self.user)
+        self.assertEqual(self.stock(self.console), 0)
+        self.assertFalse(StockReservation.objects.filter(status=StockReservation.STATUS_ACTIVE).exists())
+
+    def test_bulk_stock_update_keeps_held_units(self):
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass12345")
+        self.client.force_authenticate(admin)
+        inventory_service.reserve_items({self.console.pk: 2})
+
+        response = self.client.post(
+            reverse("product-bulk-update-stock"),
+            [{"sku": "C1", "stock": 5}, {"sku": "P1", "delta": -4}],
+            format="json",
+        )
+        self.assertEqual(response.data, {"updated": 2})
+        self.assertEqual((self.stock(self.console), self.stock(self.pad)), (3, 6))
@@ -3,10 +3,12 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.core.cache import cache
+from django.http import Http404
 
 from apps.shipments.models import Shipment
 from apps.shipments.api.serializers import ShipmentSerializer
 from apps.orders.models import Order
+from core.caching import read_through
 
 
 class ShipmentViewSet(viewsets.ModelViewSet):
@@ -54,12 +56,17 @@ class ShipmentViewSet(viewsets.ModelViewSet):
         return response
 
     def retrieve(self, request, *args, **kwargs):
-        """Retrieve with cache for better performance."""
+        """
+        Retrieve with a stampede-safe read-through cache.
+        The cached payload is shared, so ownership is re-checked on every hit.
+        """
         shipment_id = kwargs.get("id")
         cache_key = f"shipment_detail:{shipment_id}"
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached)
-        response = super().retrieve(request, *args, **kwargs)
-        cache.set(cache_key, response.data, 60 * 2)  # 2 min TTL
-        return response
\ No newline at end of file
+
+        def compute():
+            return self.get_serializer(self.get_object()).data
+
+        data = read_through(cache_key, compute, 60 * 2)  # 2 min TTL
+        if not request.user.is_staff and data["user"] != request.user.pk:
+            raise Http404
+        return Response(data)
@@ -1,7 +1,8 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from apps.users.models import User, UserActivityLog, PasswordHistory
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from core.admin_logging import log_admin_action
+from core.pagination import EstimatedCountPaginator
 
 
 class PasswordHistoryInline(admin.TabularInline):
@@ -159,7 +160,21 @@ class UserActivityLogAdmin(admin.ModelAdmin):
     )
 
     list_per_page = 30
+    list_select_related = ("user",)
     show_full_result_count = False
+    # the log table is large: exact counts only up to ESTIMATE_COUNT_CAP rows
+    paginator = EstimatedCountPaginator
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        changelist = (getattr(response, "context_data", None) or {}).get("cl")
+        if changelist is not None and changelist.paginator.count_is_estimate:
+            self.message_user(
+                request,
+                f"About {changelist.result_count:,} entries: the total is estimated, so the last page links are approximate.",
+                messages.INFO,
+            )
+        return response
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -172,6 +187,10 @@ class UserActivityLogAdmin(admin.ModelAdmin):
 
         return qs.filter(user=request.user)
 
+    def get_ordering(self, request):
+        # unique (timestamp, id) ordering keeps page boundaries stable
+        return ("-timestamp", "-id")
+
     def has_view_permission(self, request, obj=None):
         if obj:
             if obj.user.role == "SUPERADMIN" and not request.user.is_superuser:
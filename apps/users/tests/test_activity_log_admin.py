@@ -0,0 +1,35 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.paginator import EmptyPage
+from django.test import TestCase
+
+from apps.users.models import UserActivityLog
+from core.pagination import EstimatedCountPaginator
+
+User = get_user_model()
+
+
+class ActivityLogPaginatorTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="auditor", email="auditor@example.com", password="pass12345")
+        for _ in range(6):
+            UserActivityLog.objects.create(user=user, action_type=UserActivityLog.ActionTypes.LOGIN)
+
+    def paginator(self):
+        return EstimatedCountPaginator(UserActivityLog.objects.order_by("-timestamp", "-id"), 2)
+
+    def test_counts_exactly_under_the_cap(self):
+        paginator = self.paginator()
+        self.assertEqual((paginator.count, paginator.count_is_estimate), (6, False))
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+    @mock.patch("core.pagination.ESTIMATE_COUNT_CAP", 3)
+    def test_estimate_past_the_cap_does_not_bound_the_pages(self):
+        with mock.patch("core.pagination.table_row_estimate", return_value=4):
+            paginator = self.paginator()
+            self.assertEqual((paginator.count, paginator.count_is_estimate), (4, True))
+            # the statistics under-count: the rows after them are still reachable
+            self.assertEqual(len(paginator.page(3).object_list), 2)
+            self.assertEqual(len(paginator.page(5).object_list), 0)
@@ -1,9 +1,9 @@
 from rest_framework import serializers
 from apps.wishlist.models import Wishlist, WishlistItem
-from apps.products.api.serializers import ProductSerializer
+from apps.products.api.serializers import ProductCardSerializer
 
 class WishlistItemSerializers(serializers.ModelSerializer):
-    product = ProductSerializer(read_only = True)
+    product = ProductCardSerializer(read_only = True)
 
     class Meta:
         model = WishlistItem
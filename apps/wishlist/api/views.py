@@ -4,14 +4,17 @@ from rest_framework.response import Response
 from apps.wishlist.models import Wishlist, WishlistItem
 from .serializers import WishlistSerializer
 from apps.products.models import Product
+from django.db.models import Prefetch
 
 class WishlistViewSet(viewsets.ModelViewSet):
     serializer_class = WishlistSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        # Return only wishlists for the logged-in user
-        return Wishlist.objects.filter(user=self.request.user)
+        # Return only wishlists for the logged-in user, with the product cards
+        # loaded up front
+        items = WishlistItem.objects.select_related("product")
+        return Wishlist.objects.filter(user=self.request.user).prefetch_related(Prefetch("items", queryset=items))
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -0,0 +1,202 @@
+"""
+Shared caching primitives used across apps.
+
+Tagged entries
+--------------
+Every tag owns a version number stored under ``cache_tag:<tag>``. A tagged
+entry remembers the versions of its tags at write time; bumping a tag's
+version makes every entry that carries it stale on the next read. This lets
+us invalidate "everything that contains product 42" in O(1) without a
+keyspace SCAN (``delete_pattern``) or a full ``cache.clear()``, which would
+also wipe sessions and throttle counters.
+
+Read-through
+------------
+``read_through`` wraps "get or compute and set" for hot keys: one worker at a
+time recomputes a key (per-key lock), entries are refreshed slightly before
+they expire with a probability that grows near expiry (XFetch), and while a
+refresh is running every other request is served the previous value instead
+of piling onto the database.
+"""
+import math
+import random
+import time
+import uuid
+from collections import namedtuple
+
+from django.core.cache import cache
+
+TAG_VERSION_PREFIX = "cache_tag"
+
+
+def _tag_version_key(tag):
+    return f"{TAG_VERSION_PREFIX}:{tag}"
+
+
+def _new_tag_version():
+    # Time-based seed so a tag key evicted by Redis never restarts at a
+    # version an old entry was written with.
+    return int(time.time() * 1000)
+
+
+def get_tag_versions(tags):
+    """
+    Return ``{tag: version}`` for the given tags, initialising missing ones.
+    """
+    tags = set(tags)
+    if not tags:
+        return {}
+
+    keys = {_tag_version_key(tag): tag for tag in tags}
+    found = cache.get_many(list(keys))
+
+    versions = {}
+    for key, tag in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = _new_tag_version()
+            # add() keeps the first writer's version if two workers race here
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        versions[tag] = version
+    return versions
+
+
+def invalidate_tags(*tags):
+    """Mark every entry carrying any of ``tags`` as stale."""
+    for tag in set(tags):
+        key = _tag_version_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Tag never seen (or evicted): a fresh version is enough.
+            cache.set(key, _new_tag_version(), timeout=None)
+
+
+def set_tagged(key, value, tags, timeout=None):
+    """Store ``value`` under ``key`` bound to the current versions of ``tags``."""
+    cache.set(key, {"tags": get_tag_versions(tags), "value": value}, timeout)
+
+
+def get_tagged(key, default=None):
+    """
+    Return the value stored by ``set_tagged`` or ``default`` when the key is
+    missing or any of its tags has been invalidated since it was written.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        return default
+
+    stored = entry["tags"]
+    if stored and get_tag_versions(stored) != stored:
+        return default
+    return entry["value"]
+
+
+# ---------------------------------------------------------------------
+# READ-THROUGH CACHE
+# ---------------------------------------------------------------------
+LOCK_PREFIX = "cache_lock"
+
+# How long stale values stay around (in seconds) to be served while a single
+# worker recomputes them.
+DEFAULT_STALE_TTL = 60
+
+# compute() may return Tagged(value, tags) when tags are only known after
+# computing (e.g. the products that ended up on a page).
+Tagged = namedtuple("Tagged", ["value", "tags"])
+
+
+def _acquire_lock(key, timeout):
+    token = uuid.uuid4().hex
+    if cache.add(f"{LOCK_PREFIX}:{key}", token, timeout):
+        return token
+    return None
+
+
+def _release_lock(key, token):
+    lock_key = f"{LOCK_PREFIX}:{key}"
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _should_refresh(entry, beta):
+    """
+    Probabilistic early expiration (XFetch): recompute before ``expires_at``
+    with a probability that grows as expiry approaches and with how long the
+    value took to compute (``delta``).
+    """
+    jitter = entry["delta"] * beta * -math.log(random.random() or 1e-12)
+    return time.time() + jitter >= entry["expires_at"]
+
+
+def _compute_and_store(key, compute, timeout, tags, stale_ttl):
+    started = time.time()
+    result = compute()
+    delta = time.time() - started
+
+    value, extra_tags = (result.value, result.tags) if isinstance(result, Tagged) else (result, ())
+    if value is None:
+        # Nothing to serve; let the next request try again.
+        return None
+
+    entry = {
+        "tags": get_tag_versions(set(tags) | set(extra_tags)),
+        "value": value,
+        "expires_at": time.time() + timeout,
+        "delta": delta,
+    }
+    cache.set(key, entry, timeout + stale_ttl)
+    return value
+
+
+def read_through(
+    key,
+    compute,
+    timeout,
+    tags=(),
+    stale_ttl=DEFAULT_STALE_TTL,
+    beta=1.0,
+    lock_timeout=30,
+    wait_timeout=2.0,
+):
+    """
+    Return the cached value for ``key`` or compute it with ``compute()``.
+
+    - Fresh entries are returned as-is, unless XFetch picks this request to
+      refresh early.
+    - Expired or tag-invalidated entries are refreshed by the single request
+      that wins the per-key lock; everyone else gets the stale value.
+    - On a cold miss, requests that lose the lock wait up to ``wait_timeout``
+      seconds for the winner before computing themselves.
+    """
+    entry = cache.get(key)
+
+    if entry is not None and "expires_at" in entry:
+        current = not entry["tags"] or get_tag_versions(entry["tags"]) == entry["tags"]
+        if current and not _should_refresh(entry, beta):
+            return entry["value"]
+
+        token = _acquire_lock(key, lock_timeout)
+        if token is None:
+            return entry["value"]  # someone else is refreshing: serve stale
+        try:
+            value = _compute_and_store(key, compute, timeout, tags, stale_ttl)
+        finally:
+            _release_lock(key, token)
+        return value
+
+    token = _acquire_lock(key, lock_timeout)
+    if token is None:
+        deadline = time.time() + wait_timeout
+        while time.time() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(key)
+            if entry is not None and "expires_at" in entry:
+                return entry["value"]
+        return _compute_and_store(key, compute, timeout, tags, stale_ttl)
+
+    try:
+        return _compute_and_store(key, compute, timeout, tags, stale_ttl)
+    finally:
+        _release_lock(key, token)
@@ -75,3 +75,39 @@ class OwnerOrStaffMixin:
                 )
 
         serializer.save()
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin for sparse fieldsets.
+
+    - ``fields``: only these fields are rendered (unknown names are ignored).
+    - ``expand``: extra fields added on top of the default set.
+    - ``Meta.default_fields``: optional compact default used when ``fields``
+      is not given (e.g. a "card" representation for list pages).
+
+    Both kwargs are passed explicitly (usually by the viewset from
+    ``?fields=`` / ``?expand=``) so nested serializers are not affected by the
+    parent request's query string.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        expand = kwargs.pop("expand", None)
+        super().__init__(*args, **kwargs)
+
+        allowed = fields or getattr(self.Meta, "default_fields", None)
+        if not allowed:
+            return
+
+        allowed = set(allowed) | set(expand or [])
+        for name in list(self.fields):
+            if name not in allowed:
+                self.fields.pop(name)
+
+
+def parse_field_list(value):
+    """Split a ``?fields=a,b`` style query param into a list of names."""
+    if not value:
+        return []
+    return [name.strip() for name in value.split(",") if name.strip()]
@@ -0,0 +1,273 @@
+"""
+Pagination shared across apps.
+
+``KeysetPagination`` pages on a ``(timestamp, id)`` key instead of OFFSET,
+so page 10,000 costs the same as page 1, and skips ``COUNT(*)`` unless a
+(cheap, estimated) count is asked for.
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# Filtered querysets are counted up to this many rows at most.
+ESTIMATE_COUNT_CAP = 10000
+
+
+def estimate_count(queryset, cap=ESTIMATE_COUNT_CAP):
+    """
+    Cheap row count for large tables.
+
+    - Unfiltered MySQL tables use the InnoDB statistics in
+      ``information_schema`` (approximate, no scan).
+    - Anything else is counted up to ``cap`` rows (``COUNT`` over a
+      ``LIMIT`` subquery), so the cost is bounded however big the table is.
+    """
+    if not queryset.query.where:
+        rows = table_row_estimate(queryset.model, queryset.db)
+        if rows is not None:
+            return rows
+    return queryset.order_by()[:cap].count()
+
+
+def table_row_estimate(model, using="default"):
+    """InnoDB's approximate row count of ``model``'s table; ``None`` off MySQL."""
+    connection = connections[using]
+    if connection.vendor != "mysql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django ``Paginator`` (e.g. for the admin) that counts exactly up to
+    ``ESTIMATE_COUNT_CAP`` rows and only past that falls back to the table
+    statistics, flagging ``count_is_estimate``. An estimated count does not
+    bound the page number, so rows it under-counts stay reachable and pages
+    it over-counts are empty rather than errors.
+    """
+
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        exact = self.object_list.order_by()[:ESTIMATE_COUNT_CAP + 1].count()
+        if exact <= ESTIMATE_COUNT_CAP:
+            return exact
+        estimate = table_row_estimate(self.object_list.model, self.object_list.db)
+        if estimate is None:
+            return self.object_list.count()  # no cheap estimate on this backend
+        self.count_is_estimate = True
+        return max(estimate, exact)
+
+    def validate_number(self, number):
+        if not (self.count and self.count_is_estimate):  # count first: it sets count_is_estimate
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_estimate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination on ``ordering`` = ``(<timestamp>, <pk>)``.
+
+    Cursors are opaque base64 tokens holding the key of the boundary row and
+    the direction. ``?count=estimate`` (or ``count_mode = "estimate"``) adds an
+    approximate ``count`` to the response.
+
+    When ``fallback_class`` is set, requests that ask for a different
+    ordering (``?ordering=``) or a numbered page (``?page=``) are delegated to
+    it, since a keyset can only walk its own ordering.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    ordering = ("-created_at", "-id")
+    count_mode = None  # None or "estimate"
+    fallback_class = None
+    fallback_query_params = ("ordering", "page")
+
+    invalid_cursor_message = "Invalid cursor"
+
+    # ---------------------------------------------------------------------
+    # CURSOR ENCODING
+    # ---------------------------------------------------------------------
+
+    def encode_cursor(self, obj, reverse):
+        position = [field.value_to_string(obj) for field in self._key_fields]
+        payload = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            position = [
+                field.to_python(value) for field, value in zip(self._key_fields, payload["p"], strict=True)
+            ]
+            return position, bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    # ---------------------------------------------------------------------
+    # PAGINATION
+    # ---------------------------------------------------------------------
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def _use_fallback(self, request):
+        return self.fallback_class is not None and any(
+            param in request.query_params for param in self.fallback_query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fallback = None
+        if self._use_fallback(request):
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        model = queryset.model
+        self._key_fields = [model._meta.get_field(name.lstrip("-")) for name in self.ordering]
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        self.count = None
+        count_mode = request.query_params.get(self.count_query_param, self.count_mode)
+        if count_mode == "estimate":
+            self.count = estimate_count(queryset)
+
+        descending = self.ordering[0].startswith("-")
+        # walking backwards flips both the comparison and the ordering
+        if reverse:
+            descending = not descending
+        order = [f"-{f.name}" if descending else f.name for f in self._key_fields]
+        queryset = queryset.order_by(*order)
+
+        if position is not None:
+            (first, second), (first_value, second_value) = self._key_fields, position
+            op = "lt" if descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{first.name}__{op}": first_value})
+                | Q(**{first.name: first_value, f"{second.name}__{op}": second_value})
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.page = results
+        return results
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1], reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[0], reverse=True))
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+
+        payload = OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+        ])
+        if self.count is not None:
+            payload["count"] = self.count
+            payload["count_is_estimate"] = True
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer", "nullable": True},
+                "count_is_estimate": {"type": "boolean"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque pagination cursor.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 'estimate' to include an approximate total count.",
+                "schema": {"type": "string", "enum": ["estimate"]},
+            },
+        ]
@@ -0,0 +1,149 @@
+"""
+Minimal pub/sub used to wake long-lived (ASGI) listeners.
+
+Messages are hints ("channel X changed"), not data: subscribers re-read the
+database after waking, so a lost or duplicated message costs at most one
+extra query and never a missed row.
+
+Backends
+--------
+``LocalPubSub`` fans out inside one process (tests, a single ASGI worker).
+``RedisPubSub`` uses Redis PUBLISH/SUBSCRIBE so every worker hears every
+message. Pick one with ``PUBSUB_BACKEND`` (dotted path): the project settings
+use the Redis backend, and the local one is only the fallback when the
+setting is absent.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "core.pubsub.LocalPubSub"
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+class _LocalSubscription:
+    def __init__(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue()
+
+    def put(self, message):
+        # publishers run in other threads (sync views, celery); hand over to the subscriber's loop
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, message)
+        except RuntimeError:
+            pass  # loop already closed: the subscriber is gone
+
+    async def get(self, timeout):
+        """Next message, or ``None`` after ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalPubSub:
+    """In-process backend: one asyncio queue per subscriber."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, channel, message=""):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(message)
+        return len(subscribers)
+
+    def publish_many(self, channels, message=""):
+        return sum(self.publish(channel, message) for channel in channels)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscription = _LocalSubscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscription)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return None if message is None else message["data"]
+
+
+class RedisPubSub:
+    """Cross-process backend on Redis PUBLISH/SUBSCRIBE (the cache server by default)."""
+
+    def __init__(self, url=None):
+        self.url = url or getattr(settings, "PUBSUB_REDIS_URL", None) or settings.CACHES["default"]["LOCATION"]
+        self._client = None
+
+    def _sync_client(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def publish(self, channel, message=""):
+        return self._sync_client().publish(channel, message)
+
+    def publish_many(self, channels, message=""):
+        pipe = self._sync_client().pipeline(transaction=False)
+        for channel in channels:
+            pipe.publish(channel, message)
+        return sum(pipe.execute())
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        from redis import asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield _RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+            await client.aclose()
+
+
+def get_pubsub():
+    """The configured backend (one shared instance per dotted path)."""
+    path = getattr(settings, "PUBSUB_BACKEND", DEFAULT_BACKEND)
+    with _backends_lock:
+        if path not in _backends:
+            _backends[path] = import_string(path)()
+        return _backends[path]
+
+
+def publish_many(channels, message=""):
+    """Best-effort publish: a broker outage must not fail the write that triggered it."""
+    channels = list(channels)
+    if not channels:
+        return 0
+    try:
+        return get_pubsub().publish_many(channels, message)
+    except Exception:
+        logger.exception("Publishing to %d pub/sub channel(s) failed", len(channels))
+        return 0
@@ -0,0 +1,23 @@
+"""
+Renderers for non-JSON endpoints.
+
+DRF negotiates the response format before a view runs; these classes let an
+action accept ``Accept`` headers such as ``text/event-stream`` even though
+the action itself returns a streaming Django response.
+"""
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class EventStreamRenderer(BaseRenderer):
+    """``text/event-stream``: errors raised before the stream starts are rendered as JSON."""
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return json.dumps(data, cls=JSONEncoder).encode(self.charset)
@@ -68,6 +68,7 @@ INSTALLED_APPS = [
     "apps.analytics",
     "apps.discounts",
     "apps.support",
+    "apps.outbox",
 
 
     # Third party apps
@@ -168,6 +169,7 @@ CORS_ALLOW_HEADERS = [
     "user-agent",
     "x-csrftoken",
     "x-requested-with",
+    "last-event-id",  # EventSource reconnects (notification stream)
 ]
 
 
@@ -232,6 +234,19 @@ CACHES = {
     }
 }
 
+# pub/sub for long-lived streams (notification SSE); core.pubsub.LocalPubSub for a single process
+PUBSUB_BACKEND = "core.pubsub.RedisPubSub"
+
+# invoice PDF render pipeline (apps.invoices.services.render_service); run `render_invoices --loop`
+# or schedule the render_pending_invoices task (which renders inline: Celery workers are daemonic)
+INVOICE_RENDER_WORKERS = env.int("INVOICE_RENDER_WORKERS", default=2)
+INVOICE_RENDER_DISPATCH_ON_COMMIT = env.bool("INVOICE_RENDER_DISPATCH_ON_COMMIT", default=False)
+# invoice downloads: streamed from the media storage. Django 5.2 ignores DEFAULT_FILE_STORAGE below, so
+# PDFs land on the local FileSystemStorage; switch to apps.invoices.delivery.CloudinarySignedDelivery
+# only once STORAGES["default"] points at Cloudinary, or every download redirects to a missing asset
+INVOICE_DELIVERY_BACKEND = env("INVOICE_DELIVERY_BACKEND", default="apps.invoices.delivery.StreamingDelivery")
+INVOICE_DOWNLOAD_URL_TTL = 300
+
 AUTHENTICATION_BACKENDS = [
     "apps.users.auth_backends.EmailOrUsernameBackend",
     "django.contrib.auth.backends.ModelBackend",